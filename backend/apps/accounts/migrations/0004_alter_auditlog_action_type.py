@@ -0,0 +1,18 @@
+# Generated migration to add the bulk email audit action
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_create_initial_users'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action_type',
+            field=models.CharField(choices=[('REFUND', 'Refund'), ('UPGRADE', 'Upgrade'), ('COMP', 'Comp'), ('RESEND_TICKET', 'Resend Ticket'), ('RESEND_INVOICE', 'Resend Invoice'), ('BULK_EMAIL', 'Bulk Email'), ('BOOTH_ASSIGN', 'Booth Assignment'), ('SCAN_OVERRIDE', 'Scan Override'), ('USER_UPDATE', 'User Update'), ('ORDER_UPDATE', 'Order Update'), ('TICKET_CANCEL', 'Ticket Cancel'), ('TRANSFER_CANCEL', 'Transfer Cancel'), ('CONFIG_UPDATE', 'Config Update')], db_index=True, max_length=50),
+        ),
+    ]
@@ -103,6 +103,7 @@ class AuditLog(models.Model):
         COMP = 'COMP', 'Comp'
         RESEND_TICKET = 'RESEND_TICKET', 'Resend Ticket'
         RESEND_INVOICE = 'RESEND_INVOICE', 'Resend Invoice'
+        BULK_EMAIL = 'BULK_EMAIL', 'Bulk Email'
         BOOTH_ASSIGN = 'BOOTH_ASSIGN', 'Booth Assignment'
         SCAN_OVERRIDE = 'SCAN_OVERRIDE', 'Scan Override'
         USER_UPDATE = 'USER_UPDATE', 'User Update'
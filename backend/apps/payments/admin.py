@@ -4,10 +4,10 @@ from .models import StripeEvent, PaymentAttempt
 
 @admin.register(StripeEvent)
 class StripeEventAdmin(admin.ModelAdmin):
-    list_display = ('stripe_event_id', 'event_type', 'processed', 'received_at', 'processed_at')
+    list_display = ('stripe_event_id', 'event_type', 'order_key', 'processed', 'attempts', 'received_at', 'processed_at')
     list_filter = ('event_type', 'processed', 'received_at')
-    search_fields = ('stripe_event_id',)
-    readonly_fields = ('id', 'stripe_event_id', 'event_type', 'processed', 'processing_error', 'payload', 'received_at', 'processed_at')
+    search_fields = ('stripe_event_id', 'order_key')
+    readonly_fields = ('id', 'stripe_event_id', 'event_type', 'order_key', 'processed', 'attempts', 'processing_error', 'payload', 'event_created', 'received_at', 'processed_at')
     
     def has_add_permission(self, request):
         return False
@@ -7,8 +7,8 @@ from django.db import transaction
 from django.conf import settings
 
 from apps.tickets.models import Order, TicketType
-from apps.tickets.amphitheater_models import SeatHold
 from apps.tickets.amphitheater_services import AmphitheaterService
+from apps.tickets.seat_hold_store import SeatHoldStoreUnavailable
 from .services import StripeService
 
 logger = logging.getLogger(__name__)
@@ -25,16 +25,21 @@ class AmphitheaterCheckoutService:
         Returns order and payment intent for checkout.
         """
         try:
-            hold = SeatHold.objects.select_for_update().get(id=hold_id, is_active=True)
-        except SeatHold.DoesNotExist:
+            hold = AmphitheaterService.get_hold(hold_id)
+        except SeatHoldStoreUnavailable:
+            return {
+                'success': False,
+                'error': 'Seat holds are temporarily unavailable'
+            }
+        if hold is None:
             return {
                 'success': False,
                 'error': 'Seat hold not found or expired'
             }
         
         # Get or create amphitheater ticket type for this event
-        event_date = hold.seat_block.event_date
-        section_name = hold.seat_block.section.name
+        event_date = hold['event_date']
+        section_name = hold['section_name']
         
         ticket_type_name = f"Pacific Amphitheatre - {event_date.strftime('%B %d, %Y')} - {section_name}"
         ticket_type_slug = f"amphitheater-{event_date.strftime('%Y-%m-%d')}-{section_name.lower().replace(' ', '-')}"
@@ -44,7 +49,7 @@ class AmphitheaterCheckoutService:
             defaults={
                 'name': ticket_type_name,
                 'description': f'Pacific Amphitheatre concert ticket with same-day festival access',
-                'price_cents': hold.seat_block.price_cents,
+                'price_cents': hold['price_cents'],
                 'capacity': 100000,  # Managed by seat blocks
                 'is_active': True,
                 'valid_days': [event_date.strftime('%A')],
@@ -59,13 +64,13 @@ class AmphitheaterCheckoutService:
             'items': [
                 {
                     'ticket_type_id': str(ticket_type.id),
-                    'quantity': hold.quantity,
+                    'quantity': hold['quantity'],
                 }
             ],
             'billing_details': billing_details or {},
             'metadata': {
                 'amphitheater': True,
-                'seat_hold_id': str(hold.id),
+                'seat_hold_id': hold['id'],
                 'event_date': str(event_date),
                 'section': section_name,
             }
@@ -74,7 +79,7 @@ class AmphitheaterCheckoutService:
         order = OrderService.create_order(
             buyer=user,
             items=order_data['items'],
-            idempotency_key=f"amph-hold-{hold.id}",
+            idempotency_key=f"amph-hold-{hold['id']}",
             metadata=order_data['metadata']
         )
         
@@ -84,7 +89,7 @@ class AmphitheaterCheckoutService:
                 order=order,
                 metadata={
                     'amphitheater': 'true',
-                    'seat_hold_id': str(hold.id),
+                    'seat_hold_id': hold['id'],
                     'event_date': str(event_date),
                 }
             )
@@ -103,8 +108,8 @@ class AmphitheaterCheckoutService:
             'total': order.total_cents / 100,
             'client_secret': payment_result.get('client_secret'),
             'payment_intent_id': payment_result.get('payment_intent_id'),
-            'hold_id': str(hold.id),
-            'expires_at': hold.expires_at.isoformat(),
+            'hold_id': hold['id'],
+            'expires_at': hold['expires_at'].isoformat(),
         }
     
     @staticmethod
@@ -155,18 +160,9 @@ class AmphitheaterCheckoutService:
             order.stripe_payment_intent_id = payment_intent_id
         order.save(update_fields=['status', 'stripe_payment_intent_id'])
         
-        # Send confirmation email (includes amphitheater tickets)
-        from apps.tickets.email_service import TicketEmailService
-        from threading import Thread
-        
-        try:
-            email_thread = Thread(
-                target=TicketEmailService.send_order_confirmation,
-                args=(order,)
-            )
-            email_thread.start()
-        except Exception as e:
-            logger.error(f"Failed to queue confirmation email: {e}")
+        # Queue confirmation email (includes amphitheater tickets)
+        from apps.tickets.outbox_service import EmailOutboxService
+        EmailOutboxService.enqueue_order_confirmation(order)
         
         logger.info(f"Finalized amphitheater order {order.order_number} with {len(amphitheater_tickets)} tickets")
         
@@ -9,6 +9,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from drf_spectacular.utils import extend_schema
 
 from .amphitheater_checkout import AmphitheaterCheckoutService
+from .idempotency import idempotent_response
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,7 @@ class AmphitheaterCheckoutView(APIView):
             }
         }
     )
+    @idempotent_response
     def post(self, request):
         hold_id = request.data.get('hold_id')
         billing_details = request.data.get('billing_details', {})
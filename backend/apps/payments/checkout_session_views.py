@@ -13,6 +13,9 @@ from drf_spectacular.utils import extend_schema
 from apps.tickets.models import Order
 from apps.tickets.services import OrderService
 from .guest_checkout import GuestCheckoutService
+from .services import StripeService
+from .idempotency import idempotent_response
+from .waiting_room import WaitingRoomService, HasCheckoutAdmission, get_admission_token
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +24,11 @@ stripe.api_key = settings.STRIPE_SECRET_KEY
 
 class CreateCheckoutSessionView(APIView):
     """Create Stripe Checkout Session for hosted checkout."""
-    permission_classes = [AllowAny]
+    permission_classes = [AllowAny, HasCheckoutAdmission]
     authentication_classes = []
     
     @extend_schema(summary="Create Stripe Checkout Session")
+    @idempotent_response
     def post(self, request):
         try:
             data = request.data
@@ -104,6 +108,8 @@ class CreateCheckoutSessionView(APIView):
             order.stripe_payment_intent_id = session.id
             order.save(update_fields=['stripe_payment_intent_id'])
             
+            WaitingRoomService.release(get_admission_token(request))
+            
             return Response({
                 'success': True,
                 'data': {
@@ -132,25 +138,9 @@ class CheckoutSessionWebhookView(APIView):
         sig_header = request.META.get('HTTP_STRIPE_SIGNATURE')
         
         try:
-            event = stripe.Webhook.construct_event(
-                payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
-            )
-        except ValueError:
-            return Response({'error': 'Invalid payload'}, status=400)
-        except stripe.error.SignatureVerificationError:
-            return Response({'error': 'Invalid signature'}, status=400)
-        
-        # Handle checkout.session.completed
-        if event['type'] == 'checkout.session.completed':
-            session = event['data']['object']
-            order_id = session.get('client_reference_id')
-            
-            if order_id:
-                try:
-                    # Finalize order and issue tickets
-                    OrderService.finalize_order(order_id, session.id)
-                    logger.info(f"Order {order_id} finalized via Checkout Session webhook")
-                except Exception as e:
-                    logger.error(f"Error finalizing order {order_id}: {e}")
+            # checkout.session.completed is finalized by the Stripe event processor
+            StripeService.ingest_webhook_event(payload, sig_header)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
         
         return Response({'success': True})
@@ -0,0 +1,379 @@
+"""
+Local stand-in for the Stripe API, for tests and benchmarks.
+Run with: python manage.py fake_stripe, then set STRIPE_API_BASE=http://127.0.0.1:<port>
+and a test secret key (STRIPE_SECRET_KEY=sk_test_fake) so checkout leaves demo mode.
+
+Covers payment intents (create/retrieve/confirm), checkout sessions
+(create/retrieve), refunds, and webhook delivery signed like Stripe's.
+Checkout sessions are paid with POST /_fake/checkout/sessions/<id>/complete,
+standing in for the hosted payment page.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qsl
+
+logger = logging.getLogger(__name__)
+
+
+def _new_id(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+
+def decode_form(body: str) -> dict:
+    """Decode Stripe's form encoding (metadata[key]=v, line_items[0][quantity]=1) into nested data."""
+    data = {}
+    for key, value in parse_qsl(body, keep_blank_values=True):
+        parts = re.findall(r'[^\[\]]+', key)
+        node = data
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+
+    def listify(node):
+        if not isinstance(node, dict):
+            return node
+        node = {key: listify(value) for key, value in node.items()}
+        if node and all(key.isdigit() for key in node):
+            return [node[key] for key in sorted(node, key=int)]
+        return node
+
+    return listify(data)
+
+
+def sign_payload(payload: str, secret: str, timestamp: Optional[int] = None) -> str:
+    """Stripe-Signature header value for a webhook payload."""
+    timestamp = timestamp or int(time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+class FakeStripeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    ROUTES = [
+        ('POST', r'^/v1/payment_intents$', 'create_payment_intent'),
+        ('GET', r'^/v1/payment_intents/(?P<id>[\w]+)$', 'retrieve_payment_intent'),
+        ('POST', r'^/v1/payment_intents/(?P<id>[\w]+)/confirm$', 'confirm_payment_intent'),
+        ('POST', r'^/v1/checkout/sessions$', 'create_checkout_session'),
+        ('GET', r'^/v1/checkout/sessions/(?P<id>[\w]+)$', 'retrieve_checkout_session'),
+        ('POST', r'^/_fake/checkout/sessions/(?P<id>[\w]+)/complete$', 'complete_checkout_session'),
+        ('POST', r'^/v1/refunds$', 'create_refund'),
+    ]
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status_code: int, body: dict = None, headers: dict = None):
+        payload = json.dumps(body).encode() if body else b''
+        self.send_response(status_code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self, status_code: int, message: str, error_type: str = 'invalid_request_error'):
+        self._reply(status_code, {'error': {'type': error_type, 'message': message}})
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method: str):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        params = decode_form(self.rfile.read(length).decode()) if length else {}
+        path = self.path.split('?', 1)[0]
+
+        for route_method, pattern, action in self.ROUTES:
+            match = re.match(pattern, path)
+            if match and route_method == method:
+                break
+        else:
+            return self._error(404, f'Unrecognized request URL ({method}: {path})')
+
+        if not path.startswith('/_fake/') and not self.headers.get('Authorization', '').startswith('Bearer '):
+            return self._error(401, 'You did not provide an API key.')
+
+        if server.latency:
+            time.sleep(server.latency)
+        if server.should_fail():
+            return self._error(500, 'Injected failure', 'api_error')
+
+        idempotency_key = self.headers.get('Idempotency-Key') if method == 'POST' else None
+        if idempotency_key:
+            with server.lock:
+                cached = server.idempotent_responses.get((path, idempotency_key))
+            if cached:
+                return self._reply(*cached)
+
+        status_code, body = getattr(server, action)(params, **match.groupdict())
+        if idempotency_key and status_code < 500:
+            with server.lock:
+                server.idempotent_responses[(path, idempotency_key)] = (status_code, body)
+        self._reply(status_code, body)
+
+
+class FakeStripeServer(ThreadingHTTPServer):
+    """
+    Keeps Stripe objects in memory and sends signed webhook events.
+    latency adds a delay per API request; failure_rate answers that fraction of
+    API requests with a 500; decline_rate declines that fraction of payments.
+    Events go to webhook_url after webhook_delay seconds, or are only recorded
+    in `events` when no URL is set.
+    """
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        webhook_url: str = None,
+        webhook_secret: str = 'whsec_fake',
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        decline_rate: float = 0.0,
+        webhook_delay: float = 0.0,
+        seed: int = None,
+    ):
+        super().__init__((host, port), FakeStripeHandler)
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.decline_rate = decline_rate
+        self.webhook_delay = webhook_delay
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.payment_intents = {}
+        self.checkout_sessions = {}
+        self.refunds = {}
+        self.idempotent_responses = {}
+        self.events = []
+        self.delivery_failures = 0
+        self._deliveries = queue.Queue()
+        self._delivery_threads = []
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.failure_rate
+
+    def _declined(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.decline_rate
+
+    # Payment intents
+
+    def create_payment_intent(self, params):
+        if not params.get('amount'):
+            return 400, {'error': {'type': 'invalid_request_error', 'message': 'Missing required param: amount.'}}
+        intent_id = _new_id('pi')
+        intent = {
+            'id': intent_id,
+            'object': 'payment_intent',
+            'amount': int(params['amount']),
+            'currency': params.get('currency', 'usd'),
+            'metadata': params.get('metadata', {}),
+            'client_secret': f"{intent_id}_secret_{uuid.uuid4().hex[:24]}",
+            'status': 'requires_payment_method',
+            'latest_charge': None,
+            'created': int(time.time()),
+        }
+        with self.lock:
+            self.payment_intents[intent_id] = intent
+        return 200, intent
+
+    def retrieve_payment_intent(self, params, id):
+        with self.lock:
+            intent = self.payment_intents.get(id)
+        if not intent:
+            return 404, {'error': {'type': 'invalid_request_error', 'message': f"No such payment_intent: '{id}'"}}
+        return 200, intent
+
+    def confirm_payment_intent(self, params, id):
+        status_code, intent = self.retrieve_payment_intent(params, id)
+        if status_code != 200 or intent['status'] == 'succeeded':
+            return status_code, intent
+
+        if self._declined() or params.get('payment_method') == 'pm_card_chargeDeclined':
+            with self.lock:
+                intent['status'] = 'requires_payment_method'
+                intent['last_payment_error'] = {'code': 'card_declined', 'message': 'Your card was declined.'}
+            self.send_event('payment_intent.payment_failed', intent)
+            return 402, {'error': {'type': 'card_error', 'code': 'card_declined', 'message': 'Your card was declined.'}}
+
+        with self.lock:
+            intent['status'] = 'succeeded'
+            intent['latest_charge'] = _new_id('ch')
+            intent.pop('last_payment_error', None)
+        self.send_event('payment_intent.succeeded', intent)
+        return 200, intent
+
+    # Checkout sessions
+
+    def create_checkout_session(self, params):
+        session_id = _new_id('cs_test')
+        line_items = params.get('line_items', [])
+        session = {
+            'id': session_id,
+            'object': 'checkout.session',
+            'mode': params.get('mode', 'payment'),
+            'client_reference_id': params.get('client_reference_id'),
+            'customer_email': params.get('customer_email'),
+            'metadata': params.get('metadata', {}),
+            'amount_total': sum(
+                int(item.get('price_data', {}).get('unit_amount', 0)) * int(item.get('quantity', 1))
+                for item in line_items
+            ),
+            'payment_status': 'unpaid',
+            'status': 'open',
+            'payment_intent': None,
+            'success_url': params.get('success_url'),
+            'url': f"{self.url}/_fake/checkout/sessions/{session_id}",
+            'created': int(time.time()),
+        }
+        with self.lock:
+            self.checkout_sessions[session_id] = session
+        return 200, session
+
+    def retrieve_checkout_session(self, params, id):
+        with self.lock:
+            session = self.checkout_sessions.get(id)
+        if not session:
+            return 404, {'error': {'type': 'invalid_request_error', 'message': f"No such checkout.session: '{id}'"}}
+        return 200, session
+
+    def complete_checkout_session(self, params, id):
+        status_code, session = self.retrieve_checkout_session(params, id)
+        if status_code != 200 or session['status'] == 'complete':
+            return status_code, session
+
+        if self._declined():
+            return 402, {'error': {'type': 'card_error', 'code': 'card_declined', 'message': 'Your card was declined.'}}
+
+        with self.lock:
+            session['status'] = 'complete'
+            session['payment_status'] = 'paid'
+            session['payment_intent'] = _new_id('pi')
+        self.send_event('checkout.session.completed', session)
+        return 200, session
+
+    # Refunds
+
+    def create_refund(self, params):
+        with self.lock:
+            intent = self.payment_intents.get(params.get('payment_intent'))
+        if not intent or intent['status'] != 'succeeded':
+            return 400, {'error': {'type': 'invalid_request_error', 'message': 'This PaymentIntent has not been charged.'}}
+
+        refund = {
+            'id': _new_id('re'),
+            'object': 'refund',
+            'amount': int(params.get('amount') or intent['amount']),
+            'currency': intent['currency'],
+            'payment_intent': intent['id'],
+            'charge': intent['latest_charge'],
+            'reason': params.get('reason'),
+            'metadata': params.get('metadata', {}),
+            'status': 'succeeded',
+            'created': int(time.time()),
+        }
+        with self.lock:
+            self.refunds[refund['id']] = refund
+            refunded = sum(r['amount'] for r in self.refunds.values() if r['payment_intent'] == intent['id'])
+        self.send_event('charge.refunded', {
+            'id': intent['latest_charge'],
+            'object': 'charge',
+            'amount': intent['amount'],
+            'amount_refunded': refunded,
+            'refunded': refunded >= intent['amount'],
+            'payment_intent': intent['id'],
+            'metadata': intent['metadata'],
+        })
+        return 200, refund
+
+    # Webhooks
+
+    def send_event(self, event_type: str, data: dict) -> dict:
+        """Record an event and queue it for signed delivery."""
+        with self.lock:
+            event = {
+                'id': _new_id('evt'),
+                'object': 'event',
+                'type': event_type,
+                'created': int(time.time()),
+                'data': {'object': json.loads(json.dumps(data))},
+            }
+            payload = json.dumps(event)
+            self.events.append({
+                'event': event,
+                'payload': payload,
+                'signature': sign_payload(payload, self.webhook_secret),
+            })
+        if self.webhook_url:
+            self._deliveries.put((time.monotonic() + self.webhook_delay, payload))
+        return event
+
+    def _deliver_forever(self):
+        while True:
+            due, payload = self._deliveries.get()
+            if payload is None:
+                return
+            time.sleep(max(0.0, due - time.monotonic()))
+            request = urllib.request.Request(
+                self.webhook_url,
+                data=payload.encode(),
+                headers={
+                    'Content-Type': 'application/json',
+                    # Signed at send time like Stripe, so delayed events stay inside the tolerance
+                    'Stripe-Signature': sign_payload(payload, self.webhook_secret),
+                },
+                method='POST'
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+            except Exception as e:
+                with self.lock:
+                    self.delivery_failures += 1
+                logger.warning(f"Fake Stripe webhook delivery failed: {e}")
+
+    def start_delivery(self, workers: int = 4) -> None:
+        """Deliver queued webhooks from background threads."""
+        for _ in range(workers):
+            thread = threading.Thread(target=self._deliver_forever, daemon=True)
+            thread.start()
+            self._delivery_threads.append(thread)
+
+    def start(self, delivery_workers: int = 4) -> 'FakeStripeServer':
+        """Serve and deliver webhooks from background threads."""
+        self.start_delivery(delivery_workers)
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        for _ in self._delivery_threads:
+            self._deliveries.put((0, None))
+        self.shutdown()
+        self.server_close()
@@ -3,8 +3,9 @@ Guest checkout service for allowing purchases without forced registration.
 Users can checkout as guests and accounts are created automatically.
 """
 import logging
-from django.db import transaction
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
 
 from apps.accounts.models import UserRole
 
@@ -15,46 +16,69 @@ logger = logging.getLogger(__name__)
 class GuestCheckoutService:
     """Service for handling guest checkout flow."""
     
+    # How long an email -> user id lookup is cached
+    USER_ID_CACHE_TIMEOUT = 60 * 60
+    
     @staticmethod
-    @transaction.atomic
-    def get_or_create_user(email: str, full_name: str, phone: str = '') -> tuple[User, bool]:
+    def user_id_cache_key(email: str) -> str:
+        return f"guest_checkout:user_id:{email}"
+    
+    @classmethod
+    def _cached_user(cls, email: str):
+        try:
+            user_id = cache.get(cls.user_id_cache_key(email))
+        except Exception as e:
+            logger.warning(f"Guest user cache unavailable: {e}")
+            return None
+        if user_id is None:
+            return None
+        # The email check guards against a user having changed their address since
+        return User.objects.filter(id=user_id, email=email).first()
+    
+    @classmethod
+    def get_or_create_user(cls, email: str, full_name: str, phone: str = '') -> tuple[User, bool]:
         """
         Get existing user or create a new one for guest checkout.
         Returns (user, created) tuple.
         
         This allows users to checkout without explicitly registering first.
         If they already have an account, we use it. Otherwise, we create one.
+        New accounts get an unusable password (no hashing); guests set one
+        through the password reset link. Creation is an insert that ignores
+        conflicts on email, so concurrent checkouts for the same email don't race.
         """
         email = email.lower().strip()
+        created = False
         
-        # Check if user already exists
-        user = User.objects.filter(email=email).first()
-        
-        if user:
-            # User exists - update name if provided and different
-            if full_name and user.full_name != full_name:
-                user.full_name = full_name
-                user.save(update_fields=['full_name'])
-            
-            logger.info(f"Existing user found for guest checkout: {email}")
-            return user, False
+        user = cls._cached_user(email)
+        if user is None:
+            new_user = User(
+                email=email,
+                full_name=full_name or 'Guest',
+                phone=phone,
+                role=UserRole.ATTENDEE,
+                is_email_verified=False,  # They'll verify via email link
+                password=make_password(None)
+            )
+            User.objects.bulk_create([new_user], ignore_conflicts=True)
+            user = User.objects.get(email=email)
+            created = user.id == new_user.id
+            try:
+                cache.set(cls.user_id_cache_key(email), user.id, timeout=cls.USER_ID_CACHE_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Failed to cache guest user {email}: {e}")
         
-        # Create new user account
-        # Generate a random password - user can reset it later if they want to login
-        import secrets
-        temp_password = secrets.token_urlsafe(32)
+        if created:
+            logger.info(f"New user created for guest checkout: {email}")
+            return user, True
         
-        user = User.objects.create_user(
-            email=email,
-            password=temp_password,
-            full_name=full_name or 'Guest',
-            phone=phone,
-            role=UserRole.ATTENDEE,
-            is_email_verified=False  # They'll verify via email link
-        )
+        # User exists - update name if provided and different
+        if full_name and user.full_name != full_name:
+            user.full_name = full_name
+            User.objects.filter(id=user.id).update(full_name=full_name)
         
-        logger.info(f"New user created for guest checkout: {email}")
-        return user, True
+        logger.info(f"Existing user found for guest checkout: {email}")
+        return user, False
     
     @staticmethod
     def send_account_created_email(user: User, order_number: str) -> bool:
@@ -0,0 +1,164 @@
+"""
+Idempotent responses for checkout endpoints.
+The first response for an (endpoint, buyer, idempotency key) is stored in the
+cache; retries are replayed from there without touching the database or
+Stripe. Concurrent duplicates wait on the first request through a cache lock.
+The lock holds a token unique to its request, and is only deleted by that
+request, so one whose lock expired can't release a later request's lock.
+"""
+import functools
+import hashlib
+import json
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+REPLAY_HEADER = 'Idempotent-Replayed'
+
+# Deletes KEYS[1] only if it still holds ARGV[1]
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _fingerprint(data) -> str:
+    try:
+        body = json.dumps(data, sort_keys=True, default=str)
+    except (TypeError, ValueError):
+        body = repr(data)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _scope(request) -> str:
+    """Who the key belongs to: the logged-in user, else the guest's email."""
+    if request.user and request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    email = request.data.get('email') if hasattr(request.data, 'get') else None
+    return f"guest:{(email or '').strip().lower()}"
+
+
+def _idempotency_key(request):
+    key = request.headers.get('Idempotency-Key')
+    if not key and hasattr(request.data, 'get'):
+        key = request.data.get('idempotency_key')
+    return key
+
+
+def _digest(view, request, key) -> str:
+    return hashlib.sha256(f"{type(view).__name__}:{_scope(request)}:{key}".encode()).hexdigest()
+
+
+def has_stored_response(view, request) -> bool:
+    """Whether this request is a retry that idempotent_response would replay."""
+    key = _idempotency_key(request)
+    if not key:
+        return False
+    try:
+        return cache.get(f"idempotency:response:{_digest(view, request, key)}") is not None
+    except Exception:
+        return False
+
+
+def _release_lock(lock_key: str, token: str) -> None:
+    """Delete a lock only if it still holds our token, atomically on Redis."""
+    client = getattr(cache, 'client', None)
+    if hasattr(client, 'get_client'):
+        client.get_client(write=True).eval(
+            RELEASE_LOCK_SCRIPT, 1, client.make_key(lock_key), client.encode(token)
+        )
+    elif cache.get(lock_key) == token:
+        # In-process caches (tests and local development)
+        cache.delete(lock_key)
+
+
+def idempotent_response(view_method=None, *, ttl: int = None, lock_timeout: int = None, wait: float = 10.0):
+    """
+    Decorator for APIView handlers that take an idempotency key
+    (Idempotency-Key header or idempotency_key in the body).
+
+    - Successful responses are cached for ttl seconds and replayed on retry.
+    - A retry while the first request is running waits up to `wait` seconds for
+      its response, then gets a 409. The first request's lock is held for
+      lock_timeout seconds, by default IDEMPOTENCY_LOCK_TIMEOUT.
+    - Reusing a key with a different body is rejected with a 422.
+    - If the cache is unavailable the request runs normally.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            key = _idempotency_key(request)
+            if not key:
+                return method(self, request, *args, **kwargs)
+
+            digest = _digest(self, request, key)
+            response_key = f"idempotency:response:{digest}"
+            lock_key = f"idempotency:lock:{digest}"
+            fingerprint = _fingerprint(request.data)
+            token = uuid.uuid4().hex
+
+            try:
+                cached = cache.get(response_key)
+                locked = cached is None and cache.add(
+                    lock_key, token, timeout=lock_timeout or getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT', 60)
+                )
+            except Exception as e:
+                logger.warning(f"Idempotency cache unavailable: {e}")
+                return method(self, request, *args, **kwargs)
+
+            if cached is None and not locked:
+                # Another request with this key is in flight; wait for its response
+                deadline = time.monotonic() + wait
+                while cached is None and time.monotonic() < deadline:
+                    time.sleep(0.1)
+                    cached = cache.get(response_key)
+                if cached is None:
+                    return Response({
+                        'success': False,
+                        'error': {'message': 'A request with this idempotency key is already in progress'}
+                    }, status=status.HTTP_409_CONFLICT)
+
+            if cached is not None:
+                if cached['fingerprint'] != fingerprint:
+                    return Response({
+                        'success': False,
+                        'error': {'message': 'Idempotency key was already used with a different request'}
+                    }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+                response = Response(cached['data'], status=cached['status'])
+                response[REPLAY_HEADER] = 'true'
+                return response
+
+            try:
+                response = method(self, request, *args, **kwargs)
+                # Only successes are replayed; errors like "sales not open" may clear up on retry
+                if 200 <= response.status_code < 300:
+                    try:
+                        cache.set(response_key, {
+                            'status': response.status_code,
+                            'data': response.data,
+                            'fingerprint': fingerprint,
+                        }, timeout=ttl or getattr(settings, 'IDEMPOTENCY_RESPONSE_TTL', 60 * 60 * 24))
+                    except Exception as e:
+                        logger.warning(f"Failed to cache idempotent response: {e}")
+                return response
+            finally:
+                try:
+                    _release_lock(lock_key, token)
+                except Exception as e:
+                    # The lock expires on its own
+                    logger.warning(f"Failed to release idempotency lock: {e}")
+
+        return wrapper
+
+    if view_method is not None:
+        return decorator(view_method)
+    return decorator
@@ -0,0 +1,80 @@
+"""
+Management command to run a local fake Stripe API for tests and benchmarks.
+Usage: python manage.py fake_stripe [--port 12111] [--webhook-url http://127.0.0.1:8000/api/payments/webhook/stripe/]
+       [--latency-ms 0] [--failure-rate 0] [--decline-rate 0] [--webhook-delay-ms 0]
+"""
+from django.core.management.base import BaseCommand
+
+from apps.payments.fake_stripe import FakeStripeServer
+
+
+class Command(BaseCommand):
+    help = 'Run a local fake Stripe API that delivers signed webhooks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=12111)
+        parser.add_argument(
+            '--webhook-url',
+            default='http://127.0.0.1:8000/api/payments/webhook/stripe/',
+            help='Where events are delivered (empty to only record them)',
+        )
+        parser.add_argument('--webhook-secret', default='whsec_fake')
+        parser.add_argument(
+            '--latency-ms',
+            type=int,
+            default=0,
+            help='Delay added to every API request',
+        )
+        parser.add_argument(
+            '--failure-rate',
+            type=float,
+            default=0.0,
+            help='Fraction of API requests answered with a 500',
+        )
+        parser.add_argument(
+            '--decline-rate',
+            type=float,
+            default=0.0,
+            help='Fraction of payments declined',
+        )
+        parser.add_argument(
+            '--webhook-delay-ms',
+            type=int,
+            default=0,
+            help='Delay before each webhook is delivered',
+        )
+        parser.add_argument('--delivery-workers', type=int, default=4)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        server = FakeStripeServer(
+            host=options['host'],
+            port=options['port'],
+            webhook_url=options['webhook_url'] or None,
+            webhook_secret=options['webhook_secret'],
+            latency=options['latency_ms'] / 1000,
+            failure_rate=options['failure_rate'],
+            decline_rate=options['decline_rate'],
+            webhook_delay=options['webhook_delay_ms'] / 1000,
+            seed=options['seed']
+        )
+        server.start_delivery(options['delivery_workers'])
+
+        self.stdout.write(self.style.SUCCESS(f'Fake Stripe listening on {server.url}'))
+        self.stdout.write(
+            f'Run the API with STRIPE_API_BASE={server.url} STRIPE_SECRET_KEY=sk_test_fake '
+            f'STRIPE_WEBHOOK_SECRET={server.webhook_secret}'
+        )
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(
+                f'Created {len(server.payment_intents)} payment intents, '
+                f'{len(server.checkout_sessions)} checkout sessions, {len(server.refunds)} refunds; '
+                f'sent {len(server.events)} events ({server.delivery_failures} delivery failures)'
+            )
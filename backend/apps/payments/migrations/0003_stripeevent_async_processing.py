@@ -0,0 +1,32 @@
+# Generated migration to record Stripe events for asynchronous, per-order processing
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_paymentattempt_payment_att_order_i_dd2ec6_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stripeevent',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='stripeevent',
+            name='order_key',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='stripeevent',
+            name='event_created',
+            field=models.DateTimeField(blank=True, help_text='When Stripe created the event', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='stripeevent',
+            index=models.Index(fields=['order_key', 'processed'], name='stripe_even_order_k_aaf002_idx'),
+        ),
+    ]
@@ -9,16 +9,22 @@ from django.utils import timezone
 
 class StripeEvent(models.Model):
     """
-    Track processed Stripe webhook events for idempotency.
+    Track Stripe webhook events for idempotency.
+    Events are recorded on receipt and processed asynchronously, in order per order_key.
     """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     stripe_event_id = models.CharField(max_length=100, unique=True)
     event_type = models.CharField(max_length=100, db_index=True)
     processed = models.BooleanField(default=False)
     processing_error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    
+    # Order the event belongs to (falls back to the Stripe object id); events sharing it run in order
+    order_key = models.CharField(max_length=100, blank=True, default='')
     
     payload = models.JSONField(default=dict)
     
+    event_created = models.DateTimeField(null=True, blank=True, help_text='When Stripe created the event')
     received_at = models.DateTimeField(default=timezone.now)
     processed_at = models.DateTimeField(null=True, blank=True)
     
@@ -28,6 +34,7 @@ class StripeEvent(models.Model):
             models.Index(fields=['stripe_event_id']),
             models.Index(fields=['event_type', 'processed']),
             models.Index(fields=['received_at']),
+            models.Index(fields=['order_key', 'processed']),
         ]
     
     def __str__(self):
@@ -2,14 +2,19 @@
 Payment services for Stripe integration.
 Supports both real Stripe and sandbox/demo mode for stakeholder demos.
 """
+import json
 import logging
 import uuid
+import zlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Optional
 import stripe
 from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
 from apps.tickets.models import Order, TicketType
+from apps.tickets.inventory_service import InventoryService
 from apps.tickets.services import OrderService
 from .models import StripeEvent, PaymentAttempt
 
@@ -21,6 +26,8 @@ DEMO_MODE = not STRIPE_CONFIGURED
 
 if STRIPE_CONFIGURED:
     stripe.api_key = settings.STRIPE_SECRET_KEY
+    stripe.api_base = settings.STRIPE_API_BASE
+    stripe.default_http_client = stripe.new_default_http_client(timeout=settings.STRIPE_REQUEST_TIMEOUT)
     logger.info("Stripe configured with real credentials")
 else:
     logger.warning("Stripe not configured - running in DEMO MODE")
@@ -174,14 +181,16 @@ class StripeService:
             logger.error(f"Stripe refund error: {e}")
             raise ValueError(str(e))
     
-    @classmethod
-    @transaction.atomic
-    def handle_webhook_event(cls, payload: bytes, sig_header: str) -> dict:
-        """
-        Handle Stripe webhook events idempotently.
-        """
+    # Unprocessed events older than this are re-queued by the sweeper
+    EVENT_REQUEUE_AFTER = timedelta(minutes=1)
+    # Events that keep failing are left for manual review after this many tries
+    MAX_EVENT_ATTEMPTS = 10
+    
+    @staticmethod
+    def _construct_event(payload: bytes, sig_header: str):
+        """Verify the webhook signature and parse the event."""
         try:
-            event = stripe.Webhook.construct_event(
+            return stripe.Webhook.construct_event(
                 payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
             )
         except ValueError as e:
@@ -190,38 +199,118 @@ class StripeService:
         except stripe.error.SignatureVerificationError as e:
             logger.error(f"Invalid webhook signature: {e}")
             raise ValueError("Invalid signature")
+    
+    @staticmethod
+    def event_order_key(event) -> str:
+        """Key that orders events: our order id, else the Stripe payment intent or object id."""
+        data = event.data.object
+        metadata = data.get('metadata') or {}
+        return str(
+            metadata.get('order_id')
+            or data.get('client_reference_id')
+            or data.get('payment_intent')
+            or data.get('id')
+            or ''
+        )[:100]
+    
+    @staticmethod
+    def event_queue(order_key: str) -> Optional[str]:
+        """Celery queue for an order's events; None means the default queue."""
+        partitions = getattr(settings, 'STRIPE_EVENT_QUEUE_PARTITIONS', 0)
+        if not partitions:
+            return None
+        return f"stripe-events-{zlib.crc32(order_key.encode()) % partitions}"
+    
+    @classmethod
+    def ingest_webhook_event(cls, payload: bytes, sig_header: str) -> dict:
+        """
+        Verify and durably record a webhook event, then queue it for processing.
+        Returns as soon as the event is stored so Stripe gets a fast acknowledgement.
+        """
+        event = cls._construct_event(payload, sig_header)
+        order_key = cls.event_order_key(event)
         
-        # Check if already processed (idempotency)
-        stripe_event_id = event.id
-        existing = StripeEvent.objects.filter(stripe_event_id=stripe_event_id).first()
-        
-        if existing and existing.processed:
-            logger.info(f"Event {stripe_event_id} already processed")
-            return {'status': 'already_processed'}
+        with transaction.atomic():
+            # INSERT ... ON CONFLICT DO NOTHING: redeliveries don't create duplicates
+            StripeEvent.objects.bulk_create([
+                StripeEvent(
+                    stripe_event_id=event.id,
+                    event_type=event.type,
+                    order_key=order_key,
+                    payload=json.loads(payload),
+                    event_created=datetime.fromtimestamp(event.created, tz=dt_timezone.utc) if event.get('created') else None
+                )
+            ], ignore_conflicts=True)
+            
+            if StripeEvent.objects.filter(stripe_event_id=event.id, processed=True).exists():
+                logger.info(f"Event {event.id} already processed")
+                return {'status': 'already_processed'}
+            
+            transaction.on_commit(lambda: cls.enqueue_order_events(order_key))
         
-        # Create or get event record
-        stripe_event, created = StripeEvent.objects.get_or_create(
-            stripe_event_id=stripe_event_id,
-            defaults={
-                'event_type': event.type,
-                'payload': event.data.object
-            }
-        )
+        return {'status': 'queued'}
+    
+    @classmethod
+    def enqueue_order_events(cls, order_key: str) -> None:
+        """Queue processing of an order's pending events on its partition."""
+        from .tasks import process_stripe_events
         
         try:
-            result = cls._process_event(event)
-            
-            stripe_event.processed = True
-            stripe_event.processed_at = timezone.now()
-            stripe_event.save()
-            
-            return result
-            
+            process_stripe_events.apply_async(args=[order_key], queue=cls.event_queue(order_key))
         except Exception as e:
-            logger.error(f"Error processing webhook {stripe_event_id}: {e}")
-            stripe_event.processing_error = str(e)
-            stripe_event.save()
-            raise
+            # The event is stored; the sweeper will queue it again
+            logger.error(f"Failed to queue Stripe events for {order_key}: {e}")
+    
+    @classmethod
+    def process_order_events(cls, order_key: str) -> dict:
+        """
+        Process an order's pending events in the order Stripe created them.
+        The rows stay locked throughout, so concurrent workers can't interleave
+        events for the same order. Stops at the first failure to keep later
+        events behind it. Processed events are never picked up again, so
+        redeliveries and repeated runs are no-ops.
+        """
+        processed = 0
+        with transaction.atomic():
+            events = StripeEvent.objects.select_for_update().filter(
+                order_key=order_key,
+                processed=False
+            ).order_by('event_created', 'received_at')
+            
+            for stripe_event in events:
+                stripe_event.attempts += 1
+                try:
+                    with transaction.atomic():
+                        event = stripe.Event.construct_from(stripe_event.payload, stripe.api_key)
+                        cls._process_event(event)
+                except Exception as e:
+                    logger.error(f"Error processing webhook {stripe_event.stripe_event_id}: {e}")
+                    stripe_event.processing_error = str(e)
+                    stripe_event.save(update_fields=['attempts', 'processing_error'])
+                    return {'processed': processed, 'failed': stripe_event.stripe_event_id}
+                
+                stripe_event.processed = True
+                stripe_event.processed_at = timezone.now()
+                stripe_event.processing_error = ''
+                stripe_event.save(update_fields=['attempts', 'processed', 'processed_at', 'processing_error'])
+                processed += 1
+        
+        return {'processed': processed, 'failed': None}
+    
+    @classmethod
+    def requeue_pending_events(cls) -> int:
+        """Queue orders with events that should have been processed by now."""
+        order_keys = StripeEvent.objects.filter(
+            processed=False,
+            received_at__lt=timezone.now() - cls.EVENT_REQUEUE_AFTER,
+            attempts__lt=cls.MAX_EVENT_ATTEMPTS
+        ).values_list('order_key', flat=True).distinct()
+        
+        count = 0
+        for order_key in order_keys:
+            cls.enqueue_order_events(order_key)
+            count += 1
+        return count
     
     @classmethod
     def _process_event(cls, event) -> dict:
@@ -238,6 +327,9 @@ class StripeService:
         elif event_type == 'charge.refunded':
             return cls._handle_refund(data)
         
+        elif event_type == 'checkout.session.completed':
+            return cls._handle_checkout_session_completed(data)
+        
         else:
             logger.info(f"Unhandled event type: {event_type}")
             return {'status': 'ignored', 'event_type': event_type}
@@ -292,12 +384,29 @@ class StripeService:
         )
         
         # Update order status
+        orders = list(Order.objects.filter(stripe_payment_intent_id=payment_intent_id))
         Order.objects.filter(
             stripe_payment_intent_id=payment_intent_id
         ).update(status=Order.Status.FAILED)
         
+        # Hand reserved tickets back to inventory
+        for order in orders:
+            InventoryService.release_order(order)
+        
         return {'status': 'failed_recorded'}
     
+    @classmethod
+    def _handle_checkout_session_completed(cls, data) -> dict:
+        """Handle completed hosted checkout - finalize order and issue tickets."""
+        order_id = data.get('client_reference_id')
+        if not order_id:
+            logger.error(f"Checkout session {data.id} missing client_reference_id")
+            return {'status': 'error', 'message': 'Missing client_reference_id'}
+        
+        order = OrderService.finalize_order(order_id, data.id)
+        logger.info(f"Order {order.order_number} finalized via Checkout Session webhook")
+        return {'status': 'success', 'order_number': order.order_number}
+    
     @classmethod
     def _handle_refund(cls, data) -> dict:
         """Handle refund event."""
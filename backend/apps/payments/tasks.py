@@ -0,0 +1,30 @@
+"""
+Celery tasks for payment-related async operations.
+"""
+import logging
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=5)
+def process_stripe_events(self, order_key: str):
+    """Process an order's stored Stripe webhook events in order."""
+    from apps.payments.services import StripeService
+    
+    result = StripeService.process_order_events(order_key)
+    if result['failed']:
+        # Later events for this order wait behind the failed one
+        try:
+            self.retry(countdown=min(300, 10 * 2 ** self.request.retries))
+        except self.MaxRetriesExceededError:
+            logger.error(f"Giving up on Stripe event {result['failed']} for {order_key}; the sweeper will retry")
+    return result
+
+
+@shared_task
+def requeue_stripe_events():
+    """Queue orders whose Stripe events were stored but never processed."""
+    from apps.payments.services import StripeService
+    
+    return StripeService.requeue_pending_events()
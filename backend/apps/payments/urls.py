@@ -10,6 +10,8 @@ urlpatterns = [
     path('checkout/guest/', views.GuestCheckoutView.as_view(), name='guest-checkout'),
     path('checkout/create-intent/', views.CreatePaymentIntentView.as_view(), name='create-intent'),
     path('checkout/confirm/', views.ConfirmPaymentView.as_view(), name='confirm-payment'),
+    path('checkout/queue/', views.WaitingRoomJoinView.as_view(), name='waiting-room-join'),
+    path('checkout/queue/status/', views.WaitingRoomStatusView.as_view(), name='waiting-room-status'),
     path('checkout/demo-mode/', views.CheckDemoModeView.as_view(), name='check-demo-mode'),
     
     # Stripe Hosted Checkout
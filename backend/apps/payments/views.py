@@ -19,19 +19,22 @@ from apps.tickets.services import OrderService
 from .serializers import CreatePaymentIntentSerializer, ConfirmPaymentSerializer, GuestCheckoutSerializer
 from .services import StripeService
 from .guest_checkout import GuestCheckoutService
+from .idempotency import idempotent_response
+from .waiting_room import WaitingRoomService, HasCheckoutAdmission, get_admission_token
 
 logger = logging.getLogger(__name__)
 
 
 class GuestCheckoutView(APIView):
     """Create payment intent for guest checkout (no forced registration)."""
-    permission_classes = [AllowAny]
+    permission_classes = [AllowAny, HasCheckoutAdmission]
     authentication_classes = []
     
     @extend_schema(
         summary="Guest checkout - create payment intent",
         request=GuestCheckoutSerializer
     )
+    @idempotent_response
     def post(self, request):
         config = EventConfig.get_active()
         if not config.ticket_sales_enabled:
@@ -73,6 +76,8 @@ class GuestCheckoutView(APIView):
                 except Exception as e:
                     logger.error(f"Failed to send account creation email: {e}")
             
+            WaitingRoomService.release(get_admission_token(request))
+            
             return Response({
                 'success': True,
                 'data': {
@@ -101,12 +106,13 @@ class GuestCheckoutView(APIView):
 
 class CreatePaymentIntentView(APIView):
     """Create a payment intent for checkout (authenticated users)."""
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, HasCheckoutAdmission]
     
     @extend_schema(
         summary="Create payment intent",
         request=CreatePaymentIntentSerializer
     )
+    @idempotent_response
     def post(self, request):
         config = EventConfig.get_active()
         if not config.ticket_sales_enabled:
@@ -135,6 +141,8 @@ class CreatePaymentIntentView(APIView):
                 idempotency_key=data['idempotency_key']
             )
             
+            WaitingRoomService.release(get_admission_token(request))
+            
             return Response({
                 'success': True,
                 'data': {
@@ -224,6 +232,57 @@ class ConfirmPaymentView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class WaitingRoomJoinView(APIView):
+    """Join the checkout waiting room."""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    
+    @extend_schema(summary="Join checkout waiting room")
+    def post(self, request):
+        if not WaitingRoomService.is_enabled():
+            return Response({
+                'success': True,
+                'data': {'status': 'admitted', 'position': 0, 'admission_token': None}
+            })
+        
+        try:
+            return Response({'success': True, 'data': WaitingRoomService.join()})
+        except Exception as e:
+            logger.error(f"Waiting room unavailable: {e}")
+            return Response({
+                'success': False,
+                'error': {'message': 'Waiting room is temporarily unavailable, please try again'}
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class WaitingRoomStatusView(APIView):
+    """Poll waiting room position. Kept cheap: no auth, no throttling, no database."""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    throttle_classes = []
+    
+    @extend_schema(summary="Checkout waiting room status")
+    def get(self, request):
+        try:
+            data = WaitingRoomService.status(request.query_params.get('token', ''))
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': {'message': str(e)}
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Waiting room unavailable: {e}")
+            return Response({
+                'success': False,
+                'error': {'message': 'Waiting room is temporarily unavailable, please try again'}
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        
+        response = Response({'success': True, 'data': data})
+        if data.get('retry_after'):
+            response['Retry-After'] = str(data['retry_after'])
+        return response
+
+
 class CheckDemoModeView(APIView):
     """Check if the system is running in demo mode."""
     permission_classes = [AllowAny]
@@ -242,7 +301,7 @@ class CheckDemoModeView(APIView):
 
 @method_decorator(csrf_exempt, name='dispatch')
 class StripeWebhookView(APIView):
-    """Stripe webhook endpoint."""
+    """Stripe webhook endpoint. Events are stored and processed asynchronously."""
     permission_classes = [AllowAny]
     authentication_classes = []
     
@@ -255,7 +314,7 @@ class StripeWebhookView(APIView):
             return Response({'error': 'Missing signature'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            result = StripeService.handle_webhook_event(payload, sig_header)
+            result = StripeService.ingest_webhook_event(payload, sig_header)
             return Response(result, status=status.HTTP_200_OK)
             
         except ValueError as e:
@@ -0,0 +1,184 @@
+"""
+Virtual waiting room for checkout bursts.
+Visitors take a number from an atomic cache counter and are admitted in order
+as one of a fixed number of checkout slots frees up. Admission is proven with a
+signed token, so checkout endpoints check it without touching the database.
+An admission is good for one checkout; retries of that checkout are replayed
+by the idempotent response layer instead.
+"""
+import logging
+from typing import Optional
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from rest_framework import permissions
+
+from .idempotency import has_stored_response
+
+logger = logging.getLogger(__name__)
+
+
+class WaitingRoomService:
+    """Service for queueing visitors and admitting them to checkout."""
+
+    QUEUE_SALT = 'payments.waiting_room.queue'
+    ADMISSION_SALT = 'payments.waiting_room.admission'
+    TAIL_KEY = 'waiting_room:tail'
+    HEAD_KEY = 'waiting_room:head'
+    ADVANCE_LOCK_KEY = 'waiting_room:advancing'
+    # Queue tokens outlive any realistic wait
+    QUEUE_TOKEN_MAX_AGE = 60 * 60 * 6
+    # Suggested seconds between status polls
+    POLL_INTERVAL = 5
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return getattr(settings, 'WAITING_ROOM_ENABLED', False)
+
+    @staticmethod
+    def budget() -> int:
+        """Concurrent checkouts allowed."""
+        return getattr(settings, 'WAITING_ROOM_CHECKOUT_BUDGET', 100)
+
+    @staticmethod
+    def admission_ttl() -> int:
+        """Seconds an admitted visitor holds a checkout slot."""
+        return getattr(settings, 'WAITING_ROOM_ADMISSION_TTL', 300)
+
+    @staticmethod
+    def slot_key(slot: int) -> str:
+        return f"waiting_room:slot:{slot}"
+
+    @staticmethod
+    def admitted_key(number: int) -> str:
+        return f"waiting_room:admitted:{number}"
+
+    @staticmethod
+    def _counter(key: str) -> int:
+        return cache.get(key) or 0
+
+    @classmethod
+    def join(cls) -> dict:
+        """Take the next number in the queue."""
+        cache.add(cls.TAIL_KEY, 0, timeout=None)
+        number = cache.incr(cls.TAIL_KEY)
+        cls.advance()
+        return {
+            'queue_token': signing.dumps({'n': number}, salt=cls.QUEUE_SALT),
+            **cls._status(number),
+        }
+
+    @classmethod
+    def advance(cls) -> int:
+        """
+        Admit queued visitors into free checkout slots, in order.
+        Runs at most once a second across all workers; returns the number admitted.
+        """
+        if not cache.add(cls.ADVANCE_LOCK_KEY, 1, timeout=1):
+            return 0
+
+        head, tail = cls._counter(cls.HEAD_KEY), cls._counter(cls.TAIL_KEY)
+        if head >= tail:
+            return 0
+
+        cache.add(cls.HEAD_KEY, 0, timeout=None)
+        keys = [cls.slot_key(slot) for slot in range(cls.budget())]
+        taken = cache.get_many(keys)
+        admitted = 0
+        for slot, key in enumerate(keys):
+            if head + admitted >= tail:
+                break
+            if key in taken or not cache.add(key, 'claiming', timeout=cls.admission_ttl()):
+                continue
+            # If a concurrent join is still in flight the slot waits for that number
+            number = cache.incr(cls.HEAD_KEY)
+            cache.set(key, number, timeout=cls.admission_ttl())
+            cache.set(cls.admitted_key(number), slot, timeout=cls.admission_ttl())
+            admitted += 1
+
+        if admitted:
+            logger.info(f"Waiting room admitted {admitted} visitors (head {head + admitted}, tail {tail})")
+        return admitted
+
+    @classmethod
+    def _status(cls, number: int) -> dict:
+        head = cls._counter(cls.HEAD_KEY)
+        if number <= head:
+            if cache.get(cls.admitted_key(number)) is None:
+                return {'status': 'expired', 'position': None}
+            return {
+                'status': 'admitted',
+                'position': 0,
+                'admission_token': signing.dumps({'n': number}, salt=cls.ADMISSION_SALT),
+                'expires_in': cls.admission_ttl(),
+            }
+        return {
+            'status': 'waiting',
+            'position': number - head,
+            'retry_after': cls.POLL_INTERVAL,
+        }
+
+    @classmethod
+    def status(cls, queue_token: str) -> dict:
+        """Current position for a queue token. Raises ValueError for bad tokens."""
+        try:
+            number = signing.loads(queue_token, salt=cls.QUEUE_SALT, max_age=cls.QUEUE_TOKEN_MAX_AGE)['n']
+        except (signing.BadSignature, KeyError, TypeError):
+            raise ValueError('Invalid queue token')
+        cls.advance()
+        return cls._status(number)
+
+    @classmethod
+    def check_admission(cls, admission_token: Optional[str]) -> Optional[int]:
+        """Queue number for a valid, unexpired admission token, else None."""
+        if not admission_token:
+            return None
+        try:
+            number = signing.loads(admission_token, salt=cls.ADMISSION_SALT, max_age=cls.admission_ttl())['n']
+        except (signing.BadSignature, KeyError, TypeError):
+            return None
+        try:
+            if cache.get(cls.admitted_key(number)) is None:
+                return None
+        except Exception as e:
+            # Signed and unexpired; don't lock buyers out because the cache blipped
+            logger.warning(f"Waiting room admission check unavailable: {e}")
+        return number
+
+    @classmethod
+    def release(cls, admission_token: Optional[str]) -> None:
+        """
+        Free the checkout slot held by a token once checkout has been created.
+        The admission is consumed with it, so the token can't start another checkout.
+        """
+        number = cls.check_admission(admission_token)
+        if number is None:
+            return
+        try:
+            slot = cache.get(cls.admitted_key(number))
+            cache.delete(cls.admitted_key(number))
+            if slot is not None and cache.get(cls.slot_key(slot)) == number:
+                cache.delete(cls.slot_key(slot))
+        except Exception as e:
+            logger.warning(f"Failed to release waiting room slot for {number}: {e}")
+
+
+def get_admission_token(request) -> Optional[str]:
+    return request.headers.get('X-Waiting-Room-Token')
+
+
+class HasCheckoutAdmission(permissions.BasePermission):
+    """
+    Allow checkout only with a waiting room admission token, when the waiting room is on.
+    Retries of a checkout that already went through are let by to get its replayed response.
+    """
+
+    message = 'Please join the waiting room before checking out'
+
+    def has_permission(self, request, view):
+        if not WaitingRoomService.is_enabled():
+            return True
+        if WaitingRoomService.check_admission(get_admission_token(request)) is not None:
+            return True
+        return has_stored_response(view, request)
@@ -1,16 +1,24 @@
 from django.contrib import admin
-from .models import TicketType, Order, OrderItem, Ticket, TicketTransfer, TicketUpgrade, Refund, Comp, Invoice
+from .models import TicketType, Order, OrderItem, Ticket, TicketTransfer, TicketUpgrade, Refund, Comp, Invoice, BulkJob, EmailOutbox, TicketSoldCounter
 
 # Import amphitheater admin
 from .amphitheater_admin import *
 
 
+class TicketSoldCounterInline(admin.TabularInline):
+    model = TicketSoldCounter
+    extra = 0
+    readonly_fields = ('slot', 'count')
+    can_delete = False
+
+
 @admin.register(TicketType)
 class TicketTypeAdmin(admin.ModelAdmin):
-    list_display = ('name', 'price_dollars', 'capacity', 'sold_count', 'is_available', 'is_active')
+    list_display = ('name', 'price_dollars', 'capacity', 'sold_total', 'is_available', 'is_active')
     list_filter = ('is_active',)
     search_fields = ('name', 'slug')
     prepopulated_fields = {'slug': ('name',)}
+    inlines = [TicketSoldCounterInline]
 
 
 @admin.register(Order)
@@ -79,3 +87,20 @@ class InvoiceAdmin(admin.ModelAdmin):
     search_fields = ('invoice_number', 'order__order_number')
     readonly_fields = ('id', 'invoice_number', 'generated_at')
     raw_id_fields = ('order',)
+
+
+@admin.register(BulkJob)
+class BulkJobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'status', 'processed_count', 'failed_count', 'total_count', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status', 'created_at')
+    readonly_fields = ('id', 'params', 'total_count', 'processed_count', 'failed_count', 'created_at', 'started_at', 'finished_at')
+    raw_id_fields = ('created_by',)
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'order', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('kind', 'status', 'provider')
+    search_fields = ('order__order_number', 'dedupe_key')
+    readonly_fields = ('id', 'dedupe_key', 'created_at', 'sent_at', 'claimed_at', 'last_error')
+    raw_id_fields = ('order',)
@@ -3,6 +3,8 @@ Django admin interface for amphitheater ticketing.
 """
 from django.contrib import admin
 from .amphitheater_models import Venue, Section, SeatBlock, SeatHold, AmphitheaterTicket
+from .amphitheater_services import AmphitheaterService
+from .seat_hold_store import SeatHoldStore, SeatHoldStoreUnavailable
 
 
 @admin.register(Venue)
@@ -40,11 +42,11 @@ class SectionAdmin(admin.ModelAdmin):
 
 @admin.register(SeatBlock)
 class SeatBlockAdmin(admin.ModelAdmin):
-    list_display = ('section', 'event_date', 'row_range', 'total_seats', 'available_seats', 'held_seats', 'sold_seats', 'price_cents', 'is_active')
+    list_display = ('section', 'event_date', 'row_range', 'total_seats', 'available_seats', 'held', 'sold_seats', 'price_cents', 'is_active')
     list_filter = ('event_date', 'section__venue', 'section', 'is_active')
     search_fields = ('section__name',)
     ordering = ('event_date', 'section', 'row_start')
-    readonly_fields = ('id', 'created_at', 'updated_at')
+    readonly_fields = ('id', 'held', 'created_at', 'updated_at')
     
     fieldsets = (
         ('Event & Section', {
@@ -54,7 +56,7 @@ class SeatBlockAdmin(admin.ModelAdmin):
             'fields': ('row_start', 'row_end', 'seat_start', 'seat_end', 'total_seats')
         }),
         ('Availability', {
-            'fields': ('available_seats', 'held_seats', 'sold_seats')
+            'fields': ('available_seats', 'held', 'sold_seats')
         }),
         ('Pricing', {
             'fields': ('price_cents',)
@@ -67,6 +69,46 @@ class SeatBlockAdmin(admin.ModelAdmin):
     def row_range(self, obj):
         return f"{obj.row_start}-{obj.row_end}"
     row_range.short_description = 'Rows'
+    
+    def get_changelist_instance(self, request):
+        # Held counts for the whole page in one hold store read
+        changelist = super().get_changelist_instance(request)
+        try:
+            held = SeatHoldStore.held_counts(obj.pk for obj in changelist.result_list)
+        except SeatHoldStoreUnavailable:
+            held = {}
+        for obj in changelist.result_list:
+            obj.store_held = held.get(str(obj.pk))
+        return changelist
+    
+    def held(self, obj):
+        """Seats of live holds in the hold store, plus those of any SeatHold rows."""
+        if not hasattr(obj, 'store_held'):
+            try:
+                obj.store_held = sum(hold['quantity'] for hold in SeatHoldStore.block_holds(obj.pk).values())
+            except SeatHoldStoreUnavailable:
+                obj.store_held = None
+        if obj.store_held is None:
+            return f"{obj.held_seats} (hold store unavailable)"
+        return obj.held_seats + obj.store_held
+    held.short_description = 'Held'
+    
+    def save_model(self, request, obj, form, change):
+        # Cached section snapshots and block lists for both the old and new date go stale
+        dates = {obj.event_date}
+        if change:
+            dates.update(SeatBlock.objects.filter(pk=obj.pk).values_list('event_date', flat=True))
+        super().save_model(request, obj, form, change)
+        AmphitheaterService.blocks_changed(dates)
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        AmphitheaterService.blocks_changed([obj.event_date])
+    
+    def delete_queryset(self, request, queryset):
+        dates = set(queryset.values_list('event_date', flat=True))
+        super().delete_queryset(request, queryset)
+        AmphitheaterService.blocks_changed(dates)
 
 
 @admin.register(SeatHold)
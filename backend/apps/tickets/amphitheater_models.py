@@ -83,6 +83,9 @@ class SeatBlock(models.Model):
     held_seats = models.IntegerField(default=0, validators=[MinValueValidator(0)])
     sold_seats = models.IntegerField(default=0, validators=[MinValueValidator(0)])
     
+    # Bitmap of sold and held seats (see seat_bitmap.SeatBitmap); built on first allocation
+    occupancy = models.BinaryField(null=True, blank=True, editable=False)
+    
     # Pricing for this specific event/section
     price_cents = models.IntegerField(validators=[MinValueValidator(0)])
     
@@ -10,37 +10,67 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from drf_spectacular.utils import extend_schema
 
 from .models import AmphitheaterSeat, Ticket
+from .seat_map_service import SeatMapService
 from apps.accounts.permissions import IsStaffOrAdmin
 
 logger = logging.getLogger(__name__)
 
 
+def not_modified(request, etag: str) -> bool:
+    return etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response['ETag'] = etag
+    # Cache, but revalidate with the ETag every time
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
 class AmphitheaterSeatAvailabilityView(APIView):
     """Get seat availability for amphitheater."""
     permission_classes = [AllowAny]
     authentication_classes = []
     
-    @extend_schema(summary="Get amphitheater seat availability")
+    @extend_schema(
+        summary="Get amphitheater seat availability",
+        description=(
+            "All seats by default. ?compact=true returns a bitset per section in the "
+            "order of the seat layout; ?since=<version> returns only seats changed "
+            "since that version. Responses carry an ETag and honor If-None-Match."
+        )
+    )
     def get(self, request):
-        """Return all seats with their availability status."""
+        """Return seat availability, in full, compact or as changes since a version."""
+        since = request.query_params.get('since')
+        compact = request.query_params.get('compact', '').lower() in ('true', '1', 'yes')
+        if since is not None and not since.isdigit():
+            return Response({
+                'success': False,
+                'error': {'message': 'since must be a version number'}
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
         try:
-            # Clear expired reservations
-            AmphitheaterSeat.objects.filter(
-                reserved_until__lt=timezone.now(),
-                is_available=False,
-                ticket__isnull=True
-            ).update(is_available=True, reserved_until=None)
+            version = SeatMapService.current_version()
+            if since is not None:
+                etag = f'"seats-{version}-since-{since}"'
+            else:
+                etag = f'"seats-{version}-{"compact" if compact else "full"}"'
+            # A version that has not settled may yet take in writes that commit late
+            if SeatMapService.is_settled(version) and not_modified(request, etag):
+                return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
             
-            # Get all seats
-            seats = AmphitheaterSeat.objects.all().values(
-                'section_id', 'section_name', 'row', 'seat_number', 
-                'is_available', 'price_cents'
-            )
+            if since is not None:
+                data = SeatMapService.get_changes(int(since), version)
+            elif compact:
+                data = SeatMapService.get_availability(version)
+            else:
+                data = SeatMapService.get_seats(version)
             
-            return Response({
+            return with_etag(Response({
                 'success': True,
-                'data': list(seats)
-            })
+                'data': data
+            }), etag)
         except Exception as e:
             logger.error(f"Error fetching seat availability: {e}")
             return Response({
@@ -49,6 +79,25 @@ class AmphitheaterSeatAvailabilityView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class AmphitheaterSeatLayoutView(APIView):
+    """Get the static amphitheater seat layout."""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    
+    @extend_schema(summary="Get amphitheater seat layout")
+    def get(self, request):
+        """Return sections, rows and seat numbers; compact availability bits follow this order."""
+        layout = SeatMapService.get_layout()
+        etag = f'"layout-{layout["layout_version"]}"'
+        if not_modified(request, etag):
+            return with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+        
+        return with_etag(Response({
+            'success': True,
+            'data': layout
+        }), etag)
+
+
 class InitializeSeatsView(APIView):
     """Initialize amphitheater seats (staff only)."""
     permission_classes = [IsStaffOrAdmin]
@@ -57,73 +106,7 @@ class InitializeSeatsView(APIView):
     def post(self, request):
         """Create all amphitheater seats if they don't exist - ~8000 seats total."""
         try:
-            # Pacific Amphitheatre configuration matching frontend
-            sections_config = [
-                # Pit - Standing room
-                {'id': 'pit', 'name': 'Pit', 'price': 299, 'tier': 'pit', 'capacity': 200},
-                
-                # Circle - Premium seating
-                {'id': 'circle', 'name': 'Circle', 'price': 249, 'tier': 'circle', 'rows': 8, 'seatsPerRow': 35},
-                
-                # Front sections - Enlarged
-                {'id': 1, 'name': 'Section 1', 'price': 199, 'tier': 'front', 'rows': 25, 'seatsPerRow': 28},
-                {'id': 2, 'name': 'Section 2', 'price': 229, 'tier': 'front', 'rows': 25, 'seatsPerRow': 32},
-                {'id': 3, 'name': 'Section 3', 'price': 199, 'tier': 'front', 'rows': 25, 'seatsPerRow': 28},
-                
-                # Mid sections
-                {'id': 4, 'name': 'Section 4', 'price': 149, 'tier': 'mid', 'rows': 30, 'seatsPerRow': 32},
-                {'id': 5, 'name': 'Section 5', 'price': 139, 'tier': 'mid', 'rows': 30, 'seatsPerRow': 35},
-                {'id': 7, 'name': 'Section 7', 'price': 139, 'tier': 'mid', 'rows': 30, 'seatsPerRow': 35},
-                {'id': 8, 'name': 'Section 8', 'price': 149, 'tier': 'mid', 'rows': 30, 'seatsPerRow': 32},
-                
-                # Back section
-                {'id': 6, 'name': 'Section 6', 'price': 99, 'tier': 'back', 'rows': 35, 'seatsPerRow': 45},
-            ]
-            
-            created_count = 0
-            
-            for section in sections_config:
-                # Handle Pit (standing room)
-                if section['tier'] == 'pit':
-                    for i in range(section['capacity']):
-                        seat, created = AmphitheaterSeat.objects.get_or_create(
-                            section_id=str(section['id']),
-                            row='GA',
-                            seat_number=i + 1,
-                            defaults={
-                                'section_name': section['name'],
-                                'price_cents': section['price'] * 100,
-                                'is_available': True
-                            }
-                        )
-                        if created:
-                            created_count += 1
-                
-                # Handle Circle and regular sections
-                else:
-                    for row in range(section['rows']):
-                        row_letter = chr(65 + row)  # A, B, C, etc.
-                        
-                        # Calculate seats per row with gradual increase
-                        if section['tier'] == 'circle':
-                            seats_in_row = section['seatsPerRow'] + int(row * 0.5)
-                        else:
-                            seats_in_row = section['seatsPerRow'] + int(row * 0.4)
-                        
-                        for seat_num in range(1, seats_in_row + 1):
-                            seat, created = AmphitheaterSeat.objects.get_or_create(
-                                section_id=str(section['id']),
-                                row=row_letter,
-                                seat_number=seat_num,
-                                defaults={
-                                    'section_name': section['name'],
-                                    'price_cents': section['price'] * 100,
-                                    'is_available': True
-                                }
-                            )
-                            if created:
-                                created_count += 1
-            
+            created_count = SeatMapService.initialize_seats()
             total_seats = AmphitheaterSeat.objects.count()
             logger.info(f"Initialized {created_count} new seats. Total seats: {total_seats}")
             
@@ -159,14 +142,17 @@ class ReserveSeatView(APIView):
         
         try:
             # Reserve seats for 5 minutes
-            reserved_until = timezone.now() + timezone.timedelta(minutes=5)
+            now = timezone.now()
+            reserved_until = now + timezone.timedelta(minutes=5)
             
+            # Seats whose reservation lapsed are free; updated_at moves the seat map version
             updated = AmphitheaterSeat.objects.filter(
-                id__in=seat_ids,
-                is_available=True
+                SeatMapService.available_filter(now),
+                id__in=seat_ids
             ).update(
                 is_available=False,
-                reserved_until=reserved_until
+                reserved_until=reserved_until,
+                updated_at=now
             )
             
             return Response({
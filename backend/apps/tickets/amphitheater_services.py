@@ -3,8 +3,13 @@ Amphitheater ticketing services with concurrency-safe seat allocation.
 Section-based "best available" seat selection (SeatGeek-style).
 """
 import logging
-from datetime import timedelta
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timezone as dt_timezone
+from django.core.cache import cache
 from django.db import transaction, models
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.conf import settings
 from typing import List, Dict, Optional, Tuple
@@ -13,6 +18,9 @@ from .amphitheater_models import (
     Venue, Section, SeatBlock, SeatHold, AmphitheaterTicket
 )
 from .models import Ticket, TicketType, Order
+from .seat_bitmap import SeatBitmap
+from .seat_allocator import best_available
+from .seat_hold_store import SeatHoldStore, SeatHoldStoreUnavailable
 from apps.accounts.models import User
 
 logger = logging.getLogger(__name__)
@@ -23,90 +31,272 @@ class AmphitheaterService:
     
     HOLD_DURATION_MINUTES = 10
     
+    # Section snapshots are replaced on change, so this only bounds memory use
+    SECTIONS_SNAPSHOT_TIMEOUT = 60 * 60
+    
     @staticmethod
-    def get_venue_sections(venue_id: str, event_date: str) -> List[Dict]:
+    def bulk_create_sections(venue: Venue, sections_data: List[Dict]) -> Tuple[List[Section], List[Section]]:
         """
-        Get all sections with availability for a specific event date.
-        Returns section info + availability for interactive map.
+        Create the venue's missing sections (matched by name) in one INSERT.
+        Returns (all sections in sections_data order, sections created).
         """
-        try:
-            venue = Venue.objects.get(id=venue_id, is_active=True)
-        except Venue.DoesNotExist:
-            return []
-        
-        sections = Section.objects.filter(venue=venue, is_active=True)
-        result = []
-        
-        for section in sections:
-            # Get total availability across all blocks for this section/date
-            blocks = SeatBlock.objects.filter(
+        existing = {section.name: section for section in Section.objects.filter(venue=venue)}
+        created = Section.objects.bulk_create(
+            Section(venue=venue, **data) for data in sections_data if data['name'] not in existing
+        )
+        sections = {**existing, **{section.name: section for section in created}}
+        return [sections[data['name']] for data in sections_data], created
+    
+    @classmethod
+    def bulk_create_seat_blocks(
+        cls,
+        sections: List[Section],
+        event_dates: List[date],
+        row_start: str = 'A',
+        row_end: str = 'Z',
+        seat_start: int = 1,
+        seat_end: int = 50
+    ) -> List[SeatBlock]:
+        """
+        Create one seat block per section and event date where it doesn't exist yet,
+        in one INSERT. Returns the blocks created.
+        """
+        existing = set(SeatBlock.objects.filter(
+            section__in=sections,
+            event_date__in=event_dates,
+            row_start=row_start,
+            row_end=row_end
+        ).values_list('section_id', 'event_date'))
+        
+        created = SeatBlock.objects.bulk_create(
+            SeatBlock(
                 section=section,
                 event_date=event_date,
+                row_start=row_start,
+                row_end=row_end,
+                seat_start=seat_start,
+                seat_end=seat_end,
+                total_seats=section.capacity,
+                available_seats=section.capacity,
+                price_cents=section.base_price_cents,
                 is_active=True
             )
-            
-            total_available = sum(block.available_seats for block in blocks)
-            total_capacity = sum(block.total_seats for block in blocks)
-            min_price = min((block.price_cents for block in blocks), default=0)
-            
-            result.append({
+            for event_date in event_dates
+            for section in sections
+            if (section.id, event_date) not in existing
+        )
+        cls.blocks_changed({block.event_date for block in created})
+        return created
+    
+    @classmethod
+    def get_venue_sections(cls, venue_id: str, event_date: str) -> List[Dict]:
+        """
+        Get all sections with availability for a specific event date.
+        Returns section info + availability for interactive map.
+        """
+        sections, block_ids = cls._load_sections(venue_id, event_date)
+        return cls._with_holds(sections, block_ids)
+    
+    @staticmethod
+    def _load_sections(venue_id: str, event_date: str) -> Tuple[List[Dict], Dict[str, List[str]]]:
+        """
+        Section availability in one query, before seats held in the hold store,
+        plus the ids of each section's blocks for looking those up.
+        """
+        block_filter = models.Q(seat_blocks__event_date=event_date, seat_blocks__is_active=True)
+        sections = Section.objects.filter(
+            venue_id=venue_id,
+            venue__is_active=True,
+            is_active=True
+        ).annotate(
+            total_available=Coalesce(models.Sum('seat_blocks__available_seats', filter=block_filter), 0),
+            total_capacity=Coalesce(models.Sum('seat_blocks__total_seats', filter=block_filter), 0),
+            min_price=Coalesce(models.Min('seat_blocks__price_cents', filter=block_filter), 0),
+        )
+        
+        results = []
+        for section in sections:
+            results.append({
                 'id': str(section.id),
                 'name': section.name,
                 'section_type': section.section_type,
                 'capacity': section.capacity,
-                'available': total_available,
-                'total_capacity': total_capacity,
-                'price_cents': min_price,
-                'price': min_price / 100,
+                'available': section.total_available,
+                'total_capacity': section.total_capacity,
+                'price_cents': section.min_price,
+                'price': section.min_price / 100,
                 'color': section.color,
                 'map_coordinates': section.map_coordinates,
-                'is_available': total_available > 0,
+                'is_available': section.total_available > 0,
             })
         
-        return result
+        block_ids = {}
+        for section_id, block_id in SeatBlock.objects.filter(
+            section__venue_id=venue_id,
+            event_date=event_date,
+            is_active=True
+        ).values_list('section_id', 'id'):
+            block_ids.setdefault(str(section_id), []).append(str(block_id))
+        return results, block_ids
+    
+    @staticmethod
+    def _with_holds(sections: List[Dict], block_ids: Dict[str, List[str]]) -> List[Dict]:
+        """Sections with the seats of live holds taken off, read from the hold store."""
+        try:
+            held = SeatHoldStore.held_counts(
+                block_id for section_blocks in block_ids.values() for block_id in section_blocks
+            )
+        except SeatHoldStoreUnavailable as e:
+            logger.warning(f"Seat hold store unavailable, showing availability without holds: {e}")
+            return sections
+        
+        results = []
+        for section in sections:
+            available = section['available'] - sum(held[block_id] for block_id in block_ids.get(section['id'], []))
+            results.append({**section, 'available': available, 'is_available': available > 0})
+        return results
+    
+    @staticmethod
+    def sections_version_key(event_date) -> str:
+        return f"amphitheater:sections:{event_date}:version"
+    
+    @staticmethod
+    def sections_snapshot_key(venue_id, event_date) -> str:
+        return f"amphitheater:sections:{event_date}:{venue_id}"
+    
+    @staticmethod
+    def section_inventory_key(section_id, event_date) -> str:
+        return f"amphitheater:sections:{event_date}:blocks:{section_id}"
+    
+    @classmethod
+    def get_section_snapshot(cls, venue_id: str, event_date: str) -> Tuple[List[Dict], bool]:
+        """
+        Section availability for the map from a cached snapshot.
+        The snapshot records the availability version it was built from and is
+        used only while that version is current; conversions and releases of
+        stored seats and changes to seat blocks bump the version. Live holds are taken off on every read.
+        Returns (sections, served_from_cache).
+        """
+        version_key = cls.sections_version_key(event_date)
+        snapshot_key = cls.sections_snapshot_key(venue_id, event_date)
+        try:
+            cached = cache.get_many([version_key, snapshot_key])
+        except Exception as e:
+            logger.warning(f"Section snapshot cache unavailable: {e}")
+            return cls.get_venue_sections(venue_id, event_date), False
+        
+        version = cached.get(version_key, 0)
+        snapshot = cached.get(snapshot_key)
+        if snapshot and snapshot['version'] == version:
+            return cls._with_holds(snapshot['sections'], snapshot['block_ids']), True
+        
+        # Tagged with the version read before querying, so a change made meanwhile invalidates it
+        sections, block_ids = cls._load_sections(venue_id, event_date)
+        try:
+            cache.set(snapshot_key, {
+                'version': version,
+                'sections': sections,
+                'block_ids': block_ids,
+            }, timeout=cls.SECTIONS_SNAPSHOT_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to cache section snapshot: {e}")
+        return cls._with_holds(sections, block_ids), False
+    
+    @classmethod
+    def _section_inventory(cls, section_id: str, event_date: str) -> Optional[Dict]:
+        """
+        A section's name and its active blocks for a date, with their unsold seats,
+        cached under the same version as the section snapshots.
+        None if the section doesn't exist.
+        """
+        version_key = cls.sections_version_key(event_date)
+        inventory_key = cls.section_inventory_key(section_id, event_date)
+        try:
+            cached = cache.get_many([version_key, inventory_key])
+        except Exception as e:
+            logger.warning(f"Section inventory cache unavailable: {e}")
+            cached = None
+        
+        version = cached.get(version_key, 0) if cached is not None else 0
+        inventory = cached.get(inventory_key) if cached is not None else None
+        if inventory and inventory['version'] == version:
+            return inventory['section']
+        
+        section = Section.objects.filter(id=section_id, is_active=True).values('name').first()
+        if section is not None:
+            section['blocks'] = [
+                {**block, 'id': str(block['id'])}
+                for block in SeatBlock.objects.filter(
+                    section_id=section_id,
+                    event_date=event_date,
+                    is_active=True
+                ).order_by('row_start', 'seat_start').values('id', 'available_seats', 'price_cents')
+            ]
+        if cached is not None:
+            try:
+                cache.set(inventory_key, {
+                    'version': version,
+                    'section': section,
+                }, timeout=cls.SECTIONS_SNAPSHOT_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Failed to cache section inventory: {e}")
+        return section
+    
+    @classmethod
+    def _availability_changed(cls, event_date) -> None:
+        """Invalidate section snapshots for an event date once the transaction commits."""
+        key = cls.sections_version_key(event_date)
+        
+        def bump():
+            cache.add(key, 0, timeout=None)
+            cache.incr(key)
+        
+        transaction.on_commit(bump, robust=True)
+    
+    @classmethod
+    def blocks_changed(cls, event_dates) -> None:
+        """Invalidate section snapshots and block lists after seat blocks are added, edited or removed."""
+        for event_date in set(event_dates):
+            cls._availability_changed(event_date)
     
     @staticmethod
     def check_availability(section_id: str, event_date: str, quantity: int) -> Dict:
         """
         Check if requested quantity is available in section.
-        Returns availability status and pricing.
+        Returns availability status and pricing. Read from the cache alone once warm.
         """
-        try:
-            section = Section.objects.get(id=section_id, is_active=True)
-        except Section.DoesNotExist:
+        section = AmphitheaterService._section_inventory(section_id, event_date)
+        if section is None:
             return {
                 'available': False,
                 'message': 'Section not found',
             }
         
-        # Clean up expired holds first
-        AmphitheaterService._cleanup_expired_holds()
-        
         # Get available blocks for this section/date
-        blocks = SeatBlock.objects.filter(
-            section=section,
-            event_date=event_date,
-            is_active=True,
-            available_seats__gte=quantity
-        ).order_by('row_start', 'seat_start')
-        
-        if not blocks.exists():
+        try:
+            blocks = AmphitheaterService._available_blocks(section['blocks'], quantity)
+        except SeatHoldStoreUnavailable as e:
+            logger.error(f"Seat hold store unavailable: {e}")
             return {
                 'available': False,
-                'message': f'Not enough adjacent seats available in {section.name}',
+                'message': 'Seat availability is temporarily unavailable',
             }
         
-        # Get best block (first one with enough seats)
-        best_block = blocks.first()
+        if not blocks:
+            return {
+                'available': False,
+                'message': f'Not enough adjacent seats available in {section["name"]}',
+            }
         
+        best_block = blocks[0]
         return {
             'available': True,
-            'section_id': str(section.id),
-            'section_name': section.name,
+            'section_id': str(section_id),
+            'section_name': section['name'],
             'quantity': quantity,
-            'price_cents': best_block.price_cents,
-            'price_per_ticket': best_block.price_cents / 100,
-            'total_price': (best_block.price_cents * quantity) / 100,
+            'price_cents': best_block['price_cents'],
+            'price_per_ticket': best_block['price_cents'] / 100,
+            'total_price': (best_block['price_cents'] * quantity) / 100,
             'event_date': event_date,
         }
     
@@ -121,122 +311,220 @@ class AmphitheaterService:
     ) -> Dict:
         """
         Create a seat hold with best available seat allocation.
-        Uses SELECT FOR UPDATE to prevent race conditions.
+        Locks only the chosen seat block (SELECT FOR UPDATE), so shoppers in
+        the same section landing in different blocks don't wait on each other.
+        The hold goes to the hold store and expires there on its own; nothing
+        is written to the database until it is converted to tickets.
         """
         if not user and not session_key:
             raise ValueError("Either user or session_key must be provided")
         
-        # Clean up expired holds
-        AmphitheaterService._cleanup_expired_holds()
-        
-        try:
-            section = Section.objects.select_for_update().get(id=section_id, is_active=True)
-        except Section.DoesNotExist:
+        section = AmphitheaterService._section_inventory(section_id, event_date)
+        if section is None:
             return {
                 'success': False,
                 'error': 'Section not found',
             }
         
-        # Find best available block with SELECT FOR UPDATE (concurrency safe)
-        blocks = SeatBlock.objects.select_for_update().filter(
-            section=section,
-            event_date=event_date,
-            is_active=True,
-            available_seats__gte=quantity
-        ).order_by('row_start', 'seat_start')
-        
-        if not blocks.exists():
-            return {
-                'success': False,
-                'error': f'Not enough adjacent seats available in {section.name}',
-            }
-        
-        best_block = blocks.first()
-        
-        # Allocate best available seats
-        allocated_seats = AmphitheaterService._allocate_seats(best_block, quantity)
-        
-        if not allocated_seats:
+        try:
+            best_block, holds = AmphitheaterService._lock_block(section['blocks'], quantity)
+            
+            if best_block is None:
+                return {
+                    'success': False,
+                    'error': f'Not enough adjacent seats available in {section["name"]}',
+                }
+            
+            # Allocate best available seats
+            allocated_seats = AmphitheaterService._allocate_seats(best_block, quantity, holds)
+            
+            if not allocated_seats:
+                return {
+                    'success': False,
+                    'error': 'Failed to allocate seats',
+                }
+            
+            # Store the hold while the block is still locked
+            expires = time.time() + AmphitheaterService.HOLD_DURATION_MINUTES * 60
+            hold_id = str(uuid.uuid4())
+            SeatHoldStore.add({
+                'id': hold_id,
+                'seat_block_id': str(best_block.id),
+                'section_name': section['name'],
+                'event_date': best_block.event_date,
+                'price_cents': best_block.price_cents,
+                'quantity': quantity,
+                'seats': allocated_seats,
+                'user_id': str(user.id) if user else None,
+                'session_key': session_key or user.email,
+                'expires': expires,
+            })
+        except SeatHoldStoreUnavailable as e:
+            logger.error(f"Seat hold store unavailable: {e}")
             return {
                 'success': False,
-                'error': 'Failed to allocate seats',
+                'error': 'Seat holds are temporarily unavailable',
             }
         
-        # Update block availability
-        best_block.available_seats -= quantity
-        best_block.held_seats += quantity
-        best_block.save(update_fields=['available_seats', 'held_seats', 'updated_at'])
-        
-        # Create hold
-        expires_at = timezone.now() + timedelta(minutes=AmphitheaterService.HOLD_DURATION_MINUTES)
-        hold = SeatHold.objects.create(
-            seat_block=best_block,
-            user=user,
-            session_key=session_key or (user.email if user else 'unknown'),
-            quantity=quantity,
-            allocated_seats=allocated_seats,
-            expires_at=expires_at,
-            is_active=True,
-        )
-        
-        logger.info(f"Created seat hold {hold.id} for {quantity} seats in {section.name}")
+        logger.info(f"Created seat hold {hold_id} for {quantity} seats in {section['name']}")
         
         return {
             'success': True,
-            'hold_id': str(hold.id),
-            'section_name': section.name,
+            'hold_id': hold_id,
+            'section_name': section['name'],
             'quantity': quantity,
             'seats': allocated_seats,
             'price_cents': best_block.price_cents,
             'price_per_ticket': best_block.price_cents / 100,
             'total_price_cents': best_block.price_cents * quantity,
             'total_price': (best_block.price_cents * quantity) / 100,
-            'expires_at': expires_at.isoformat(),
+            'expires_at': datetime.fromtimestamp(expires, tz=dt_timezone.utc).isoformat(),
             'event_date': event_date,
         }
     
     @staticmethod
-    def _allocate_seats(seat_block: SeatBlock, quantity: int) -> List[Dict]:
+    def _lock_block(blocks: List[Dict], quantity: int) -> Tuple[Optional[SeatBlock], Dict[str, Dict]]:
         """
-        Allocate best available adjacent seats from a block.
-        Returns list of {row, seat} assignments.
+        Lock the first block with room for quantity seats, locking nothing else.
+        Blocks another shopper has locked are skipped for the next candidate
+        (SKIP LOCKED); only if every candidate was busy do we wait for one.
+        Availability is rechecked under the lock against the block's live holds.
+        Returns (block, its live holds), or (None, {}) if no block has room.
         """
-        # Get already allocated seats in this block
-        existing_tickets = AmphitheaterTicket.objects.filter(
-            seat_block=seat_block,
-            status__in=['ISSUED', 'USED']
-        ).values_list('row', 'seat_number')
-        
-        existing_holds = SeatHold.objects.filter(
+        candidates = [block['id'] for block in AmphitheaterService._available_blocks(blocks, quantity)]
+        busy = []
+        for skip_locked, block_ids in ((True, candidates), (False, busy)):
+            for block_id in block_ids:
+                block = SeatBlock.objects.select_for_update(skip_locked=skip_locked).filter(
+                    id=block_id,
+                    is_active=True
+                ).first()
+                if block is None:
+                    if skip_locked:
+                        busy.append(block_id)
+                    continue
+                holds = SeatHoldStore.block_holds(block.id)
+                if block.available_seats - sum(hold['quantity'] for hold in holds.values()) >= quantity:
+                    return block, holds
+        return None, {}
+    
+    @staticmethod
+    def _available_blocks(blocks: List[Dict], quantity: int) -> List[Dict]:
+        """Blocks with room for quantity seats once seats of live holds are taken off."""
+        held = SeatHoldStore.held_counts(block['id'] for block in blocks)
+        return [block for block in blocks if block['available_seats'] - held[block['id']] >= quantity]
+    
+    @staticmethod
+    def _release_expired_holds(seat_block: SeatBlock, now: datetime) -> int:
+        """
+        Return the seats of a locked block's expired SeatHold rows and deactivate them in one UPDATE.
+        Holds locked by a conversion are skipped; it releases them itself.
+        Returns the number of seats released; the caller saves the block.
+        """
+        expired = list(SeatHold.objects.select_for_update(skip_locked=True).filter(
             seat_block=seat_block,
             is_active=True,
-            expires_at__gt=timezone.now()
+            expires_at__lt=now
+        ).values_list('id', 'quantity', 'allocated_seats'))
+        if not expired:
+            return 0
+        
+        released = sum(quantity for _, quantity, _ in expired)
+        seat_block.available_seats += released
+        seat_block.held_seats -= released
+        AmphitheaterService._release_seats(seat_block, [seat for _, _, seats in expired for seat in seats])
+        SeatHold.objects.filter(id__in=[hold_id for hold_id, _, _ in expired]).update(is_active=False)
+        AmphitheaterService._availability_changed(seat_block.event_date)
+        return released
+    
+    @staticmethod
+    def _occupancy(seat_block: SeatBlock) -> SeatBitmap:
+        """
+        The block's occupancy bitmap of sold seats (and seats of SeatHold rows),
+        built from its tickets and active SeatHold rows the first time.
+        """
+        bitmap = SeatBitmap.from_block(seat_block)
+        if bitmap is not None:
+            return bitmap
+        
+        bitmap = SeatBitmap.for_block(seat_block)
+        bitmap.mark(
+            {'row': row, 'seat': seat}
+            for row, seat in AmphitheaterTicket.objects.filter(
+                seat_block=seat_block,
+                status__in=['ISSUED', 'USED']
+            ).values_list('row', 'seat_number')
         )
+        # Every active hold counts until it is released, expired or not
+        for seats in SeatHold.objects.filter(seat_block=seat_block, is_active=True).values_list('allocated_seats', flat=True):
+            bitmap.mark(seats)
+        return bitmap
+    
+    @staticmethod
+    def _allocate_seats(seat_block: SeatBlock, quantity: int, holds: Dict[str, Dict]) -> List[Dict]:
+        """
+        Allocate best available adjacent seats from anywhere in a locked block,
+        avoiding sold seats and the seats of its live holds.
+        Returns list of {row, seat} assignments.
+        """
+        built = seat_block.occupancy is None
+        bitmap = AmphitheaterService._occupancy(seat_block)
+        if built:
+            # Kept so later holds don't rebuild it from tickets
+            seat_block.occupancy = bitmap.to_bytes()
+            seat_block.save(update_fields=['occupancy'])
+        
+        for hold in holds.values():
+            bitmap.mark(hold['seats'])
+        return best_available(bitmap, quantity)
+    
+    @staticmethod
+    def _release_seats(seat_block: SeatBlock, seats: List[Dict]) -> None:
+        """Mark seats free in seat_block.occupancy; the caller saves the block."""
+        bitmap = SeatBitmap.from_block(seat_block)
+        if bitmap is None:
+            # Not built yet; it will be built from the remaining holds
+            return
+        bitmap.clear(seats)
+        seat_block.occupancy = bitmap.to_bytes()
+    
+    @staticmethod
+    def get_hold(hold_id: str) -> Optional[Dict]:
+        """
+        A live hold from the hold store, or an active SeatHold row placed before
+        holds moved there, as {id, section_name, event_date, price_cents,
+        quantity, seats, expires_at}. None if it is gone.
+        """
+        hold = SeatHoldStore.get(hold_id)
+        if hold is not None:
+            return {
+                'id': hold['id'],
+                'section_name': hold['section_name'],
+                'event_date': hold['event_date'],
+                'price_cents': hold['price_cents'],
+                'quantity': hold['quantity'],
+                'seats': hold['seats'],
+                'expires_at': datetime.fromtimestamp(hold['expires'], tz=dt_timezone.utc),
+            }
         
-        allocated_set = set(existing_tickets)
-        for hold in existing_holds:
-            for seat in hold.allocated_seats:
-                allocated_set.add((seat['row'], seat['seat']))
-        
-        # Generate best available seats
-        allocated_seats = []
-        current_row = seat_block.row_start
-        
-        # Simple allocation: fill rows sequentially
-        for seat_num in range(seat_block.seat_start, seat_block.seat_end + 1):
-            if len(allocated_seats) >= quantity:
-                break
-            
-            if (current_row, seat_num) not in allocated_set:
-                allocated_seats.append({
-                    'row': current_row,
-                    'seat': seat_num,
-                })
-        
-        return allocated_seats
+        legacy = SeatHold.objects.filter(
+            id=hold_id,
+            is_active=True,
+            expires_at__gte=timezone.now()
+        ).select_related('seat_block__section').first()
+        if legacy is None:
+            return None
+        return {
+            'id': str(legacy.id),
+            'section_name': legacy.seat_block.section.name,
+            'event_date': legacy.seat_block.event_date,
+            'price_cents': legacy.seat_block.price_cents,
+            'quantity': legacy.quantity,
+            'seats': legacy.allocated_seats,
+            'expires_at': legacy.expires_at,
+        }
     
     @staticmethod
-    @transaction.atomic
     def convert_hold_to_tickets(
         hold_id: str,
         order: Order,
@@ -246,145 +534,272 @@ class AmphitheaterService:
         Convert a seat hold into actual tickets after payment.
         Called by payment webhook/confirmation.
         """
+        return AmphitheaterService.convert_holds_to_tickets([hold_id], order, ticket_type)
+    
+    @staticmethod
+    @transaction.atomic
+    def convert_holds_to_tickets(
+        hold_ids: List[str],
+        order: Order,
+        ticket_type: TicketType
+    ) -> List[AmphitheaterTicket]:
+        """
+        Convert all seat holds of an order into tickets in one transaction.
+        If converting them together fails, each hold is converted on its own, so
+        a bad hold (a seat already ticketed, say) is skipped instead of costing
+        the order its other seats.
+        Raises SeatHoldStoreUnavailable if the hold store can't be reached.
+        """
+        hold_ids = list(dict.fromkeys(str(hold_id) for hold_id in hold_ids))
         try:
-            hold = SeatHold.objects.select_for_update().get(id=hold_id, is_active=True)
-        except SeatHold.DoesNotExist:
-            logger.error(f"Seat hold {hold_id} not found or already converted")
-            return []
-        
-        # Check if hold expired
-        if hold.expires_at < timezone.now():
-            logger.error(f"Seat hold {hold_id} expired")
-            hold.is_active = False
-            hold.save(update_fields=['is_active'])
-            return []
+            with transaction.atomic():
+                return AmphitheaterService._convert_holds(hold_ids, order, ticket_type)
+        except SeatHoldStoreUnavailable:
+            raise
+        except Exception as e:
+            if len(hold_ids) == 1:
+                raise
+            logger.error(f"Failed to convert holds {hold_ids} together, converting one at a time: {e}")
         
         amphitheater_tickets = []
+        for hold_id in hold_ids:
+            try:
+                with transaction.atomic():
+                    amphitheater_tickets.extend(AmphitheaterService._convert_holds([hold_id], order, ticket_type))
+            except SeatHoldStoreUnavailable:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to convert seat hold {hold_id} for order {order.order_number}: {e}")
+        return amphitheater_tickets
+    
+    @staticmethod
+    def _convert_holds(
+        hold_ids: List[str],
+        order: Order,
+        ticket_type: TicketType
+    ) -> List[AmphitheaterTicket]:
+        """
+        Convert seat holds into tickets; the caller runs this in a transaction.
+        Every block involved is locked in one query; festival tickets, their
+        complimentary day passes and the amphitheater tickets are bulk inserted,
+        and the block counts are written back in one UPDATE.
+        Holds that expired or were already converted are skipped. A SeatHold row
+        is written for each converted hold, as its record.
+        """
+        from .services import TicketService
+        
+        stored = SeatHoldStore.get_many(hold_ids)
+        # SeatHold rows placed before holds moved to the hold store
+        legacy = list(SeatHold.objects.select_for_update().filter(
+            id__in=[hold_id for hold_id in hold_ids if hold_id not in stored],
+            is_active=True
+        ))
+        for hold_id in set(hold_ids) - set(stored) - {str(hold.id) for hold in legacy}:
+            logger.error(f"Seat hold {hold_id} not found or already converted")
         
-        # Create amphitheater ticket for each seat
-        for seat_info in hold.allocated_seats:
-            # Create main festival ticket (for QR code and scanning)
-            festival_ticket = Ticket.objects.create(
-                ticket_type=ticket_type,
-                owner=order.buyer,
-                order=order,
-                status='ISSUED',
-                metadata={
-                    'amphitheater': True,
-                    'section': hold.seat_block.section.name,
-                    'row': seat_info['row'],
-                    'seat': seat_info['seat'],
-                    'event_date': str(hold.seat_block.event_date),
-                }
-            )
-            
-            # Create amphitheater-specific ticket
-            amph_ticket = AmphitheaterTicket.objects.create(
-                festival_ticket=festival_ticket,
-                seat_block=hold.seat_block,
-                row=seat_info['row'],
-                seat_number=seat_info['seat'],
-                event_date=hold.seat_block.event_date,
-                price_paid_cents=hold.seat_block.price_cents,
-                status='ISSUED',
-                includes_festival_access=True,
-            )
-            
-            amphitheater_tickets.append(amph_ticket)
+        block_ids = {hold['seat_block_id'] for hold in stored.values()} | {str(hold.seat_block_id) for hold in legacy}
+        blocks = {
+            str(block.id): block
+            for block in SeatBlock.objects.select_for_update(of=('self',)).select_related('section').filter(
+                id__in=block_ids
+            ).order_by('id')
+        }
         
-        # Update seat block counts
-        seat_block = hold.seat_block
-        seat_block.held_seats -= hold.quantity
-        seat_block.sold_seats += hold.quantity
-        seat_block.save(update_fields=['held_seats', 'sold_seats', 'updated_at'])
+        # Rechecked under the block locks, which a concurrent conversion of the same holds also takes
+        live = SeatHoldStore.live_holds(block_ids)
+        converted = {str(hold_id) for hold_id in SeatHold.objects.filter(id__in=list(stored)).values_list('id', flat=True)}
         
-        # Deactivate hold
-        hold.is_active = False
-        hold.save(update_fields=['is_active'])
+        now = timezone.now()
+        seats_by_block = defaultdict(list)
+        changed = set()
         
-        logger.info(f"Converted hold {hold_id} to {len(amphitheater_tickets)} amphitheater tickets")
+        for hold in legacy:
+            seat_block = blocks[str(hold.seat_block_id)]
+            seat_block.held_seats -= hold.quantity
+            changed.add(str(seat_block.id))
+            if hold.expires_at < now:
+                logger.error(f"Seat hold {hold.id} expired")
+                seat_block.available_seats += hold.quantity
+                AmphitheaterService._release_seats(seat_block, hold.allocated_seats)
+            else:
+                seat_block.sold_seats += hold.quantity
+                seats_by_block[str(seat_block.id)].extend(hold.allocated_seats)
+        
+        records = []
+        dropped = defaultdict(list)
+        for hold_id, hold in stored.items():
+            block_id = hold['seat_block_id']
+            if hold_id not in live.get(block_id, {}) or hold_id in converted:
+                logger.error(f"Seat hold {hold_id} expired or already converted")
+                continue
+            # Held seats become sold seats
+            seat_block = blocks[block_id]
+            bitmap = AmphitheaterService._occupancy(seat_block)
+            bitmap.mark(hold['seats'])
+            seat_block.occupancy = bitmap.to_bytes()
+            seat_block.available_seats -= hold['quantity']
+            seat_block.sold_seats += hold['quantity']
+            changed.add(block_id)
+            seats_by_block[block_id].extend(hold['seats'])
+            records.append(SeatHold(
+                id=hold_id,
+                seat_block=seat_block,
+                user_id=hold['user_id'],
+                session_key=hold['session_key'],
+                quantity=hold['quantity'],
+                allocated_seats=hold['seats'],
+                expires_at=datetime.fromtimestamp(hold['expires'], tz=dt_timezone.utc),
+                is_active=False,
+            ))
+            dropped[block_id].append(hold_id)
         
-        # Auto-grant festival access
-        AmphitheaterService._grant_festival_access(amphitheater_tickets, order)
+        amphitheater_tickets = []
+        day_pass_types = {}
+        for block_id, seats in seats_by_block.items():
+            seat_block = blocks[block_id]
+            if seat_block.event_date not in day_pass_types:
+                day_pass_types[seat_block.event_date] = AmphitheaterService._festival_day_pass_type(seat_block.event_date)
+            
+            # Create amphitheater ticket for each seat
+            for seat_info in seats:
+                amph_ticket = AmphitheaterTicket(
+                    seat_block=seat_block,
+                    row=seat_info['row'],
+                    seat_number=seat_info['seat'],
+                    event_date=seat_block.event_date,
+                    price_paid_cents=seat_block.price_cents,
+                    status='ISSUED',
+                    includes_festival_access=True,
+                )
+                # Main festival ticket (for QR code and scanning)
+                amph_ticket.festival_ticket = Ticket(
+                    ticket_type=ticket_type,
+                    owner=order.buyer,
+                    order=order,
+                    status='ISSUED',
+                    metadata={
+                        'amphitheater': True,
+                        'section': seat_block.section.name,
+                        'row': seat_info['row'],
+                        'seat': seat_info['seat'],
+                        'event_date': str(seat_block.event_date),
+                    }
+                )
+                # Auto-granted complimentary festival day pass
+                amph_ticket.festival_day_ticket = Ticket(
+                    ticket_type=day_pass_types[seat_block.event_date],
+                    owner=order.buyer,
+                    order=order,
+                    status='ISSUED',
+                    is_comp=True,
+                    metadata={
+                        'granted_by_amphitheater': str(amph_ticket.id),
+                        'event_date': str(seat_block.event_date),
+                        'complimentary': True,
+                    }
+                )
+                amphitheater_tickets.append(amph_ticket)
+        
+        TicketService.bulk_create_tickets([
+            ticket
+            for amph_ticket in amphitheater_tickets
+            for ticket in (amph_ticket.festival_ticket, amph_ticket.festival_day_ticket)
+        ])
+        AmphitheaterTicket.objects.bulk_create(amphitheater_tickets)
         
+        # Update seat block counts
+        for block_id in changed:
+            blocks[block_id].updated_at = now
+        SeatBlock.objects.bulk_update(
+            [blocks[block_id] for block_id in changed],
+            ['available_seats', 'held_seats', 'sold_seats', 'occupancy', 'updated_at']
+        )
+        for event_date in {blocks[block_id].event_date for block_id in changed}:
+            AmphitheaterService._availability_changed(event_date)
+        
+        SeatHold.objects.bulk_create(records)
+        SeatHold.objects.filter(id__in=[hold.id for hold in legacy]).update(is_active=False)
+        if dropped:
+            # Until then the seats count as both held and sold, which only understates availability
+            transaction.on_commit(lambda: AmphitheaterService._drop_converted_holds(dropped), robust=True)
+        
+        logger.info(
+            f"Converted {len(records) + len(legacy)} seat holds to {len(amphitheater_tickets)} "
+            f"amphitheater tickets for order {order.order_number}"
+        )
         return amphitheater_tickets
     
     @staticmethod
     @transaction.atomic
-    def _grant_festival_access(
-        amphitheater_tickets: List[AmphitheaterTicket],
-        order: Order
-    ):
-        """
-        Auto-grant festival day pass for each amphitheater ticket.
-        Creates a free festival ticket for the same day.
-        """
-        for amph_ticket in amphitheater_tickets:
-            event_date = amph_ticket.event_date
-            
-            # Find or create festival day pass ticket type
-            day_name = event_date.strftime('%A')  # e.g., "Friday"
-            ticket_type_name = f"Festival Day Pass - {day_name} (Complimentary with Amphitheater)"
-            
-            festival_ticket_type, created = TicketType.objects.get_or_create(
-                slug=f'festival-day-{event_date.strftime("%Y-%m-%d")}-comp',
-                defaults={
-                    'name': ticket_type_name,
-                    'description': f'Complimentary festival access included with amphitheater ticket',
-                    'price_cents': 0,
-                    'capacity': 100000,  # Unlimited
-                    'is_active': True,
-                    'valid_days': [day_name],
-                }
-            )
-            
-            # Create complimentary festival ticket
-            festival_day_ticket = Ticket.objects.create(
-                ticket_type=festival_ticket_type,
-                owner=order.buyer,
-                order=order,
-                status='ISSUED',
-                is_comp=True,
-                metadata={
-                    'granted_by_amphitheater': str(amph_ticket.id),
-                    'event_date': str(event_date),
-                    'complimentary': True,
-                }
-            )
-            
-            # Link to amphitheater ticket
-            amph_ticket.festival_day_ticket = festival_day_ticket
-            amph_ticket.save(update_fields=['festival_day_ticket'])
-            
-            logger.info(f"Granted festival access ticket {festival_day_ticket.id} for amphitheater ticket {amph_ticket.id}")
+    def _drop_converted_holds(holds_by_block: Dict[str, List[str]]) -> None:
+        """Remove converted holds from the hold store, under their blocks' locks."""
+        list(SeatBlock.objects.select_for_update().filter(
+            id__in=list(holds_by_block)
+        ).order_by('id').values_list('id', flat=True))
+        for block_id, hold_ids in holds_by_block.items():
+            SeatHoldStore.remove(block_id, hold_ids)
+    
+    @staticmethod
+    def _festival_day_pass_type(event_date: date) -> TicketType:
+        """Complimentary festival day pass ticket type granted with amphitheater tickets for a date."""
+        day_name = event_date.strftime('%A')  # e.g., "Friday"
+        ticket_type, _ = TicketType.objects.get_or_create(
+            slug=f'festival-day-{event_date.strftime("%Y-%m-%d")}-comp',
+            defaults={
+                'name': f"Festival Day Pass - {day_name} (Complimentary with Amphitheater)",
+                'description': 'Complimentary festival access included with amphitheater ticket',
+                'price_cents': 0,
+                'capacity': 100000,  # Unlimited
+                'is_active': True,
+                'valid_days': [day_name],
+            }
+        )
+        return ticket_type
     
     @staticmethod
-    def _cleanup_expired_holds():
-        """Release seats from expired holds."""
-        expired_holds = SeatHold.objects.filter(
+    def release_expired_holds() -> Dict:
+        """
+        Return seats of expired SeatHold rows to their blocks; run periodically by Celery beat.
+        Holds in the hold store expire on their own; this clears rows placed
+        before holds moved there. One short transaction per block.
+        """
+        now = timezone.now()
+        expired_by_block = SeatHold.objects.filter(
             is_active=True,
-            expires_at__lt=timezone.now()
-        ).select_related('seat_block')
+            expires_at__lt=now
+        ).values('seat_block_id').annotate(seats=models.Sum('quantity')).order_by()
         
-        for hold in expired_holds:
+        blocks = seats = 0
+        for row in expired_by_block:
             with transaction.atomic():
-                # Return seats to availability
-                seat_block = SeatBlock.objects.select_for_update().get(id=hold.seat_block.id)
-                seat_block.available_seats += hold.quantity
-                seat_block.held_seats -= hold.quantity
-                seat_block.save(update_fields=['available_seats', 'held_seats', 'updated_at'])
-                
-                # Deactivate hold
-                hold.is_active = False
-                hold.save(update_fields=['is_active'])
-        
-        if expired_holds.exists():
-            logger.info(f"Cleaned up {expired_holds.count()} expired seat holds")
+                seat_block = SeatBlock.objects.select_for_update().get(id=row['seat_block_id'])
+                released = AmphitheaterService._release_expired_holds(seat_block, now)
+                if released:
+                    seat_block.save(update_fields=['available_seats', 'held_seats', 'occupancy', 'updated_at'])
+                    blocks += 1
+                    seats += released
+        
+        if seats:
+            logger.info(f"Released {seats} seats from expired holds in {blocks} seat blocks")
+        return {'blocks': blocks, 'seats': seats}
     
     @staticmethod
     @transaction.atomic
     def release_hold(hold_id: str) -> bool:
         """Manually release a seat hold (e.g., user cancels)."""
+        hold_id = str(hold_id)
+        try:
+            hold = SeatHoldStore.get(hold_id)
+            if hold is not None:
+                # Index writes are serialized by the block lock
+                SeatBlock.objects.select_for_update().filter(id=hold['seat_block_id']).first()
+                SeatHoldStore.remove(hold['seat_block_id'], [hold_id])
+                logger.info(f"Released seat hold {hold_id}")
+                return True
+        except SeatHoldStoreUnavailable as e:
+            logger.error(f"Seat hold store unavailable releasing hold {hold_id}: {e}")
+            return False
+        
         try:
             hold = SeatHold.objects.select_for_update().get(id=hold_id, is_active=True)
         except SeatHold.DoesNotExist:
@@ -394,7 +809,9 @@ class AmphitheaterService:
         seat_block = SeatBlock.objects.select_for_update().get(id=hold.seat_block.id)
         seat_block.available_seats += hold.quantity
         seat_block.held_seats -= hold.quantity
-        seat_block.save(update_fields=['available_seats', 'held_seats', 'updated_at'])
+        AmphitheaterService._release_seats(seat_block, hold.allocated_seats)
+        seat_block.save(update_fields=['available_seats', 'held_seats', 'occupancy', 'updated_at'])
+        AmphitheaterService._availability_changed(seat_block.event_date)
         
         # Deactivate hold
         hold.is_active = False
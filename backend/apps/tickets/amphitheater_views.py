@@ -8,7 +8,6 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from drf_spectacular.utils import extend_schema
-from django.core.cache import cache
 
 from .amphitheater_models import Venue, Section, SeatBlock
 from .amphitheater_services import AmphitheaterService
@@ -60,26 +59,16 @@ class VenueSectionsView(APIView):
                 'error': 'event_date parameter is required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Cache key for performance
-        cache_key = f'venue_sections_{venue_id}_{event_date}'
-        cached = cache.get(cache_key)
+        # Served from a snapshot that holds, releases and conversions invalidate
+        sections, cached = AmphitheaterService.get_section_snapshot(venue_id, event_date)
         
-        if cached:
-            return Response({
-                'success': True,
-                'data': cached,
-                'cached': True
-            })
-        
-        sections = AmphitheaterService.get_venue_sections(venue_id, event_date)
-        
-        # Cache for 30 seconds (short TTL due to real-time availability)
-        cache.set(cache_key, sections, timeout=30)
-        
-        return Response({
+        response = {
             'success': True,
             'data': sections
-        })
+        }
+        if cached:
+            response['cached'] = True
+        return Response(response)
 
 
 class CheckAvailabilityView(APIView):
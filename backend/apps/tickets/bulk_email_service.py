@@ -0,0 +1,232 @@
+"""
+Bulk email jobs sent through SendGrid personalization batches.
+One request carries up to SENDGRID_BATCH_SIZE recipients, each with their own substitutions.
+"""
+import html
+import logging
+from typing import Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.accounts.models import User
+from .models import Order, BulkJob
+from .sendgrid_client import get_sendgrid_client, SendGridError, MAX_PERSONALIZATIONS
+
+logger = logging.getLogger(__name__)
+
+
+TICKET_RESEND_TEXT = """
+Hello -name-!
+
+Here are your OC MENA Festival tickets for order -order_number-.
+
+View, download or add your tickets to your wallet from your dashboard:
+-dashboard_url-
+
+See you at the festival!
+OC MENA Festival Team
+"""
+
+TICKET_RESEND_HTML = """
+<div style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto;">
+    <h2>Your OC MENA Festival Tickets</h2>
+    <p>Hello -name_html-!</p>
+    <p>Here are your tickets for order <strong>-order_number-</strong>.</p>
+    <p><a href="-dashboard_url-" style="display: inline-block; background: #dc3545; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px;">View My Tickets</a></p>
+    <p>See you at the festival!<br>OC MENA Festival Team</p>
+</div>
+"""
+
+INVOICE_RESEND_TEXT = """
+Hello -name-!
+
+Your invoice for order -order_number- (total -total-) is available in your dashboard:
+-dashboard_url-
+
+OC MENA Festival Team
+"""
+
+INVOICE_RESEND_HTML = """
+<div style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto;">
+    <h2>Your OC MENA Festival Invoice</h2>
+    <p>Hello -name_html-!</p>
+    <p>Your invoice for order <strong>-order_number-</strong> (total <strong>-total-</strong>) is available in your dashboard.</p>
+    <p><a href="-dashboard_url-">View Invoice</a></p>
+    <p>OC MENA Festival Team</p>
+</div>
+"""
+
+
+class BulkEmailService:
+    """Service for creating and running bulk email jobs."""
+
+    TICKET_RESEND = 'ticket_resend'
+    INVOICE_RESEND = 'invoice_resend'
+    ANNOUNCEMENT = 'announcement'
+
+    TEMPLATES = {
+        TICKET_RESEND: ('Your OC MENA Festival Tickets - Order #-order_number-', TICKET_RESEND_TEXT, TICKET_RESEND_HTML),
+        INVOICE_RESEND: ('Your OC MENA Festival Invoice - Order #-order_number-', INVOICE_RESEND_TEXT, INVOICE_RESEND_HTML),
+    }
+
+    @classmethod
+    def _recipients(cls, params: dict):
+        """
+        One row per paid order for resends, and one per buyer with a paid order
+        for announcements, ordered by the id the job's cursor follows.
+        """
+        orders = Order.objects.filter(status=Order.Status.PAID)
+        if params.get('order_ids'):
+            orders = orders.filter(id__in=params['order_ids'])
+        if params['template'] == cls.ANNOUNCEMENT:
+            return User.objects.filter(id__in=orders.values('buyer_id')).order_by('id').values('id', 'email', 'full_name')
+        return orders.order_by('id').values(
+            'id', 'order_number', 'total_cents', email=F('buyer__email'), full_name=F('buyer__full_name')
+        )
+
+    @classmethod
+    def _content(cls, params: dict) -> tuple[str, str, str]:
+        """Subject, text and HTML bodies shared by every recipient of the job."""
+        template = params['template']
+        if template == cls.ANNOUNCEMENT:
+            message = params['message']
+            body_html = html.escape(message).replace('\n', '<br>')
+            return (
+                params['subject'],
+                f"Hello -name-!\n\n{message}\n\nOC MENA Festival Team\n",
+                f'<div style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">'
+                f'<p>Hello -name_html-!</p><p>{body_html}</p><p>OC MENA Festival Team</p></div>'
+            )
+        return cls.TEMPLATES[template]
+
+    @staticmethod
+    def _personalization(recipient: dict) -> dict:
+        name = recipient['full_name'] or 'there'
+        substitutions = {
+            '-name-': name,
+            # Names come from guest checkout, so the HTML bodies get them escaped
+            '-name_html-': html.escape(name),
+        }
+        if 'order_number' in recipient:
+            substitutions.update({
+                '-order_number-': recipient['order_number'],
+                '-total-': f"${recipient['total_cents'] / 100:.2f}",
+                '-dashboard_url-': f"{settings.FRONTEND_URL}/dashboard",
+            })
+        return {
+            'to': [{'email': recipient['email'], 'name': name}],
+            'substitutions': substitutions,
+        }
+
+    @classmethod
+    def start(
+        cls,
+        template: str,
+        order_ids: Optional[list] = None,
+        subject: str = '',
+        message: str = '',
+        created_by=None,
+        queue: bool = True
+    ) -> BulkJob:
+        """Create a bulk email job and, unless queue is False, queue it once the transaction commits."""
+        if template == cls.ANNOUNCEMENT:
+            if not subject or not message:
+                raise ValueError("Announcements need a subject and message")
+        elif template not in cls.TEMPLATES:
+            raise ValueError(f"Unknown email template: {template}")
+
+        params = {'template': template}
+        if order_ids:
+            params['order_ids'] = [str(order_id) for order_id in order_ids]
+        if template == cls.ANNOUNCEMENT:
+            params.update(subject=subject, message=message)
+
+        total = cls._recipients(params).count()
+        if not total:
+            raise ValueError("No paid orders to email")
+
+        job = BulkJob.objects.create(
+            kind=BulkJob.Kind.EMAIL_BROADCAST,
+            params=params,
+            total_count=total,
+            created_by=created_by
+        )
+
+        if queue:
+            transaction.on_commit(lambda: cls.enqueue(job))
+
+        logger.info(f"Bulk email job {job.id} created for {total} recipients ({template})")
+        return job
+
+    @staticmethod
+    def enqueue(job: BulkJob) -> None:
+        from .tasks import run_bulk_email_job
+        try:
+            run_bulk_email_job.delay(str(job.id))
+        except Exception as e:
+            logger.error(f"Failed to queue bulk email job {job.id}: {e}")
+
+    @staticmethod
+    def fail(job_id: str) -> None:
+        """Mark a job that ran out of retries failed; it keeps its cursor, so --resume continues it."""
+        BulkJob.objects.filter(id=job_id).update(status=BulkJob.Status.FAILED, finished_at=timezone.now())
+        logger.error(f"Bulk email job {job_id} failed after exhausting its retries")
+
+    @classmethod
+    def run(cls, job_id: str, batch_size: Optional[int] = None, progress=None) -> BulkJob:
+        """
+        Send a job's emails batch by batch, continuing after the job's cursor.
+        Transient SendGrid errors are raised with the cursor saved so the job can resume.
+        """
+        batch_size = min(batch_size or getattr(settings, 'SENDGRID_BATCH_SIZE', MAX_PERSONALIZATIONS), MAX_PERSONALIZATIONS)
+        job = BulkJob.objects.get(id=job_id)
+        if job.status == BulkJob.Status.COMPLETED:
+            return job
+
+        job.status = BulkJob.Status.RUNNING
+        job.started_at = job.started_at or timezone.now()
+        job.save(update_fields=['status', 'started_at'])
+
+        subject, text_content, html_content = cls._content(job.params)
+        client = get_sendgrid_client()
+        recipients_qs = cls._recipients(job.params)
+
+        while True:
+            batch_qs = recipients_qs.filter(id__gt=job.cursor) if job.cursor else recipients_qs
+            recipients = list(batch_qs[:batch_size])
+            if not recipients:
+                break
+
+            try:
+                client.send_batch(
+                    [cls._personalization(r) for r in recipients],
+                    subject=subject,
+                    text_content=text_content,
+                    html_content=html_content
+                )
+                job.processed_count += len(recipients)
+            except SendGridError as e:
+                if e.is_transient:
+                    logger.warning(f"Bulk email job {job.id} paused at {job.cursor or 'start'}: {e}")
+                    raise
+                logger.error(f"Bulk email job {job.id} batch rejected: {e}")
+                job.failed_count += len(recipients)
+
+            job.cursor = str(recipients[-1]['id'])
+            job.save(update_fields=['cursor', 'processed_count', 'failed_count'])
+
+            if progress:
+                progress(job)
+
+        job.status = BulkJob.Status.FAILED if job.failed_count else BulkJob.Status.COMPLETED
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'finished_at'])
+
+        logger.info(
+            f"Bulk email job {job.id} {job.status}: {job.processed_count}/{job.total_count} sent, "
+            f"{job.failed_count} failed, {job.throughput:.1f}/s"
+        )
+        return job
@@ -0,0 +1,128 @@
+"""
+Collision-free, non-guessable codes for orders and tickets.
+Each code is a keyed permutation of a database sequence value, so two
+sequence values never map to the same code and the codes don't reveal the
+sequence. Workers reserve sequence values in blocks and hand them out from
+memory, so bulk issuance needs neither collision checks nor retries.
+"""
+import hashlib
+import hmac
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import connection, transaction
+
+BASE32_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ234567'
+
+
+class CodeAllocator:
+    """
+    Hands out codes of `bits` bits (encoded as base32) from a named sequence.
+    The permutation is a 4-round Feistel network keyed with CODE_ALLOCATOR_KEY,
+    with cycle walking for odd bit widths. The key must never change once
+    codes have been issued, or new codes could repeat old ones.
+    """
+    ROUNDS = 4
+
+    def __init__(self, name: str, bits: int):
+        self.name = name
+        self.bits = bits
+        self.half_bits = (bits + 1) // 2
+        self.width = -(-bits // 5)
+        self._lock = threading.Lock()
+        self._values = deque()
+        self._pid = None
+
+    @property
+    def sequence_name(self) -> str:
+        return f"code_seq_{self.name}"
+
+    def _round_key(self) -> bytes:
+        secret = getattr(settings, 'CODE_ALLOCATOR_KEY', settings.SECRET_KEY)
+        return hmac.new(secret.encode(), self.name.encode(), hashlib.sha256).digest()
+
+    def permute(self, value: int) -> int:
+        """Map a sequence value to its code number; a bijection on [0, 2**bits)."""
+        if not 0 <= value < 1 << self.bits:
+            raise ValueError(f"{self.name} sequence exhausted")
+        mac = hmac.new(self._round_key(), digestmod=hashlib.sha256)
+        mask = (1 << self.half_bits) - 1
+        while True:
+            left, right = value >> self.half_bits, value & mask
+            for round_number in range(self.ROUNDS):
+                f = mac.copy()
+                f.update(bytes([round_number]) + right.to_bytes(8, 'big'))
+                left, right = right, left ^ (int.from_bytes(f.digest()[:8], 'big') & mask)
+            value = (left << self.half_bits) | right
+            # Cycle walking keeps the result inside the domain for odd widths
+            if value < 1 << self.bits:
+                return value
+
+    def encode(self, number: int) -> str:
+        chars = []
+        for _ in range(self.width):
+            number, digit = divmod(number, 32)
+            chars.append(BASE32_ALPHABET[digit])
+        return ''.join(reversed(chars))
+
+    def _reserve(self, count: int) -> list[int]:
+        """Reserve `count` sequence values in one round trip."""
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT nextval(%s) FROM generate_series(1, %s)',
+                    [self.sequence_name, count]
+                )
+                return [row[0] for row in cursor.fetchall()]
+
+        # No sequences here; a counter row serializes block reservations instead.
+        # Unlike nextval() its update is transactional, which take() allows for
+        from .models import CodeSequence
+
+        with transaction.atomic():
+            sequence, _ = CodeSequence.objects.select_for_update().get_or_create(name=self.name)
+            start = sequence.next_value
+            sequence.next_value = start + count
+            sequence.save(update_fields=['next_value'])
+        return list(range(start, start + count))
+
+    def take(self, count: int) -> list[int]:
+        """Next `count` sequence values, reserving a new block when the current one runs out."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked worker must not reuse its parent's block
+                self._values.clear()
+                self._pid = os.getpid()
+            if len(self._values) < count:
+                block_size = getattr(settings, 'CODE_BLOCK_SIZE', 1000)
+                needed = count - len(self._values)
+                reserved = self._reserve(max(block_size, needed))
+                if connection.vendor != 'postgresql' and connection.in_atomic_block:
+                    # The counter row rolls back with the caller's transaction, so the rest
+                    # of the block is only kept once that commits
+                    taken = [self._values.popleft() for _ in range(len(self._values))] + reserved[:needed]
+                    rest, pid = reserved[needed:], self._pid
+                    transaction.on_commit(lambda: self._keep(rest, pid))
+                    return taken
+                self._values.extend(reserved)
+            return [self._values.popleft() for _ in range(count)]
+
+    def _keep(self, values: list[int], pid: int) -> None:
+        with self._lock:
+            if self._pid == pid:
+                self._values.extend(values)
+
+    def codes(self, count: int) -> list[str]:
+        """Allocate `count` distinct codes."""
+        return [self.encode(self.permute(value)) for value in self.take(count)]
+
+    def code(self) -> str:
+        return self.codes(1)[0]
+
+
+# 80-bit ticket codes (16 characters); legacy random codes are 22 characters, so they never clash
+ticket_codes = CodeAllocator('ticket_code', bits=80)
+# 35-bit order suffixes (7 characters); legacy suffixes are 6 hex characters
+order_numbers = CodeAllocator('order_number', bits=35)
@@ -0,0 +1,102 @@
+"""
+Local stand-in for the SendGrid v3 mail/send API, for tests and benchmarks.
+Run with: python manage.py fake_sendgrid, then set SENDGRID_API_URL=http://127.0.0.1:<port>
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .sendgrid_client import MAX_PERSONALIZATIONS
+
+
+class FakeSendGridHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status_code: int, body: dict = None, headers: dict = None):
+        payload = json.dumps(body).encode() if body else b''
+        self.send_response(status_code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length)
+
+        if self.path != '/v3/mail/send':
+            return self._reply(404, {'errors': [{'message': 'Not found'}]})
+        if not self.headers.get('Authorization', '').startswith('Bearer '):
+            return self._reply(401, {'errors': [{'message': 'Missing API key'}]})
+
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return self._reply(400, {'errors': [{'message': 'Invalid JSON'}]})
+
+        personalizations = message.get('personalizations') or []
+        if not personalizations or len(personalizations) > MAX_PERSONALIZATIONS:
+            return self._reply(400, {'errors': [{'message': 'Invalid personalizations'}]})
+
+        with server.lock:
+            server.request_count += 1
+            throttle = server.rate_limit_every and server.request_count % server.rate_limit_every == 0
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        if throttle:
+            return self._reply(429, {'errors': [{'message': 'Too many requests'}]}, {'Retry-After': '1'})
+
+        with server.lock:
+            server.messages.append(message)
+        self._reply(202)
+
+
+class FakeSendGridServer(ThreadingHTTPServer):
+    """
+    Records accepted messages in memory.
+    latency adds a delay per request; rate_limit_every returns 429 for every Nth request.
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, rate_limit_every: int = 0):
+        super().__init__((host, port), FakeSendGridHandler)
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.lock = threading.Lock()
+        self.messages = []
+        self.request_count = 0
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def recipients(self) -> list[str]:
+        with self.lock:
+            return [
+                to['email']
+                for message in self.messages
+                for personalization in message['personalizations']
+                for to in personalization['to']
+            ]
+
+    def start(self) -> 'FakeSendGridServer':
+        """Serve from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,249 @@
+"""
+Ticket inventory reservations backed by atomic cache counters.
+Each capacity-limited ticket type has a counter of committed tickets
+(sold + reserved by unpaid orders) so checkouts don't queue on the
+TicketType row lock. A reservation is first recorded as pending, in
+per-minute ledger counters that expire on their own, and moves onto the
+committed counter only when its order's transaction commits; one whose
+transaction rolls back simply expires. The counters are reconciled against
+the database periodically, which also releases reservations of abandoned
+orders.
+"""
+import logging
+import time
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import TicketType, Order, OrderItem
+
+logger = logging.getLogger(__name__)
+
+
+class InventoryUnavailable(Exception):
+    """Raised when the reservation counters can't be reached."""
+
+
+class InventoryService:
+    """Service for reserving ticket inventory ahead of payment."""
+
+    # Unpaid orders hold their tickets this long before reconciliation frees them
+    RESERVATION_TTL = timedelta(minutes=30)
+    # How long a confirmed/released marker is kept for an order
+    SETTLED_TIMEOUT = 60 * 60 * 24
+    CONFIRMED = 'confirmed'
+    RELEASED = 'released'
+    # Pending reservations are kept in ledger buckets of this many seconds, each
+    # expiring PENDING_TIMEOUT after it is opened; this must exceed the longest
+    # checkout transaction by at least a bucket
+    PENDING_BUCKET = 60
+    PENDING_TIMEOUT = 5 * 60
+
+    @staticmethod
+    def counter_key(ticket_type_id) -> str:
+        return f"inventory:ticket_type:{ticket_type_id}:committed"
+
+    @staticmethod
+    def pending_key(ticket_type_id, bucket: int) -> str:
+        return f"inventory:ticket_type:{ticket_type_id}:pending:{bucket}"
+
+    @classmethod
+    def pending_bucket(cls) -> int:
+        """The ledger bucket new reservations are recorded in."""
+        return int(time.time() // cls.PENDING_BUCKET)
+
+    @staticmethod
+    def settled_key(order_id) -> str:
+        return f"inventory:order:{order_id}:settled"
+
+    @classmethod
+    def committed_from_db(cls, ticket_type_ids: Optional[Iterable] = None) -> dict:
+        """
+        Sold plus actively reserved quantity per capacity-limited ticket type.
+        Unpaid orders older than RESERVATION_TTL no longer count.
+        """
+        cutoff = timezone.now() - cls.RESERVATION_TTL
+        ticket_types = TicketType.objects.filter(capacity__isnull=False)
+        if ticket_type_ids is not None:
+            ticket_types = ticket_types.filter(id__in=list(ticket_type_ids))
+
+        ticket_types = ticket_types.annotate(sharded=Coalesce(Sum('sold_counters__count'), 0))
+        committed = {
+            tt_id: sold + sharded
+            for tt_id, sold, sharded in ticket_types.values_list('id', 'sold_count', 'sharded')
+        }
+
+        reserved = OrderItem.objects.filter(
+            ticket_type_id__in=list(committed),
+            order__status__in=[Order.Status.CREATED, Order.Status.PAYMENT_PENDING],
+            order__paid_at__isnull=True,
+            order__created_at__gte=cutoff
+        ).values('ticket_type_id').annotate(quantity=Sum('quantity'))
+
+        for row in reserved:
+            committed[row['ticket_type_id']] += row['quantity']
+        return committed
+
+    @classmethod
+    def _incr(cls, ticket_type_id, delta: int, counted: bool = False) -> int:
+        """
+        Atomically adjust a counter, seeding it from the database if missing.
+        counted: the database already includes delta, so a freshly seeded counter is left as is.
+        """
+        key = cls.counter_key(ticket_type_id)
+        try:
+            try:
+                return cache.incr(key, delta)
+            except ValueError:
+                # Counter missing (first use or evicted); add() is a no-op if another worker won
+                seed = cls.committed_from_db([ticket_type_id]).get(ticket_type_id, 0)
+                if cache.add(key, seed, timeout=None) and counted:
+                    return seed
+                return cache.incr(key, delta)
+        except Exception as e:
+            raise InventoryUnavailable(str(e)) from e
+
+    @classmethod
+    def pending(cls, ticket_type_id) -> int:
+        """Quantity reserved by checkouts whose transactions haven't committed yet."""
+        bucket = cls.pending_bucket()
+        keys = [
+            cls.pending_key(ticket_type_id, bucket - age)
+            for age in range(cls.PENDING_TIMEOUT // cls.PENDING_BUCKET + 1)
+        ]
+        try:
+            return sum(cache.get_many(keys).values())
+        except Exception as e:
+            raise InventoryUnavailable(str(e)) from e
+
+    @classmethod
+    def _adjust_pending(cls, ticket_type_id, bucket: int, delta: int) -> None:
+        key = cls.pending_key(ticket_type_id, bucket)
+        try:
+            cache.add(key, 0, timeout=cls.PENDING_TIMEOUT)
+            cache.incr(key, delta)
+        except Exception as e:
+            raise InventoryUnavailable(str(e)) from e
+
+    @classmethod
+    def reserve(cls, ticket_type: TicketType, quantity: int, bucket: int) -> bool:
+        """
+        Reserve tickets of a capacity-limited type as pending in a ledger bucket.
+        Returns False if there isn't enough inventory left.
+        Raises InventoryUnavailable if the counters can't be reached.
+        """
+        # Recorded before the check, so concurrent reservations always see each other
+        cls._adjust_pending(ticket_type.id, bucket, quantity)
+        committed = cls._incr(ticket_type.id, 0) + cls.pending(ticket_type.id)
+        if committed > ticket_type.capacity:
+            cls._adjust_pending(ticket_type.id, bucket, -quantity)
+            return False
+        return True
+
+    @classmethod
+    def commit_pending(cls, reservations: dict, bucket: int) -> None:
+        """Move pending reservations onto the committed counters once their order is committed."""
+        for ticket_type_id, quantity in reservations.items():
+            try:
+                # Counted before it leaves the ledger, so it is never briefly free
+                cls._incr(ticket_type_id, quantity, counted=True)
+                cls._adjust_pending(ticket_type_id, bucket, -quantity)
+            except Exception as e:
+                # Reconciliation counts the committed order; the pending entry expires
+                logger.warning(f"Failed to commit {quantity} of ticket type {ticket_type_id}: {e}")
+
+    @classmethod
+    def cancel_pending(cls, reservations: dict, bucket: int) -> None:
+        """Drop pending reservations whose order won't be created."""
+        for ticket_type_id, quantity in reservations.items():
+            try:
+                cls._adjust_pending(ticket_type_id, bucket, -quantity)
+            except Exception as e:
+                logger.warning(f"Failed to cancel {quantity} of ticket type {ticket_type_id}: {e}")
+
+    @classmethod
+    def release(cls, reservations: dict) -> None:
+        """Return reserved quantities ({ticket_type_id: quantity}) to inventory."""
+        for ticket_type_id, quantity in reservations.items():
+            try:
+                cls._incr(ticket_type_id, -quantity)
+            except Exception as e:
+                # Reconciliation picks up anything we fail to hand back here
+                logger.warning(f"Failed to release {quantity} of ticket type {ticket_type_id}: {e}")
+
+    @classmethod
+    def _settle(cls, order: Order, outcome: str) -> Optional[str]:
+        """
+        Mark an order's reservation as confirmed or released, once.
+        Returns the earlier outcome if the order was already settled.
+        """
+        try:
+            if cache.add(cls.settled_key(order.id), outcome, timeout=cls.SETTLED_TIMEOUT):
+                return None
+            return cache.get(cls.settled_key(order.id))
+        except Exception as e:
+            logger.warning(f"Failed to settle inventory for order {order.order_number}: {e}")
+            return outcome
+
+    @classmethod
+    def confirm_order(cls, order: Order) -> None:
+        """Turn an order's reservation into a sale after payment."""
+        reservations = (order.metadata or {}).get('inventory_reservations')
+        if not reservations:
+            return
+        if cls._settle(order, cls.CONFIRMED) == cls.RELEASED:
+            # Paid after the reservation was handed back; take the tickets again
+            for ticket_type_id, quantity in reservations.items():
+                try:
+                    cls._incr(ticket_type_id, quantity)
+                except Exception as e:
+                    logger.warning(f"Failed to re-reserve ticket type {ticket_type_id}: {e}")
+
+    @classmethod
+    def release_order(cls, order: Order) -> None:
+        """Hand an unpaid order's reservation back to inventory."""
+        reservations = (order.metadata or {}).get('inventory_reservations')
+        if not reservations:
+            return
+        if cls._settle(order, cls.RELEASED) is None:
+            cls.release(reservations)
+
+    @classmethod
+    def reconcile(cls) -> dict:
+        """
+        Correct counter drift against the database.
+        Uncommitted reservations are only pending, so they're never taken off.
+        The counters are read before the database: an order committed in
+        between is then at worst counted twice until the next run, never missed.
+        Applied as a delta so changes made while this runs are kept.
+        Returns the adjustment made per ticket type.
+        """
+        ticket_type_ids = list(TicketType.objects.filter(capacity__isnull=False).values_list('id', flat=True))
+        try:
+            counters = cache.get_many([cls.counter_key(ticket_type_id) for ticket_type_id in ticket_type_ids])
+        except Exception as e:
+            logger.warning(f"Failed to reconcile ticket inventory: {e}")
+            return {}
+
+        adjustments = {}
+        for ticket_type_id, expected in cls.committed_from_db(ticket_type_ids).items():
+            key = cls.counter_key(ticket_type_id)
+            try:
+                current = counters.get(key)
+                if current is None:
+                    cache.add(key, expected, timeout=None)
+                    continue
+                delta = expected - current
+                if delta:
+                    cache.incr(key, delta)
+                    adjustments[str(ticket_type_id)] = delta
+            except Exception as e:
+                logger.warning(f"Failed to reconcile inventory for ticket type {ticket_type_id}: {e}")
+
+        if adjustments:
+            logger.info(f"Reconciled ticket inventory: {adjustments}")
+        return adjustments
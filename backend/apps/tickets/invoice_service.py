@@ -0,0 +1,263 @@
+"""
+Invoice PDF generation, including chunked bulk regeneration.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from typing import Optional
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Order, Invoice, BulkJob
+
+logger = logging.getLogger(__name__)
+
+
+class InvoiceRenderer:
+    """
+    Renders invoice PDFs with ReportLab.
+    Styles are built once; one renderer is shared per worker process.
+    """
+
+    def __init__(self):
+        from reportlab.lib import colors
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import TableStyle
+
+        self.styles = getSampleStyleSheet()
+        self.table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+
+    def render(self, order: Order, invoice: Invoice) -> bytes:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+
+        styles = self.styles
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        elements = []
+
+        # Header
+        elements.append(Paragraph("OC MENA Festival", styles['Heading1']))
+        elements.append(Paragraph(f"Invoice #{invoice.invoice_number}", styles['Heading2']))
+        elements.append(Spacer(1, 20))
+
+        # Order info
+        elements.append(Paragraph(f"Order: {order.order_number}", styles['Normal']))
+        elements.append(Paragraph(f"Date: {order.paid_at.strftime('%B %d, %Y') if order.paid_at else 'N/A'}", styles['Normal']))
+        elements.append(Paragraph(f"Customer: {order.buyer.full_name}", styles['Normal']))
+        elements.append(Paragraph(f"Email: {order.buyer.email}", styles['Normal']))
+        elements.append(Spacer(1, 20))
+
+        # Items table
+        data = [['Item', 'Qty', 'Unit Price', 'Total']]
+        for item in order.items.all():
+            data.append([
+                item.ticket_type.name if item.ticket_type else 'Amphitheater Ticket',
+                str(item.quantity),
+                f"${item.unit_price_cents / 100:.2f}",
+                f"${item.total_cents / 100:.2f}"
+            ])
+
+        data.append(['', '', 'Subtotal:', f"${order.subtotal_cents / 100:.2f}"])
+        data.append(['', '', 'Fees:', f"${order.fees_cents / 100:.2f}"])
+        data.append(['', '', 'Total:', f"${order.total_cents / 100:.2f}"])
+
+        table = Table(data)
+        table.setStyle(self.table_style)
+        elements.append(table)
+
+        doc.build(elements)
+
+        pdf = buffer.getvalue()
+        buffer.close()
+        return pdf
+
+
+class InvoiceService:
+    """Service for generating and storing invoice PDFs."""
+
+    DEFAULT_CHUNK_SIZE = 200
+    DEFAULT_WRITE_WORKERS = 4
+
+    _renderer = None
+
+    @classmethod
+    def get_renderer(cls) -> InvoiceRenderer:
+        if cls._renderer is None:
+            cls._renderer = InvoiceRenderer()
+        return cls._renderer
+
+    @staticmethod
+    def _write_file(invoice: Invoice, pdf: bytes) -> Invoice:
+        """Store a rendered PDF and point the invoice at it (without saving the row)."""
+        old_name = invoice.pdf_file.name
+        name = default_storage.save(f"invoices/{invoice.invoice_number}.pdf", ContentFile(pdf))
+        if old_name and old_name != name:
+            try:
+                default_storage.delete(old_name)
+            except Exception as e:
+                logger.warning(f"Failed to delete old invoice file {old_name}: {e}")
+        invoice.pdf_file.name = name
+        invoice.generated_at = timezone.now()
+        return invoice
+
+    @classmethod
+    def generate_for_order(cls, order: Order) -> Invoice:
+        """Render and store the invoice PDF for a single order."""
+        invoice = order.invoice
+        pdf = cls.get_renderer().render(order, invoice)
+        cls._write_file(invoice, pdf)
+        invoice.save(update_fields=['pdf_file', 'generated_at'])
+        return invoice
+
+    @staticmethod
+    def pending_order_ids(since: Optional[datetime] = None) -> list:
+        """Paid orders whose invoice has not been generated since the given time."""
+        orders = Order.objects.filter(status=Order.Status.PAID)
+        if since:
+            orders = orders.exclude(invoice__generated_at__gte=since)
+        return list(orders.order_by('paid_at', 'id').values_list('id', flat=True))
+
+    @classmethod
+    def regenerate_chunk(
+        cls,
+        order_ids: list,
+        since: Optional[datetime] = None,
+        max_workers: int = DEFAULT_WRITE_WORKERS
+    ) -> dict:
+        """
+        Regenerate invoices for a chunk of orders.
+        Orders and items are prefetched in a constant number of queries, PDFs are
+        rendered with the shared renderer and files are written concurrently.
+        """
+        orders = list(
+            Order.objects.filter(id__in=order_ids)
+            .select_related('buyer')
+            .prefetch_related('items__ticket_type')
+        )
+
+        # Create any missing invoice records in one statement
+        invoices = {inv.order_id: inv for inv in Invoice.objects.filter(order_id__in=order_ids)}
+        missing = [
+            Invoice(order=order, invoice_number=Invoice.generate_invoice_number(order))
+            for order in orders if order.id not in invoices
+        ]
+        if missing:
+            Invoice.objects.bulk_create(missing, ignore_conflicts=True)
+            invoices = {inv.order_id: inv for inv in Invoice.objects.filter(order_id__in=order_ids)}
+
+        renderer = cls.get_renderer()
+        rendered = []
+        failed = 0
+        skipped = 0
+
+        for order in orders:
+            invoice = invoices.get(order.id)
+            if invoice is None:
+                failed += 1
+                continue
+            # Already done by an earlier attempt of this run
+            if since and invoice.generated_at and invoice.generated_at >= since:
+                skipped += 1
+                continue
+            try:
+                rendered.append((invoice, renderer.render(order, invoice)))
+            except Exception as e:
+                logger.error(f"Failed to render invoice for order {order.order_number}: {e}")
+                failed += 1
+
+        written = []
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(cls._write_file, invoice, pdf) for invoice, pdf in rendered]
+            for future in futures:
+                try:
+                    written.append(future.result())
+                except Exception as e:
+                    logger.error(f"Failed to store invoice PDF: {e}")
+                    failed += 1
+
+        if written:
+            Invoice.objects.bulk_update(written, ['pdf_file', 'generated_at'])
+
+        return {'processed': len(written), 'failed': failed, 'skipped': skipped}
+
+    @staticmethod
+    def chunked(ids: list, chunk_size: int) -> list[list]:
+        return [ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size)]
+
+    @classmethod
+    def start_regeneration(
+        cls,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        resume: bool = False,
+        created_by=None
+    ) -> tuple[BulkJob, list[list]]:
+        """
+        Create (or resume) an invoice regeneration job and return it with its pending chunks.
+        A resumed job only picks up orders not regenerated since the job was created.
+        """
+        job = None
+        if resume:
+            job = BulkJob.objects.filter(
+                kind=BulkJob.Kind.INVOICE_REGENERATION,
+                status__in=[BulkJob.Status.PENDING, BulkJob.Status.RUNNING, BulkJob.Status.FAILED]
+            ).order_by('-created_at').first()
+
+        if job is None:
+            job = BulkJob.objects.create(
+                kind=BulkJob.Kind.INVOICE_REGENERATION,
+                params={'chunk_size': chunk_size},
+                created_by=created_by
+            )
+
+        order_ids = [str(order_id) for order_id in cls.pending_order_ids(since=job.created_at)]
+
+        if job.status == BulkJob.Status.PENDING:
+            job.total_count = len(order_ids)
+        # Failed orders are still pending and get retried by this run
+        job.failed_count = 0
+        job.status = BulkJob.Status.RUNNING
+        job.started_at = job.started_at or timezone.now()
+        job.finished_at = None
+        job.save(update_fields=['total_count', 'failed_count', 'status', 'started_at', 'finished_at'])
+
+        return job, cls.chunked(order_ids, chunk_size)
+
+    @staticmethod
+    def record_progress(job_id: str, processed: int, failed: int) -> None:
+        BulkJob.objects.filter(id=job_id).update(
+            processed_count=F('processed_count') + processed,
+            failed_count=F('failed_count') + failed
+        )
+
+    @staticmethod
+    def finish_job(job_id: str) -> BulkJob:
+        job = BulkJob.objects.get(id=job_id)
+        job.status = BulkJob.Status.FAILED if job.failed_count else BulkJob.Status.COMPLETED
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'finished_at'])
+
+        logger.info(
+            f"Bulk job {job.id} {job.status}: {job.processed_count}/{job.total_count} processed, "
+            f"{job.failed_count} failed, {job.throughput:.1f}/s"
+        )
+        return job
+
+    @staticmethod
+    def fail_job(job_id: str) -> None:
+        """Mark a job failed when one of its chunks ran out of retries; --resume picks it up again."""
+        BulkJob.objects.filter(id=job_id).update(status=BulkJob.Status.FAILED, finished_at=timezone.now())
+        logger.error(f"Bulk job {job_id} failed: a chunk exhausted its retries")
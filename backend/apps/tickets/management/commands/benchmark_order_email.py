@@ -0,0 +1,82 @@
+"""
+Management command to benchmark order confirmation email assembly.
+Usage: python manage.py benchmark_order_email [--sizes 1 10 50] [--iterations 20]
+
+Creates throwaway orders inside a transaction that is rolled back.
+"""
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.tickets.models import TicketType, Order, Ticket
+from apps.tickets.email_service import TicketEmailService
+from apps.tickets.services import QRCodeService
+
+
+class Command(BaseCommand):
+    help = 'Time order confirmation assembly for orders with 1, 10 and 50 tickets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1, 10, 50])
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        self.stdout.write(f'{"tickets":>8} {"cold ms":>10} {"warm ms":>10} {"html KB":>9}')
+        self.stdout.write('-' * 40)
+
+        with transaction.atomic():
+            buyer = User.objects.create_user(
+                email=f'benchmark-{timezone.now().timestamp()}@example.com',
+                password=None,
+                full_name='Benchmark Buyer'
+            )
+            ticket_type = TicketType.objects.create(
+                name='Benchmark Pass',
+                slug=f'benchmark-{int(time.time())}',
+                price_cents=3500,
+                valid_days=['2026-06-19', '2026-06-20', '2026-06-21'],
+                is_active=False
+            )
+
+            for size in options['sizes']:
+                order = Order.objects.create(
+                    order_number=Order.generate_order_number(),
+                    buyer=buyer,
+                    idempotency_key=f'benchmark-{size}-{time.time()}',
+                    status=Order.Status.PAID,
+                    total_cents=3500 * size,
+                )
+                tickets = [
+                    Ticket.objects.create(
+                        ticket_code=Ticket.generate_ticket_code(),
+                        owner=buyer,
+                        ticket_type=ticket_type,
+                        order=order
+                    )
+                    for _ in range(size)
+                ]
+
+                # Cold: QR codes rendered for the first time
+                started = time.perf_counter()
+                email = TicketEmailService.build_order_confirmation(order, tickets)
+                cold_ms = (time.perf_counter() - started) * 1000
+
+                # Warm: the usual case for resends and retries
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    TicketEmailService.build_order_confirmation(order, tickets)
+                warm_ms = (time.perf_counter() - started) * 1000 / iterations
+
+                self.stdout.write(
+                    f'{size:>8} {cold_ms:>10.1f} {warm_ms:>10.2f} {len(email["html"]) / 1024:>9.1f}'
+                )
+
+                cache.delete_many([QRCodeService.png_cache_key(t) for t in tickets])
+
+            transaction.set_rollback(True)
@@ -0,0 +1,139 @@
+"""
+Management command to benchmark seat allocation and simulate fragmentation.
+Usage: python manage.py benchmark_seat_allocator [--rows 35] [--seats 45] [--iterations 2000] [--sales 20] [--abandon 0.15]
+
+Timing: allocation latency for a group of --group seats at several fill levels.
+Fragmentation: sells a block to groups of mixed sizes, with some holds
+abandoned along the way, and reports how full it was when the first group
+had to be split up, how many groups were split and how many single seats
+were left orphaned.
+"best" is the NumPy best-available engine, "first" the first-fit bit scan.
+Runs in memory; no database needed.
+"""
+import random
+import statistics
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from apps.tickets.seat_allocator import best_available, occupancy_grid
+from apps.tickets.seat_bitmap import SeatBitmap, row_labels
+
+# Group sizes and how often they buy together
+GROUP_SIZES = [1, 2, 3, 4, 5, 6, 8]
+GROUP_WEIGHTS = [10, 40, 12, 22, 6, 6, 4]
+
+STRATEGIES = {
+    'best': best_available,
+    'first': lambda bitmap, quantity: bitmap.find(quantity),
+}
+
+
+def is_adjacent(seats) -> bool:
+    return len({seat['row'] for seat in seats}) == 1 and (
+        max(seat['seat'] for seat in seats) - min(seat['seat'] for seat in seats) == len(seats) - 1
+    )
+
+
+def orphaned_seats(bitmap: SeatBitmap) -> int:
+    """Free seats with taken seats (or a row edge) on both sides."""
+    padded = np.pad(occupancy_grid(bitmap), ((0, 0), (1, 1)), constant_values=True)
+    return int((~padded[:, 1:-1] & padded[:, :-2] & padded[:, 2:]).sum())
+
+
+class Command(BaseCommand):
+    help = 'Benchmark best-available seat allocation and simulate fragmentation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=35)
+        parser.add_argument('--seats', type=int, default=45, help='Seats per row')
+        parser.add_argument('--group', type=int, default=4, help='Group size for the timing runs')
+        parser.add_argument('--iterations', type=int, default=2000)
+        parser.add_argument('--sales', type=int, default=20, help='Simulated sell-outs per strategy')
+        parser.add_argument(
+            '--abandon',
+            type=float,
+            default=0.15,
+            help='Chance each step that an earlier hold is abandoned and its seats return',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rows = row_labels('A', 'ZZ')[:options['rows']]
+        self.layout = (rows, 1, options['seats'])
+        self.random = random.Random(options['seed'])
+
+        self.stdout.write(f'{len(rows)} rows x {options["seats"]} seats, groups of {options["group"]}')
+        self.stdout.write(f'{"strategy":>8} {"fill":>6} {"p50 us":>8} {"p99 us":>8}')
+        self.stdout.write('-' * 34)
+        for fill in (0.0, 0.5, 0.9):
+            for name, allocate in STRATEGIES.items():
+                latencies = self._time(allocate, fill, options)
+                self.stdout.write(
+                    f'{name:>8} {fill:>6.0%} {statistics.median(latencies):>8.1f} '
+                    f'{latencies[int(len(latencies) * 0.99) - 1]:>8.1f}'
+                )
+
+        self.stdout.write('')
+        self.stdout.write(f'{"strategy":>8} {"first split":>12} {"split groups":>13} {"orphans":>8}')
+        self.stdout.write('-' * 45)
+        for name, allocate in STRATEGIES.items():
+            results = [self._sell_out(allocate, options['abandon']) for _ in range(options['sales'])]
+            self.stdout.write(
+                f'{name:>8} {statistics.mean(r[0] for r in results):>12.1%} '
+                f'{statistics.mean(r[1] for r in results):>13.1f} '
+                f'{statistics.mean(r[2] for r in results):>8.1f}'
+            )
+
+    def _bitmap(self, fill: float) -> SeatBitmap:
+        bitmap = SeatBitmap(*self.layout)
+        bitmap.mark(
+            {'row': row, 'seat': seat}
+            for row in bitmap.rows
+            for seat in range(1, bitmap.seats_per_row + 1)
+            if self.random.random() < fill
+        )
+        return bitmap
+
+    def _time(self, allocate, fill, options) -> list:
+        bitmap = self._bitmap(fill)
+        latencies = []
+        for _ in range(options['iterations']):
+            started = time.perf_counter()
+            allocate(bitmap, options['group'])
+            latencies.append((time.perf_counter() - started) * 1e6)
+        latencies.sort()
+        return latencies
+
+    def _sell_out(self, allocate, abandon: float) -> tuple:
+        """
+        Sell a block out while some holds are abandoned and their seats return.
+        Returns (fill at first split, groups split, orphaned seats at the end).
+        """
+        bitmap = SeatBitmap(*self.layout)
+        capacity = len(bitmap.rows) * bitmap.seats_per_row
+        holds = []
+        sold = split = 0
+        first_split = None
+
+        for _ in range(capacity * 3):
+            if holds and self.random.random() < abandon:
+                seats = holds.pop(self.random.randrange(len(holds)))
+                bitmap.clear(seats)
+                sold -= len(seats)
+                continue
+
+            quantity = min(self.random.choices(GROUP_SIZES, GROUP_WEIGHTS)[0], capacity - sold)
+            seats = allocate(bitmap, quantity) if quantity else []
+            if not seats:
+                break
+            if not is_adjacent(seats):
+                split += 1
+                if first_split is None:
+                    first_split = sold / capacity
+            bitmap.mark(seats)
+            holds.append(seats)
+            sold += quantity
+
+        return first_split if first_split is not None else 1.0, split, orphaned_seats(bitmap)
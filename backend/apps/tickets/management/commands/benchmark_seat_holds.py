@@ -0,0 +1,124 @@
+"""
+Management command to benchmark concurrent amphitheater seat holds in one section.
+Usage: python manage.py benchmark_seat_holds [--shoppers 50] [--holds 500] [--blocks 10] [--quantity 2] [--hold-ms 5]
+
+Each shopper places holds in the same section, keeping the transaction open
+for --hold-ms after the hold (the rest of the request). "block" locks only the
+chosen seat block and skips blocks other shoppers have locked; "section" also
+locks the Section row first, as holds did before, so every shopper waits in line.
+Checks that no seat was held twice. Builds a throwaway venue and removes it afterwards.
+Needs PostgreSQL; SQLite serializes all writers regardless of locking.
+"""
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.tickets.amphitheater_models import Venue, Section, SeatBlock
+from apps.tickets.amphitheater_services import AmphitheaterService
+from apps.tickets.seat_bitmap import row_labels
+
+EVENT_DATE = date(2099, 6, 19)
+
+
+class Command(BaseCommand):
+    help = 'Measure seat holds per second for one section under concurrent shoppers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shoppers', type=int, default=50)
+        parser.add_argument('--holds', type=int, default=500)
+        parser.add_argument('--blocks', type=int, default=10, help='Seat blocks in the section')
+        parser.add_argument('--rows', type=int, default=10, help='Rows per block')
+        parser.add_argument('--seats', type=int, default=20, help='Seats per row')
+        parser.add_argument('--quantity', type=int, default=2, help='Seats per hold')
+        parser.add_argument('--hold-ms', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            raise CommandError('benchmark_seat_holds needs PostgreSQL')
+        capacity = options['blocks'] * options['rows'] * options['seats']
+        if options['holds'] * options['quantity'] > capacity:
+            raise CommandError(f'{options["holds"]} holds of {options["quantity"]} need more than {capacity} seats')
+
+        self.stdout.write(
+            f'{options["shoppers"]} shoppers, {options["holds"]} holds of {options["quantity"]}, '
+            f'{options["blocks"]} blocks'
+        )
+        self.stdout.write(f'{"lock":>8} {"holds/s":>10} {"p50 ms":>8} {"p95 ms":>8} {"failed":>7}')
+        self.stdout.write('-' * 45)
+
+        for lock in ('section', 'block'):
+            section = self._section(options)
+            try:
+                elapsed, results = self._run(section, lock, options)
+            finally:
+                section.venue.delete()
+
+            # Blocks have distinct rows, so (row, seat) identifies a seat in the section
+            seats = [(seat['row'], seat['seat']) for _, held in results for seat in held]
+            if len(seats) != len(set(seats)):
+                raise CommandError(f'{lock}: {len(seats) - len(set(seats))} seats were held twice')
+
+            latencies = sorted(latency for latency, _ in results)
+            failed = sum(1 for _, held in results if not held)
+            self.stdout.write(
+                f'{lock:>8} {options["holds"] / elapsed:>10.1f} '
+                f'{statistics.median(latencies):>8.1f} '
+                f'{latencies[int(len(latencies) * 0.95) - 1]:>8.1f} {failed:>7}'
+            )
+
+    def _section(self, options) -> Section:
+        venue = Venue.objects.create(
+            name='Benchmark Amphitheatre',
+            address='Benchmark',
+            capacity=options['blocks'] * options['rows'] * options['seats'],
+            is_active=False
+        )
+        section = Section.objects.create(
+            venue=venue,
+            name='Benchmark Section',
+            section_type=Section.SectionType.ORCHESTRA,
+            capacity=venue.capacity,
+            base_price_cents=10000
+        )
+        rows = row_labels('A', 'ZZZ')
+        SeatBlock.objects.bulk_create(
+            SeatBlock(
+                section=section,
+                event_date=EVENT_DATE,
+                row_start=rows[number * options['rows']],
+                row_end=rows[(number + 1) * options['rows'] - 1],
+                seat_start=1,
+                seat_end=options['seats'],
+                total_seats=options['rows'] * options['seats'],
+                available_seats=options['rows'] * options['seats'],
+                price_cents=10000
+            )
+            for number in range(options['blocks'])
+        )
+        return section
+
+    def _run(self, section, lock, options):
+        pause = options['hold_ms'] / 1000
+
+        def shop(number):
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    if lock == 'section':
+                        Section.objects.select_for_update().get(id=section.id)
+                    result = AmphitheaterService.create_seat_hold(
+                        str(section.id), EVENT_DATE, options['quantity'], session_key=f'benchmark-{number}'
+                    )
+                    time.sleep(pause)
+            finally:
+                connection.close()
+            return (time.perf_counter() - started) * 1000, result['seats'] if result['success'] else []
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['shoppers']) as pool:
+            results = list(pool.map(shop, range(options['holds'])))
+        return time.perf_counter() - started, results
@@ -0,0 +1,80 @@
+"""
+Management command to benchmark sold count updates under concurrent finalization.
+Usage: python manage.py benchmark_sold_count [--shards 1 4 16] [--orders 400] [--workers 16] [--hold-ms 20]
+
+Each simulated webhook opens a transaction, bumps the sold count and holds the
+transaction open for --hold-ms (the rest of finalize_order: tickets, invoice,
+outbox). "row" is the previous single TicketType row update.
+Needs PostgreSQL; SQLite serializes all writers regardless of sharding.
+"""
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F
+
+from apps.tickets.models import TicketType, TicketSoldCounter
+
+
+class Command(BaseCommand):
+    help = 'Compare finalize throughput of the single sold_count row against sharded counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shards', nargs='+', type=int, default=[1, 4, 16, 64])
+        parser.add_argument('--orders', type=int, default=400)
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--hold-ms', type=float, default=20.0)
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            raise CommandError('benchmark_sold_count needs PostgreSQL')
+
+        self.stdout.write(f'{"counter":>8} {"orders/s":>10} {"p50 ms":>8} {"p95 ms":>8}')
+        self.stdout.write('-' * 38)
+
+        for shards in [None] + options['shards']:
+            ticket_type = TicketType.objects.create(
+                name='Benchmark Pass',
+                slug=f'benchmark-sold-{time.time_ns()}',
+                price_cents=3500,
+                is_active=False
+            )
+            try:
+                elapsed, latencies = self._run(ticket_type, shards, options)
+                ticket_type.refresh_from_db()
+                sold = TicketSoldCounter.total(ticket_type, use_cache=False)
+                if sold != options['orders']:
+                    raise CommandError(f'Lost updates: expected {options["orders"]}, counted {sold}')
+            finally:
+                ticket_type.delete()
+
+            latencies.sort()
+            label = 'row' if shards is None else str(shards)
+            self.stdout.write(
+                f'{label:>8} {options["orders"] / elapsed:>10.1f} '
+                f'{statistics.median(latencies):>8.1f} '
+                f'{latencies[int(len(latencies) * 0.95) - 1]:>8.1f}'
+            )
+
+    def _run(self, ticket_type, shards, options):
+        hold = options['hold_ms'] / 1000
+
+        def finalize(_):
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    if shards is None:
+                        TicketType.objects.filter(id=ticket_type.id).update(sold_count=F('sold_count') + 1)
+                    else:
+                        TicketSoldCounter.increment(ticket_type.id, 1, slots=shards)
+                    time.sleep(hold)
+            finally:
+                connection.close()
+            return (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            latencies = list(pool.map(finalize, range(options['orders'])))
+        return time.perf_counter() - started, latencies
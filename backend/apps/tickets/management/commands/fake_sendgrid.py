@@ -0,0 +1,48 @@
+"""
+Management command to run a local fake SendGrid API for tests and benchmarks.
+Usage: python manage.py fake_sendgrid [--port 8025] [--latency-ms 50] [--rate-limit-every 0]
+"""
+from django.core.management.base import BaseCommand
+
+from apps.tickets.fake_sendgrid import FakeSendGridServer
+
+
+class Command(BaseCommand):
+    help = 'Run a local fake SendGrid mail/send API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8025)
+        parser.add_argument(
+            '--latency-ms',
+            type=int,
+            default=0,
+            help='Delay added to every request',
+        )
+        parser.add_argument(
+            '--rate-limit-every',
+            type=int,
+            default=0,
+            help='Answer every Nth request with 429 (0 disables)',
+        )
+
+    def handle(self, *args, **options):
+        server = FakeSendGridServer(
+            host=options['host'],
+            port=options['port'],
+            latency=options['latency_ms'] / 1000,
+            rate_limit_every=options['rate_limit_every']
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'Fake SendGrid listening on {server.url}'))
+        self.stdout.write(f'Run jobs with SENDGRID_API_URL={server.url} SENDGRID_API_KEY=fake')
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(
+                f'Accepted {len(server.messages)} requests for {len(server.recipients)} recipients'
+            )
@@ -0,0 +1,118 @@
+"""
+Management command to regenerate invoice PDFs for all paid orders.
+Usage: python manage.py regenerate_invoices [--chunk-size 200] [--resume] [--sync] [--wait]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.tickets.models import BulkJob
+from apps.tickets.invoice_service import InvoiceService
+
+
+class Command(BaseCommand):
+    help = 'Regenerate invoice PDFs for paid orders in chunks across Celery workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=InvoiceService.DEFAULT_CHUNK_SIZE,
+            help='Orders per chunk (default: 200)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=InvoiceService.DEFAULT_WRITE_WORKERS,
+            help='Concurrent file writes per chunk (default: 4)',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue the last unfinished run instead of starting a new one',
+        )
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Process chunks in this process instead of dispatching to Celery',
+        )
+        parser.add_argument(
+            '--wait',
+            action='store_true',
+            help='After dispatching, poll the job and report progress until it finishes',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        workers = options['workers']
+
+        job, chunks = InvoiceService.start_regeneration(chunk_size=chunk_size, resume=options['resume'])
+        pending = sum(len(chunk) for chunk in chunks)
+
+        self.stdout.write(f'Job {job.id}: {pending} orders pending in {len(chunks)} chunks')
+
+        if options['sync']:
+            self._run_sync(job, chunks, workers)
+            return
+
+        from apps.tickets.tasks import dispatch_invoice_regeneration
+        dispatch_invoice_regeneration(str(job.id), chunks, max_workers=workers)
+        self.stdout.write(self.style.SUCCESS(f'✓ Dispatched {len(chunks)} chunks to Celery'))
+
+        if options['wait']:
+            self._wait(job)
+
+    def _run_sync(self, job, chunks, workers):
+        started = time.monotonic()
+        done = 0
+
+        for index, chunk in enumerate(chunks, start=1):
+            result = InvoiceService.regenerate_chunk(chunk, since=job.created_at, max_workers=workers)
+            InvoiceService.record_progress(str(job.id), result['processed'] + result['skipped'], result['failed'])
+            done += len(chunk)
+
+            elapsed = time.monotonic() - started
+            rate = done / elapsed if elapsed else 0.0
+            self.stdout.write(
+                f'  chunk {index}/{len(chunks)}: {result["processed"]} generated, '
+                f'{result["failed"]} failed ({rate:.1f} orders/s)'
+            )
+
+        job = InvoiceService.finish_job(str(job.id))
+        elapsed = time.monotonic() - started
+        rate = done / elapsed if elapsed else 0.0
+        self._report(job, rate)
+
+    def _wait(self, job, interval=2.0):
+        last_processed = job.processed_count
+        last_time = time.monotonic()
+
+        while True:
+            time.sleep(interval)
+            job.refresh_from_db()
+
+            now = time.monotonic()
+            rate = (job.processed_count - last_processed) / (now - last_time)
+            last_processed, last_time = job.processed_count, now
+
+            self.stdout.write(
+                f'  {job.processed_count}/{job.total_count} ({job.progress_percent}%), '
+                f'{job.failed_count} failed, {rate:.1f} orders/s'
+            )
+
+            if job.status in (BulkJob.Status.COMPLETED, BulkJob.Status.FAILED):
+                break
+
+        self._report(job, job.throughput)
+
+    def _report(self, job, rate):
+        duration = (job.finished_at or timezone.now()) - job.started_at
+        summary = (
+            f'{job.processed_count}/{job.total_count} invoices in '
+            f'{duration.total_seconds():.1f}s ({rate:.1f} orders/s), {job.failed_count} failed'
+        )
+        if job.status == BulkJob.Status.COMPLETED:
+            self.stdout.write(self.style.SUCCESS(f'✓ {summary}'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{summary}; rerun with --resume to retry'))
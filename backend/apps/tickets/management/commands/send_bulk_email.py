@@ -0,0 +1,85 @@
+"""
+Management command to send a bulk email to buyers of paid orders.
+Usage: python manage.py send_bulk_email --template ticket_resend [--sync] [--batch-size 1000]
+       python manage.py send_bulk_email --resume <job_id> --sync
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tickets.models import BulkJob
+from apps.tickets.bulk_email_service import BulkEmailService
+from apps.tickets.sendgrid_client import SendGridError
+
+
+class Command(BaseCommand):
+    help = 'Send ticket/invoice resends or an announcement to buyers in SendGrid batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--template',
+            choices=[BulkEmailService.TICKET_RESEND, BulkEmailService.INVOICE_RESEND, BulkEmailService.ANNOUNCEMENT],
+            default=BulkEmailService.TICKET_RESEND,
+        )
+        parser.add_argument('--subject', default='', help='Announcement subject')
+        parser.add_argument('--message', default='', help='Announcement body')
+        parser.add_argument('--resume', metavar='JOB_ID', help='Continue an existing job from its cursor')
+        parser.add_argument('--batch-size', type=int, default=None, help='Recipients per SendGrid request')
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='Send from this process instead of a Celery worker and report throughput',
+        )
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            try:
+                job = BulkJob.objects.get(id=options['resume'], kind=BulkJob.Kind.EMAIL_BROADCAST)
+            except (BulkJob.DoesNotExist, ValueError):
+                raise CommandError(f"Bulk email job {options['resume']} not found")
+        else:
+            try:
+                job = BulkEmailService.start(
+                    options['template'],
+                    subject=options['subject'],
+                    message=options['message'],
+                    queue=not options['sync']
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        self.stdout.write(f'Job {job.id}: {job.total_count} recipients ({job.params["template"]})')
+
+        if not options['sync']:
+            if options['resume']:
+                BulkEmailService.enqueue(job)
+            self.stdout.write(self.style.SUCCESS('✓ Queued for a Celery worker'))
+            return
+
+        started = time.monotonic()
+        already_done = job.processed_count + job.failed_count
+
+        def progress(job):
+            done = job.processed_count + job.failed_count - already_done
+            elapsed = time.monotonic() - started
+            rate = done / elapsed if elapsed else 0.0
+            self.stdout.write(
+                f'  {job.processed_count + job.failed_count}/{job.total_count} '
+                f'({job.progress_percent}%), {rate:.0f} recipients/s'
+            )
+
+        try:
+            job = BulkEmailService.run(str(job.id), batch_size=options['batch_size'], progress=progress)
+        except SendGridError as e:
+            raise CommandError(f'{e}; rerun with --resume {job.id}')
+
+        elapsed = time.monotonic() - started
+        done = job.processed_count + job.failed_count - already_done
+        summary = (
+            f'{job.processed_count} sent, {job.failed_count} failed in {elapsed:.2f}s '
+            f'({done / elapsed if elapsed else 0.0:.0f} recipients/s)'
+        )
+        if job.status == BulkJob.Status.COMPLETED:
+            self.stdout.write(self.style.SUCCESS(f'✓ {summary}'))
+        else:
+            self.stdout.write(self.style.WARNING(summary))
@@ -5,7 +5,9 @@ Run: python manage.py setup_amphitheater
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from datetime import date, timedelta
-from apps.tickets.amphitheater_models import Venue, Section, SeatBlock
+from apps.tickets.amphitheater_models import Venue
+from apps.tickets.amphitheater_services import AmphitheaterService
+from apps.tickets.seat_map_service import SeatMapService
 
 
 class Command(BaseCommand):
@@ -105,15 +107,9 @@ class Command(BaseCommand):
             },
         ]
         
-        sections = []
-        for section_data in sections_data:
-            section, created = Section.objects.get_or_create(
-                venue=venue,
-                name=section_data['name'],
-                defaults=section_data
-            )
-            sections.append(section)
-            if created:
+        sections, created_sections = AmphitheaterService.bulk_create_sections(venue, sections_data)
+        for section in sections:
+            if section in created_sections:
                 self.stdout.write(self.style.SUCCESS(f'  ✓ Created section: {section.name}'))
             else:
                 self.stdout.write(f'  ✓ Section exists: {section.name}')
@@ -130,32 +126,22 @@ class Command(BaseCommand):
         
         self.stdout.write(f'\nCreating seat inventory for dates: {", ".join(event_dates)}')
         
-        for date_str in event_dates:
-            event_date = date.fromisoformat(date_str)
-            
-            for section in sections:
-                # Create seat blocks (simplified: one block per section)
-                # In production, you'd create multiple blocks per section for better allocation
-                seat_block, created = SeatBlock.objects.get_or_create(
-                    section=section,
-                    event_date=event_date,
-                    row_start='A',
-                    row_end='Z',
-                    defaults={
-                        'seat_start': 1,
-                        'seat_end': 50,
-                        'total_seats': section.capacity,
-                        'available_seats': section.capacity,
-                        'price_cents': section.base_price_cents,
-                        'is_active': True,
-                    }
-                )
-                
-                if created:
-                    self.stdout.write(
-                        f'  ✓ Created seat block: {section.name} - {event_date} '
-                        f'({section.capacity} seats @ ${section.base_price_cents/100})'
-                    )
+        # Simplified: one block per section and date
+        # In production, you'd create multiple blocks per section for better allocation
+        created_blocks = AmphitheaterService.bulk_create_seat_blocks(
+            sections,
+            [date.fromisoformat(date_str) for date_str in event_dates]
+        )
+        for seat_block in created_blocks:
+            section = seat_block.section
+            self.stdout.write(
+                f'  ✓ Created seat block: {section.name} - {seat_block.event_date} '
+                f'({section.capacity} seats @ ${section.base_price_cents/100})'
+            )
+        
+        # Individual seats for the seat map
+        created_seats = SeatMapService.initialize_seats()
+        self.stdout.write(f'  ✓ Seat map: {created_seats} new seats')
         
         self.stdout.write(self.style.SUCCESS('\n✅ Pacific Amphitheatre setup complete!'))
         self.stdout.write(f'\nVenue: {venue.name}')
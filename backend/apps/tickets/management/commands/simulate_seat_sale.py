@@ -0,0 +1,230 @@
+"""
+Management command to replay a synthetic amphitheater sale and report how seat holds behave.
+Usage: python manage.py simulate_seat_sale [--shoppers 1] [--abandon 0.15] [--scale 1.0] [--section "Section 1"] [--output report.json]
+
+Builds a throwaway venue with one seat block per seated section of the seat
+map (rows x seats per row, without the widening of back rows; the standing
+Pit is left out) and sells it out through create_seat_hold: groups of mixed
+sizes pick sections in proportion to the seats left, and some earlier holds
+are abandoned and released along the way. Holds that are not abandoned count
+as sold.
+
+Reports holds per second, p50/p99 hold latency, holds that failed while the
+section still had enough free seats, and per section the fill, groups split
+across rows and single seats left orphaned, as JSON for comparing versions.
+--shoppers above 1 runs shoppers concurrently and needs PostgreSQL.
+Holds live in the seat_holds cache, which must not evict them mid-sale: a
+full sale needs a few thousand keys, past LocMemCache's default of 300 entries.
+The venue is removed afterwards.
+"""
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.tickets.amphitheater_models import Venue, Section, SeatBlock
+from apps.tickets.amphitheater_services import AmphitheaterService
+from apps.tickets.management.commands.benchmark_seat_allocator import (
+    GROUP_SIZES, GROUP_WEIGHTS, is_adjacent, orphaned_seats
+)
+from apps.tickets.seat_bitmap import row_labels
+from apps.tickets.seat_hold_store import SeatHoldStore
+from apps.tickets.seat_map_service import SEAT_SECTIONS
+
+EVENT_DATE = date(2099, 6, 20)
+
+# A section stops taking shoppers after this many failed holds
+MAX_FAILURES = 10
+
+
+class Command(BaseCommand):
+    help = 'Replay a synthetic amphitheater sale through seat holds and report JSON metrics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shoppers', type=int, default=1, help='Concurrent shoppers')
+        parser.add_argument(
+            '--abandon',
+            type=float,
+            default=0.15,
+            help='Chance each step that an earlier hold is abandoned and its seats return',
+        )
+        parser.add_argument('--scale', type=float, default=1.0, help='Fraction of each section\'s rows to sell')
+        parser.add_argument('--section', action='append', help='Only simulate this section (repeatable)')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Also write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        if options['shoppers'] > 1 and connection.vendor == 'sqlite':
+            raise CommandError('Concurrent shoppers need PostgreSQL; use --shoppers 1 on SQLite')
+
+        configs = [
+            config for config in SEAT_SECTIONS
+            if config['tier'] != 'pit' and (not options['section'] or config['name'] in options['section'])
+        ]
+        if not configs:
+            raise CommandError('No seated sections to simulate')
+
+        self.random = random.Random(options['seed'])
+        self.lock = threading.Lock()
+
+        venue, sections = self._venue(configs, options['scale'])
+        try:
+            elapsed, latencies = self._sell_out(sections, options)
+            report = self._report(sections, elapsed, latencies, options)
+        finally:
+            for section in sections:
+                if section['holds']:
+                    SeatHoldStore.remove(section['block'].id, [hold['hold_id'] for hold in section['holds']])
+            venue.delete()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(output + '\n')
+        self.stdout.write(output)
+
+    def _venue(self, configs, scale: float):
+        """A throwaway venue with one section and seat block per section config."""
+        venue = Venue.objects.create(name='Simulated Amphitheatre', address='Simulation', capacity=0, is_active=False)
+        sections = []
+        for config in configs:
+            rows = row_labels('A', 'ZZ')[:max(1, round(config['rows'] * scale))]
+            capacity = len(rows) * config['seatsPerRow']
+            section = Section.objects.create(
+                venue=venue,
+                name=config['name'],
+                section_type=Section.SectionType.ORCHESTRA,
+                capacity=capacity,
+                base_price_cents=config['price'] * 100
+            )
+            block = SeatBlock.objects.create(
+                section=section,
+                event_date=EVENT_DATE,
+                row_start=rows[0],
+                row_end=rows[-1],
+                seat_start=1,
+                seat_end=config['seatsPerRow'],
+                total_seats=capacity,
+                available_seats=capacity,
+                price_cents=config['price'] * 100
+            )
+            sections.append({
+                'section': section,
+                'block': block,
+                'capacity': capacity,
+                'free': capacity,
+                'holds': [],
+                'failed': 0,
+                'split': 0,
+            })
+        return venue, sections
+
+    def _next_action(self, sections, abandon: float):
+        """Pick the next shopper action under the lock: ('release', section, hold), ('hold', section, quantity) or None."""
+        with self.lock:
+            open_sections = [section for section in sections if section['free'] and section['failed'] < MAX_FAILURES]
+            if not open_sections:
+                return None
+
+            held = [section for section in sections if section['holds']]
+            if held and self.random.random() < abandon:
+                section = self.random.choice(held)
+                hold = section['holds'].pop(self.random.randrange(len(section['holds'])))
+                return 'release', section, hold
+
+            section = self.random.choices(open_sections, [section['free'] for section in open_sections])[0]
+            quantity = min(self.random.choices(GROUP_SIZES, GROUP_WEIGHTS)[0], section['free'])
+            # Reserved in the bookkeeping so concurrent shoppers don't count the same seats
+            section['free'] -= quantity
+            return 'hold', section, quantity
+
+    def _sell_out(self, sections, options):
+        """Run shoppers until every section is sold out. Returns (seconds, hold latencies in ms)."""
+        latencies = []
+        steps = sum(section['capacity'] for section in sections) * 3
+
+        def shop(number):
+            action = self._next_action(sections, options['abandon'])
+            if action is None:
+                return
+
+            kind, section, detail = action
+            if kind == 'release':
+                AmphitheaterService.release_hold(detail['hold_id'])
+                with self.lock:
+                    section['free'] += detail['quantity']
+                return
+
+            started = time.perf_counter()
+            result = AmphitheaterService.create_seat_hold(
+                str(section['section'].id), EVENT_DATE, detail, session_key=f'simulation-{number}'
+            )
+            latency = (time.perf_counter() - started) * 1000
+            with self.lock:
+                latencies.append(latency)
+                if result['success']:
+                    section['holds'].append(result)
+                    if not is_adjacent(result['seats']):
+                        section['split'] += 1
+                else:
+                    # The seats were free by the bookkeeping, so this hold should have succeeded
+                    section['free'] += detail
+                    section['failed'] += 1
+
+        def threaded_shop(number):
+            try:
+                shop(number)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        if options['shoppers'] == 1:
+            for number in range(steps):
+                shop(number)
+        else:
+            with ThreadPoolExecutor(max_workers=options['shoppers']) as pool:
+                list(pool.map(threaded_shop, range(steps)))
+        return time.perf_counter() - started, sorted(latencies)
+
+    def _report(self, sections, elapsed: float, latencies, options) -> dict:
+        holds = sum(len(section['holds']) for section in sections)
+        results = []
+        for section in sections:
+            block = SeatBlock.objects.get(id=section['block'].id)
+            bitmap = AmphitheaterService._occupancy(block)
+            for hold in SeatHoldStore.block_holds(block.id).values():
+                bitmap.mark(hold['seats'])
+            results.append({
+                'section': section['section'].name,
+                'capacity': section['capacity'],
+                'sold': bitmap.occupied_count,
+                'fill': round(bitmap.occupied_count / section['capacity'], 4),
+                'holds': len(section['holds']),
+                'split_groups': section['split'],
+                'orphaned_seats': orphaned_seats(bitmap),
+                'failed_holds': section['failed'],
+            })
+
+        return {
+            'database': connection.vendor,
+            'shoppers': options['shoppers'],
+            'abandon': options['abandon'],
+            'scale': options['scale'],
+            'seed': options['seed'],
+            'seconds': round(elapsed, 3),
+            'hold_attempts': len(latencies),
+            'holds_per_second': round(len(latencies) / elapsed, 1) if elapsed else None,
+            'latency_ms': {
+                'p50': round(statistics.median(latencies), 3) if latencies else None,
+                'p99': round(latencies[max(int(len(latencies) * 0.99) - 1, 0)], 3) if latencies else None,
+            },
+            'failed_holds_while_seats_remain': sum(section['failed'] for section in sections),
+            'sold_holds': holds,
+            'sections': results,
+        }
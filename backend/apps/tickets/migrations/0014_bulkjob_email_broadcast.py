@@ -0,0 +1,23 @@
+# Generated migration to add email broadcast bulk jobs
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0013_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulkjob',
+            name='cursor',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='bulkjob',
+            name='kind',
+            field=models.CharField(choices=[('INVOICE_REGENERATION', 'Invoice Regeneration'), ('EMAIL_BROADCAST', 'Email Broadcast')], db_index=True, max_length=30),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated migration to add sharded sold counters for ticket types
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0014_bulkjob_email_broadcast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketSoldCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('ticket_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sold_counters', to='tickets.tickettype')),
+            ],
+            options={
+                'db_table': 'ticket_sold_counters',
+                'constraints': [models.UniqueConstraint(fields=('ticket_type', 'slot'), name='unique_ticket_sold_counter_slot')],
+            },
+        ),
+    ]
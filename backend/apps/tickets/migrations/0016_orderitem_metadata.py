@@ -0,0 +1,18 @@
+# Generated migration to add metadata to order items
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0015_ticketsoldcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='metadata',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
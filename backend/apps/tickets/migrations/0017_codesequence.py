@@ -0,0 +1,40 @@
+# Generated migration to add code allocator sequences
+
+from django.db import migrations, models
+
+SEQUENCES = ['code_seq_ticket_code', 'code_seq_order_number']
+
+
+def create_sequences(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in SEQUENCES:
+        schema_editor.execute(f'CREATE SEQUENCE IF NOT EXISTS {name} MINVALUE 0 START 0')
+
+
+def drop_sequences(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in SEQUENCES:
+        schema_editor.execute(f'DROP SEQUENCE IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0016_orderitem_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeSequence',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('next_value', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'code_sequences',
+            },
+        ),
+        migrations.RunPython(create_sequences, drop_sequences),
+    ]
@@ -0,0 +1,18 @@
+# Generated migration to add the seat occupancy bitmap to seat blocks
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0017_codesequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seatblock',
+            name='occupancy',
+            field=models.BinaryField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated migration to index seat changes for seat map versions and deltas
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0018_seatblock_occupancy'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='amphitheaterseat',
+            index=models.Index(fields=['updated_at'], name='amph_seat_updated_idx'),
+        ),
+    ]
@@ -2,10 +2,14 @@
 Ticket models including orders, tickets, transfers, upgrades, refunds, and comps.
 """
 import uuid
-import secrets
-from django.db import models
+import random
+from functools import cached_property
+from django.db import models, transaction, IntegrityError
 from django.utils import timezone
 from django.conf import settings
+from django.core.cache import cache
+
+from .code_allocator import ticket_codes, order_numbers
 
 
 class TicketType(models.Model):
@@ -65,7 +69,7 @@ class TicketType(models.Model):
             return False
         if self.sale_end and now > self.sale_end:
             return False
-        if self.capacity and self.sold_count >= self.capacity:
+        if self.capacity and self.sold_total >= self.capacity:
             return False
         return True
     
@@ -73,7 +77,100 @@ class TicketType(models.Model):
     def remaining_capacity(self):
         if self.capacity is None:
             return None
-        return max(0, self.capacity - self.sold_count)
+        return max(0, self.capacity - self.sold_total)
+    
+    @cached_property
+    def sold_total(self):
+        """Tickets sold, including the sharded counters (cached for a few seconds)."""
+        return TicketSoldCounter.total(self)
+
+
+class TicketSoldCounter(models.Model):
+    """
+    Sharded sold counter for a ticket type.
+    Paid orders increment a random slot so concurrent finalizations don't
+    queue on the TicketType row. Sold total = sold_count + sum of the slots.
+    """
+    TOTAL_CACHE_TIMEOUT = 5
+    
+    ticket_type = models.ForeignKey(TicketType, on_delete=models.CASCADE, related_name='sold_counters')
+    slot = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'ticket_sold_counters'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ticket_type', 'slot'],
+                name='unique_ticket_sold_counter_slot'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.ticket_type_id} slot {self.slot}: {self.count}"
+    
+    @staticmethod
+    def cache_key(ticket_type_id) -> str:
+        return f"ticket_sold_total:{ticket_type_id}"
+    
+    @classmethod
+    def increment(cls, ticket_type_id, quantity: int, slots: int = None) -> None:
+        """Add sold tickets to a random slot; the cached total is dropped on commit."""
+        slots = slots or getattr(settings, 'TICKET_SOLD_COUNTER_SLOTS', 16)
+        slot = random.randrange(slots)
+        
+        updated = cls.objects.filter(ticket_type_id=ticket_type_id, slot=slot).update(
+            count=models.F('count') + quantity
+        )
+        if not updated:
+            try:
+                with transaction.atomic():
+                    cls.objects.create(ticket_type_id=ticket_type_id, slot=slot, count=quantity)
+            except IntegrityError:
+                # Another transaction created the slot first
+                cls.objects.filter(ticket_type_id=ticket_type_id, slot=slot).update(
+                    count=models.F('count') + quantity
+                )
+        
+        transaction.on_commit(lambda: cache.delete(cls.cache_key(ticket_type_id)), robust=True)
+    
+    @classmethod
+    def total(cls, ticket_type: TicketType, use_cache: bool = True) -> int:
+        """Sold total for a ticket type."""
+        key = cls.cache_key(ticket_type.id)
+        if use_cache:
+            try:
+                cached = cache.get(key)
+            except Exception:
+                cached = None
+            if cached is not None:
+                return cached
+        
+        sharded = cls.objects.filter(ticket_type_id=ticket_type.id).aggregate(
+            total=models.Sum('count')
+        )['total'] or 0
+        total = ticket_type.sold_count + sharded
+        
+        try:
+            cache.set(key, total, timeout=cls.TOTAL_CACHE_TIMEOUT)
+        except Exception:
+            pass
+        return total
+
+
+class CodeSequence(models.Model):
+    """
+    Sequence counter for the code allocator on databases without native
+    sequences. PostgreSQL uses the code_seq_<name> sequences instead.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    next_value = models.PositiveBigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'code_sequences'
+    
+    def __str__(self):
+        return f"{self.name}: {self.next_value}"
 
 
 class Order(models.Model):
@@ -148,8 +245,7 @@ class Order(models.Model):
         """Generate a unique order number."""
         prefix = 'OCM'
         timestamp = timezone.now().strftime('%y%m%d')
-        random_part = secrets.token_hex(3).upper()
-        return f"{prefix}-{timestamp}-{random_part}"
+        return f"{prefix}-{timestamp}-{order_numbers.code()}"
 
 
 class OrderItem(models.Model):
@@ -163,6 +259,9 @@ class OrderItem(models.Model):
     unit_price_cents = models.PositiveIntegerField()
     total_cents = models.PositiveIntegerField()
     
+    # Copied onto each issued ticket (e.g., vendor business_type)
+    metadata = models.JSONField(default=dict, blank=True)
+    
     class Meta:
         db_table = 'order_items'
     
@@ -248,7 +347,12 @@ class Ticket(models.Model):
     @classmethod
     def generate_ticket_code(cls):
         """Generate a unique, non-guessable ticket code."""
-        return secrets.token_urlsafe(16)[:24].upper()
+        return ticket_codes.code()
+    
+    @classmethod
+    def generate_ticket_codes(cls, count: int) -> list[str]:
+        """Generate distinct ticket codes from the code allocator; no lookups needed."""
+        return ticket_codes.codes(count)
 
 
 class TicketTransfer(models.Model):
@@ -499,6 +603,131 @@ class Invoice(models.Model):
         return f"INV-{order.order_number}"
 
 
+class BulkJob(models.Model):
+    """
+    Resumable background jobs that process records in chunks.
+    """
+    class Kind(models.TextChoices):
+        INVOICE_REGENERATION = 'INVOICE_REGENERATION', 'Invoice Regeneration'
+        EMAIL_BROADCAST = 'EMAIL_BROADCAST', 'Email Broadcast'
+    
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RUNNING = 'RUNNING', 'Running'
+        COMPLETED = 'COMPLETED', 'Completed'
+        FAILED = 'FAILED', 'Failed'
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=30, choices=Kind.choices, db_index=True)
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        db_index=True
+    )
+    params = models.JSONField(default=dict, blank=True)
+    
+    # Progress
+    total_count = models.PositiveIntegerField(default=0)
+    processed_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    # Last record processed, for jobs that walk records in order
+    cursor = models.CharField(max_length=100, blank=True)
+    
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='bulk_jobs'
+    )
+    
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'bulk_jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['kind', 'status']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.processed_count}/{self.total_count} ({self.status})"
+    
+    @property
+    def progress_percent(self):
+        if not self.total_count:
+            return 100.0 if self.status == self.Status.COMPLETED else 0.0
+        return round(100 * self.processed_count / self.total_count, 1)
+    
+    @property
+    def throughput(self):
+        """Processed records per second since the job started."""
+        if not self.started_at:
+            return 0.0
+        end = self.finished_at or timezone.now()
+        elapsed = (end - self.started_at).total_seconds()
+        return self.processed_count / elapsed if elapsed > 0 else 0.0
+
+
+class EmailOutbox(models.Model):
+    """
+    Transactional email outbox.
+    Rows are written in the same transaction as the change that triggers the email
+    and delivered by a Celery dispatcher.
+    """
+    class Kind(models.TextChoices):
+        ORDER_CONFIRMATION = 'ORDER_CONFIRMATION', 'Order Confirmation'
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        SENDING = 'SENDING', 'Sending'
+        SENT = 'SENT', 'Sent'
+        FAILED = 'FAILED', 'Failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=30, choices=Kind.choices)
+    provider = models.CharField(max_length=30, default='sendgrid')
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        db_index=True
+    )
+
+    # Prevents the same email being queued twice (e.g. duplicate webhooks)
+    dedupe_key = models.CharField(max_length=100, unique=True, null=True, blank=True)
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='outbox_emails'
+    )
+    payload = models.JSONField(default=dict, blank=True)
+
+    # Delivery
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'email_outbox'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} ({self.status})"
+
+
 class AmphitheaterSeat(models.Model):
     """Track individual amphitheater seat availability."""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -525,6 +754,7 @@ class AmphitheaterSeat(models.Model):
         indexes = [
             models.Index(fields=['section_id', 'is_available'], name='amph_seat_section_avail_idx'),
             models.Index(fields=['reserved_until'], name='amph_seat_reserved_idx'),
+            models.Index(fields=['updated_at'], name='amph_seat_updated_idx'),
         ]
     
     def __str__(self):
@@ -0,0 +1,214 @@
+"""
+Transactional email outbox.
+Emails are recorded in the caller's transaction and delivered by a Celery
+dispatcher with bounded concurrency, retries and per-provider rate limits.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction, IntegrityError
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EmailOutbox, Order
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderRateLimiter:
+    """
+    Fixed-window rate limiter shared by all dispatchers through the cache.
+    """
+
+    def __init__(self, provider: str, per_second: int):
+        self.provider = provider
+        self.per_second = per_second
+
+    def acquire(self) -> None:
+        """Block until a send slot is available in the current one-second window."""
+        if not self.per_second:
+            return
+        while True:
+            window = int(time.time())
+            key = f"email_rate:{self.provider}:{window}"
+            try:
+                cache.add(key, 0, timeout=5)
+                if cache.incr(key) <= self.per_second:
+                    return
+            except Exception as e:
+                # Don't hold mail back because the cache is unavailable
+                logger.warning(f"Email rate limiter unavailable for {self.provider}: {e}")
+                return
+            time.sleep(max(0.01, window + 1 - time.time()))
+
+
+class EmailOutboxService:
+    """Service for queueing and dispatching outbox emails."""
+
+    MAX_ATTEMPTS = 5
+    # Seconds to wait before each retry
+    RETRY_DELAYS = [60, 300, 900, 3600]
+    # SENDING rows older than this are assumed abandoned by a dead worker
+    CLAIM_TIMEOUT = timedelta(minutes=10)
+    BATCH_SIZE = 50
+
+    @staticmethod
+    def enqueue(
+        kind: str,
+        order: Optional[Order] = None,
+        payload: Optional[dict] = None,
+        dedupe_key: Optional[str] = None,
+        provider: str = 'sendgrid'
+    ) -> Optional[EmailOutbox]:
+        """
+        Record an email in the current transaction and kick the dispatcher on commit.
+        Returns None if an email with the same dedupe key is already queued.
+        """
+        try:
+            with transaction.atomic():
+                outbox = EmailOutbox.objects.create(
+                    kind=kind,
+                    order=order,
+                    payload=payload or {},
+                    dedupe_key=dedupe_key,
+                    provider=provider
+                )
+        except IntegrityError:
+            logger.info(f"Email {dedupe_key} already queued")
+            return None
+
+        transaction.on_commit(EmailOutboxService._kick)
+        return outbox
+
+    @classmethod
+    def enqueue_order_confirmation(cls, order: Order) -> Optional[EmailOutbox]:
+        return cls.enqueue(
+            EmailOutbox.Kind.ORDER_CONFIRMATION,
+            order=order,
+            dedupe_key=f"order_confirmation:{order.id}"
+        )
+
+    @staticmethod
+    def _kick():
+        from .tasks import dispatch_email_outbox
+        try:
+            dispatch_email_outbox.delay()
+        except Exception as e:
+            # The periodic dispatcher picks the email up
+            logger.error(f"Failed to queue email dispatch: {e}")
+
+    @classmethod
+    @transaction.atomic
+    def claim_batch(cls, limit: int = BATCH_SIZE) -> list[EmailOutbox]:
+        """
+        Claim due emails for sending.
+        Rows locked by another dispatcher are skipped rather than waited on.
+        """
+        now = timezone.now()
+        due = (
+            Q(status=EmailOutbox.Status.PENDING, next_attempt_at__lte=now) |
+            Q(status=EmailOutbox.Status.SENDING, claimed_at__lt=now - cls.CLAIM_TIMEOUT)
+        )
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by('next_attempt_at')[:limit]
+        )
+        if batch:
+            EmailOutbox.objects.filter(id__in=[e.id for e in batch]).update(
+                status=EmailOutbox.Status.SENDING,
+                claimed_at=now
+            )
+        return batch
+
+    @staticmethod
+    def _send_order_confirmation(outbox: EmailOutbox) -> bool:
+        from .email_service import TicketEmailService
+
+        order = Order.objects.select_related('buyer').get(id=outbox.order_id)
+        return TicketEmailService.send_order_confirmation(order)
+
+    HANDLERS = {
+        EmailOutbox.Kind.ORDER_CONFIRMATION: '_send_order_confirmation',
+    }
+
+    @classmethod
+    def _deliver(cls, outbox: EmailOutbox, limiters: dict) -> Optional[str]:
+        """Send one email. Returns an error message on failure."""
+        handler = cls.HANDLERS.get(outbox.kind)
+        if handler is None:
+            return f"No handler for {outbox.kind}"
+
+        limiter = limiters.get(outbox.provider)
+        if limiter:
+            limiter.acquire()
+
+        try:
+            if getattr(cls, handler)(outbox):
+                return None
+            return 'Provider did not accept the email'
+        except Exception as e:
+            return str(e)
+        finally:
+            # Runs in a pool thread; don't leak its database connection
+            connection.close()
+
+    @classmethod
+    def _record_result(cls, outbox: EmailOutbox, error: Optional[str]) -> None:
+        now = timezone.now()
+        if error is None:
+            outbox.status = EmailOutbox.Status.SENT
+            outbox.sent_at = now
+            outbox.last_error = ''
+        else:
+            outbox.attempts += 1
+            outbox.last_error = error
+            if outbox.attempts >= cls.MAX_ATTEMPTS:
+                outbox.status = EmailOutbox.Status.FAILED
+                logger.error(f"Giving up on outbox email {outbox.id} after {outbox.attempts} attempts: {error}")
+            else:
+                delay = cls.RETRY_DELAYS[min(outbox.attempts, len(cls.RETRY_DELAYS)) - 1]
+                outbox.status = EmailOutbox.Status.PENDING
+                outbox.next_attempt_at = now + timedelta(seconds=delay)
+                logger.warning(f"Outbox email {outbox.id} failed (attempt {outbox.attempts}), retrying in {delay}s: {error}")
+        outbox.claimed_at = None
+        outbox.save(update_fields=['status', 'sent_at', 'attempts', 'last_error', 'next_attempt_at', 'claimed_at'])
+
+    @staticmethod
+    def _limiters() -> dict:
+        limits = getattr(settings, 'EMAIL_OUTBOX_RATE_LIMITS', {})
+        return {provider: ProviderRateLimiter(provider, rate) for provider, rate in limits.items()}
+
+    @classmethod
+    def dispatch(cls, max_batches: int = 20, max_workers: Optional[int] = None) -> dict:
+        """
+        Send due emails in batches until the outbox is drained or max_batches is reached.
+        At most max_workers emails are in flight per dispatcher.
+        """
+        max_workers = max_workers or getattr(settings, 'EMAIL_OUTBOX_MAX_WORKERS', 4)
+        limiters = cls._limiters()
+        sent = failed = 0
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for _ in range(max_batches):
+                batch = cls.claim_batch()
+                if not batch:
+                    break
+
+                errors = list(pool.map(lambda outbox: cls._deliver(outbox, limiters), batch))
+
+                for outbox, error in zip(batch, errors):
+                    cls._record_result(outbox, error)
+                    if error is None:
+                        sent += 1
+                    else:
+                        failed += 1
+
+        if sent or failed:
+            logger.info(f"Email outbox dispatch: {sent} sent, {failed} failed")
+        return {'sent': sent, 'failed': failed}
@@ -0,0 +1,322 @@
+"""
+Ticket PDF rendering and storage.
+PDFs are rendered once per ticket version and served from django-storages.
+"""
+import hashlib
+import logging
+import re
+from io import BytesIO
+from typing import Iterable, Optional
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.http import HttpResponse
+
+from .models import Order, Ticket
+
+logger = logging.getLogger(__name__)
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class TicketPDFService:
+    """Service for rendering, storing and serving ticket PDFs."""
+
+    # Bump when the PDF layout changes so stored files are re-rendered
+    LAYOUT_VERSION = 1
+    STORAGE_PREFIX = 'tickets/pdf'
+
+    _styles = None
+
+    @classmethod
+    def ticket_version(cls, ticket: Ticket) -> str:
+        """
+        Version of a ticket's PDF content.
+        Changes on transfer (owner), upgrade (type) and QR rotation.
+        """
+        basis = ':'.join([
+            str(cls.LAYOUT_VERSION),
+            ticket.ticket_code,
+            str(ticket.qr_secret_version),
+            str(ticket.owner_id),
+            str(ticket.ticket_type_id),
+        ])
+        return hashlib.sha256(basis.encode()).hexdigest()[:16]
+
+    @classmethod
+    def order_version(cls, tickets: Iterable[Ticket]) -> str:
+        """Version of an order bundle, derived from its tickets' versions."""
+        basis = ','.join(sorted(f"{t.id}:{cls.ticket_version(t)}" for t in tickets))
+        return hashlib.sha256(basis.encode()).hexdigest()[:16]
+
+    @classmethod
+    def ticket_storage_name(cls, ticket: Ticket) -> str:
+        return f"{cls.STORAGE_PREFIX}/{ticket.id}/{cls.ticket_version(ticket)}.pdf"
+
+    @classmethod
+    def order_storage_name(cls, order: Order, tickets: list[Ticket]) -> str:
+        return f"{cls.STORAGE_PREFIX}/orders/{order.id}/{cls.order_version(tickets)}.pdf"
+
+    @classmethod
+    def _get_styles(cls) -> dict:
+        """Build ReportLab paragraph styles once per process."""
+        if cls._styles is None:
+            from reportlab.lib import colors
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+            from reportlab.lib.enums import TA_CENTER
+
+            base = getSampleStyleSheet()
+            cls._styles = {
+                'normal': base['Normal'],
+                'title': ParagraphStyle('Title', parent=base['Heading1'], alignment=TA_CENTER, fontSize=24, spaceAfter=20),
+                'subtitle': ParagraphStyle('Subtitle', parent=base['Normal'], alignment=TA_CENTER, fontSize=14, textColor=colors.grey),
+                'footer': ParagraphStyle('Footer', parent=base['Normal'], alignment=TA_CENTER, fontSize=10, textColor=colors.grey),
+            }
+        return cls._styles
+
+    @staticmethod
+    def _qr_png(ticket: Ticket) -> BytesIO:
+        """Signed QR code for a ticket as a PNG buffer."""
+        from .services import QRCodeService
+        return BytesIO(QRCodeService.render_png(ticket))
+
+    @staticmethod
+    def _ticket_name(ticket: Ticket) -> str:
+        if ticket.ticket_type:
+            return ticket.ticket_type.name
+        if ticket.metadata and ticket.metadata.get('type') == 'amphitheater':
+            return ticket.metadata.get('ticket_name', 'Amphitheater Ticket')
+        return 'Special Ticket'
+
+    @classmethod
+    def _ticket_elements(cls, ticket: Ticket, subtitle: str, order_number: str) -> list:
+        """Flowables for a single ticket page."""
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer, Image, Table, TableStyle
+
+        styles = cls._get_styles()
+        elements = []
+
+        # Header
+        elements.append(Paragraph("🎪 OC MENA Festival", styles['title']))
+        elements.append(Paragraph(subtitle, styles['subtitle']))
+        elements.append(Spacer(1, 30))
+
+        # QR Code
+        qr_image = Image(cls._qr_png(ticket), width=2.5*inch, height=2.5*inch)
+        qr_image.hAlign = 'CENTER'
+        elements.append(qr_image)
+        elements.append(Spacer(1, 20))
+
+        # Ticket details
+        valid_days = ticket.ticket_type.valid_days if ticket.ticket_type else None
+        details_data = [
+            ['Ticket Type:', cls._ticket_name(ticket)],
+            ['Ticket Code:', ticket.ticket_code],
+            ['Valid Days:', ', '.join(valid_days) if valid_days else 'All Days'],
+            ['Holder:', ticket.owner.full_name],
+            ['Order #:', order_number],
+        ]
+
+        details_table = Table(details_data, colWidths=[2*inch, 4*inch])
+        details_table.setStyle(TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+            ('TOPPADDING', (0, 0), (-1, -1), 10),
+            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+        ]))
+        elements.append(details_table)
+        elements.append(Spacer(1, 30))
+
+        # Location
+        elements.append(Paragraph("<b>Location:</b> OC Fair & Event Center", styles['normal']))
+        elements.append(Paragraph("88 Fair Drive, Costa Mesa, CA 92626", styles['normal']))
+        elements.append(Spacer(1, 20))
+
+        # Footer
+        elements.append(Paragraph("Present this QR code at the entrance for scanning", styles['footer']))
+
+        return elements
+
+    @staticmethod
+    def _build(elements: list) -> bytes:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.units import inch
+        from reportlab.platypus import SimpleDocTemplate
+
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
+        doc.build(elements)
+        pdf = buffer.getvalue()
+        buffer.close()
+        return pdf
+
+    @classmethod
+    def render_ticket(cls, ticket: Ticket) -> bytes:
+        """Render a single ticket PDF."""
+        from reportlab.platypus import Paragraph
+
+        order_number = ticket.order.order_number if ticket.order else 'N/A'
+        elements = cls._ticket_elements(ticket, "Your Ticket", order_number)
+        elements.append(Paragraph("This ticket is non-transferable", cls._get_styles()['footer']))
+        return cls._build(elements)
+
+    @classmethod
+    def render_order(cls, order: Order, tickets: list[Ticket]) -> bytes:
+        """Render all tickets of an order into one PDF, one page per ticket."""
+        from reportlab.platypus import PageBreak
+
+        elements = []
+        for idx, ticket in enumerate(tickets):
+            if idx > 0:
+                elements.append(PageBreak())
+            elements.extend(
+                cls._ticket_elements(ticket, f"Ticket {idx + 1} of {len(tickets)}", order.order_number)
+            )
+        return cls._build(elements)
+
+    @staticmethod
+    def _store(name: str, content: bytes) -> None:
+        """Write a rendered PDF unless another worker already stored it."""
+        if default_storage.exists(name):
+            return
+        default_storage.save(name, ContentFile(content))
+
+    @classmethod
+    def get_or_render_ticket(cls, ticket: Ticket) -> bytes:
+        """Return the stored PDF for a ticket, rendering and storing it on a miss."""
+        name = cls.ticket_storage_name(ticket)
+        content = cls._read(name)
+        if content is None:
+            content = cls.render_ticket(ticket)
+            try:
+                cls._store(name, content)
+            except Exception as e:
+                logger.error(f"Failed to store ticket PDF {name}: {e}")
+        return content
+
+    @classmethod
+    def get_or_render_order(cls, order: Order, tickets: list[Ticket]) -> bytes:
+        """Return the stored bundle PDF for an order, rendering and storing it on a miss."""
+        name = cls.order_storage_name(order, tickets)
+        content = cls._read(name)
+        if content is None:
+            content = cls.render_order(order, tickets)
+            try:
+                cls._store(name, content)
+            except Exception as e:
+                logger.error(f"Failed to store order PDF {name}: {e}")
+        return content
+
+    @staticmethod
+    def _read(name: str) -> Optional[bytes]:
+        try:
+            if not default_storage.exists(name):
+                return None
+            with default_storage.open(name, 'rb') as f:
+                return f.read()
+        except Exception as e:
+            logger.warning(f"Failed to read stored PDF {name}: {e}")
+            return None
+
+    @classmethod
+    def prerender_tickets(cls, ticket_ids: list[str]) -> int:
+        """Render and store PDFs for tickets (and their order bundles) that are not stored yet."""
+        tickets = list(
+            Ticket.objects.filter(id__in=ticket_ids).select_related('ticket_type', 'owner', 'order')
+        )
+        rendered = 0
+        order_ids = set()
+
+        for ticket in tickets:
+            name = cls.ticket_storage_name(ticket)
+            if not default_storage.exists(name):
+                cls._store(name, cls.render_ticket(ticket))
+                rendered += 1
+            if ticket.order_id:
+                order_ids.add(ticket.order_id)
+
+        for order in Order.objects.filter(id__in=order_ids):
+            order_tickets = list(order.tickets.select_related('ticket_type', 'owner').order_by('issued_at', 'id'))
+            name = cls.order_storage_name(order, order_tickets)
+            if not default_storage.exists(name):
+                cls._store(name, cls.render_order(order, order_tickets))
+                rendered += 1
+
+        return rendered
+
+    @staticmethod
+    def schedule_prerender(tickets: Iterable[Ticket]) -> None:
+        """Queue PDF pre-rendering once the surrounding transaction commits."""
+        from django.db import transaction
+        from .tasks import prerender_ticket_pdfs
+
+        ticket_ids = [str(t.id) for t in tickets if t is not None]
+        if not ticket_ids:
+            return
+
+        def _enqueue():
+            try:
+                prerender_ticket_pdfs.delay(ticket_ids)
+            except Exception as e:
+                # Downloads fall back to on-demand rendering
+                logger.error(f"Failed to queue ticket PDF rendering: {e}")
+
+        transaction.on_commit(_enqueue)
+
+    @staticmethod
+    def build_response(request, version: str, filename: str, load_content) -> HttpResponse:
+        """
+        Serve a PDF with ETag, conditional GET and single byte-range support.
+        load_content is only called when the client does not already hold this version.
+        """
+        etag = f'"{version}"'
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')]:
+            response = HttpResponse(status=304)
+            response['ETag'] = etag
+            return response
+
+        content = load_content()
+        size = len(content)
+        status_code = 200
+        body = content
+        content_range = None
+
+        range_header = request.META.get('HTTP_RANGE', '').strip()
+        if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+        match = _RANGE_RE.match(range_header) if range_header else None
+
+        if match and (not if_range or if_range == etag):
+            start_str, end_str = match.groups()
+            if start_str:
+                start = int(start_str)
+                end = min(int(end_str), size - 1) if end_str else size - 1
+            elif end_str:
+                # Suffix range: last N bytes
+                start = max(0, size - int(end_str))
+                end = size - 1
+            else:
+                start, end = 0, -1
+
+            if start >= size or start > end:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                response['ETag'] = etag
+                return response
+
+            status_code = 206
+            body = content[start:end + 1]
+            content_range = f'bytes {start}-{end}/{size}'
+
+        response = HttpResponse(body, content_type='application/pdf', status=status_code)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['ETag'] = etag
+        response['Accept-Ranges'] = 'bytes'
+        response['Cache-Control'] = 'private, max-age=0, must-revalidate'
+        if content_range:
+            response['Content-Range'] = content_range
+        return response
@@ -0,0 +1,104 @@
+"""
+Best-available seat selection for amphitheater seat blocks.
+The block's occupancy bitmap is unpacked into a rows x seats NumPy grid and
+every possible placement of a group is scored at once: sliding-window sums
+find runs of free seats, and each run is scored by row preference (front
+first), centrality within the row and how snugly it fits against taken seats,
+with a penalty for leaving a single orphaned seat.
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .seat_bitmap import SeatBitmap
+
+DEFAULT_WEIGHTS = {
+    'row': 1.0,
+    'center': 0.6,
+    'adjacency': 0.3,
+    'orphan': 0.5,
+}
+
+
+def occupancy_grid(bitmap: SeatBitmap) -> np.ndarray:
+    """Boolean rows x seats grid, True where the seat is taken."""
+    raw = np.frombuffer(bitmap.to_bytes(), dtype=np.uint8)
+    bits = np.unpackbits(raw, bitorder='little')[:bitmap.size]
+    return bits.reshape(len(bitmap.rows), bitmap.stride)[:, :bitmap.seats_per_row].astype(bool)
+
+
+@lru_cache(maxsize=256)
+def _static_scores(rows: int, seats: int, quantity: int, row_weight: float, center_weight: float) -> np.ndarray:
+    """Row preference and centrality for every start position of a run; independent of occupancy."""
+    starts = np.arange(max(seats - quantity + 1, 0))
+    mid = (seats - 1) / 2
+    centrality = 1 - np.abs(starts + (quantity - 1) / 2 - mid) / max(mid, 1)
+    row_preference = 1 - np.arange(rows) / max(rows - 1, 1)
+    scores = row_weight * row_preference[:, None] + center_weight * centrality[None, :]
+    scores.setflags(write=False)
+    return scores
+
+
+def placement_scores(occupied: np.ndarray, quantity: int, weights: Optional[Dict] = None) -> np.ndarray:
+    """
+    Score of seating a group of `quantity` starting at each (row, seat index);
+    -inf where the run isn't entirely free.
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    rows, seats = occupied.shape
+    width = seats - quantity + 1
+    if quantity < 1 or width < 1:
+        return np.full((rows, 0), -np.inf)
+
+    # Free seats in each window of `quantity` seats
+    counts = np.zeros((rows, seats + 1), dtype=np.int32)
+    np.cumsum(~occupied, axis=1, out=counts[:, 1:])
+    runs = (counts[:, quantity:] - counts[:, :-quantity]) == quantity
+
+    # Row edges count as taken; seat k is column k + 2
+    padded = np.pad(occupied, ((0, 0), (2, 2)), constant_values=True)
+    left, left2 = padded[:, 1:1 + width], padded[:, :width]
+    right = padded[:, quantity + 2:quantity + 2 + width]
+    right2 = padded[:, quantity + 3:quantity + 3 + width]
+    adjacency = (left.astype(np.float64) + right) / 2
+    orphans = (~left & left2).astype(np.float64) + (~right & right2)
+
+    scores = (
+        _static_scores(rows, seats, quantity, weights['row'], weights['center'])
+        + weights['adjacency'] * adjacency
+        - weights['orphan'] * orphans
+    )
+    return np.where(runs, scores, -np.inf)
+
+
+def best_available(bitmap: SeatBitmap, quantity: int, weights: Optional[Dict] = None) -> List[Dict]:
+    """
+    Best seats for a group: the highest scoring run of adjacent free seats,
+    else the best individual free seats if no row can fit the group together.
+    Empty if fewer than `quantity` seats are free.
+    """
+    if quantity < 1:
+        return []
+    occupied = occupancy_grid(bitmap)
+
+    scores = placement_scores(occupied, quantity, weights)
+    if scores.size and np.isfinite(scores).any():
+        row, start = (int(index) for index in np.unravel_index(np.argmax(scores), scores.shape))
+        return [
+            {'row': bitmap.rows[row], 'seat': bitmap.seat_start + start + offset}
+            for offset in range(quantity)
+        ]
+
+    free = ~occupied.ravel()
+    if free.sum() < quantity:
+        return []
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    seat_scores = _static_scores(*occupied.shape, 1, weights['row'], weights['center']).ravel()
+    seat_scores = np.where(free, seat_scores, -np.inf)
+    chosen = np.sort(np.argpartition(-seat_scores, quantity - 1)[:quantity])
+    seats_per_row = occupied.shape[1]
+    return [
+        {'row': bitmap.rows[index // seats_per_row], 'seat': bitmap.seat_start + index % seats_per_row}
+        for index in chosen.tolist()
+    ]
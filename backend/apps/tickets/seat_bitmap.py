@@ -0,0 +1,138 @@
+"""
+Seat occupancy bitmap for amphitheater seat blocks.
+One bit per seat (sold or held), row-major, with a padding bit after each
+row so a run of free seats never spans two rows. Finding N adjacent free
+seats is a handful of big-integer operations, independent of how many
+seats are already taken.
+"""
+from typing import Iterable, List, Dict, Optional
+
+
+def _row_index(label: str) -> int:
+    """A -> 0, Z -> 25, AA -> 26; numeric labels map to themselves."""
+    if label.isdigit():
+        return int(label)
+    index = 0
+    for char in label.upper():
+        index = index * 26 + (ord(char) - 64)
+    return index - 1
+
+
+def _row_label(index: int, numeric: bool) -> str:
+    if numeric:
+        return str(index)
+    label = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        label = chr(65 + remainder) + label
+    return label
+
+
+def row_labels(row_start: str, row_end: str) -> List[str]:
+    """All row labels from row_start to row_end inclusive."""
+    numeric = row_start.isdigit()
+    first, last = _row_index(row_start), _row_index(row_end)
+    if last < first:
+        last = first
+    return [_row_label(index, numeric) for index in range(first, last + 1)]
+
+
+class SeatBitmap:
+    """Occupancy of a seat block; bit set = seat taken."""
+
+    def __init__(self, rows: List[str], seat_start: int, seat_end: int, bits: int = 0):
+        self.rows = rows
+        self.row_numbers = {row: number for number, row in enumerate(rows)}
+        self.seat_start = seat_start
+        self.seats_per_row = seat_end - seat_start + 1
+        self.stride = self.seats_per_row + 1
+        self.size = len(rows) * self.stride
+        self.bits = bits
+
+        row_mask = (1 << self.seats_per_row) - 1
+        self.seat_mask = 0
+        for number in range(len(rows)):
+            self.seat_mask |= row_mask << (number * self.stride)
+
+    @classmethod
+    def for_block(cls, seat_block, bits: int = 0) -> 'SeatBitmap':
+        return cls(
+            row_labels(seat_block.row_start, seat_block.row_end),
+            seat_block.seat_start,
+            seat_block.seat_end,
+            bits
+        )
+
+    @classmethod
+    def from_block(cls, seat_block) -> Optional['SeatBitmap']:
+        """The block's stored bitmap, or None if it hasn't been built yet."""
+        if seat_block.occupancy is None:
+            return None
+        return cls.for_block(seat_block, int.from_bytes(bytes(seat_block.occupancy), 'little'))
+
+    def to_bytes(self) -> bytes:
+        return self.bits.to_bytes((self.size + 7) // 8, 'little')
+
+    def position(self, row: str, seat: int) -> Optional[int]:
+        number = self.row_numbers.get(row)
+        offset = seat - self.seat_start
+        if number is None or not 0 <= offset < self.seats_per_row:
+            return None
+        return number * self.stride + offset
+
+    def seat(self, position: int) -> Dict:
+        number, offset = divmod(position, self.stride)
+        return {'row': self.rows[number], 'seat': self.seat_start + offset}
+
+    def _mask(self, seats: Iterable[Dict]) -> int:
+        mask = 0
+        for seat in seats:
+            position = self.position(seat['row'], seat['seat'])
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def mark(self, seats: Iterable[Dict]) -> None:
+        self.bits |= self._mask(seats)
+
+    def clear(self, seats: Iterable[Dict]) -> None:
+        self.bits &= ~self._mask(seats)
+
+    @property
+    def free_mask(self) -> int:
+        return ~self.bits & self.seat_mask
+
+    @property
+    def occupied_count(self) -> int:
+        return bin(self.bits & self.seat_mask).count('1')
+
+    def find_run(self, quantity: int) -> Optional[int]:
+        """Position of the first run of `quantity` adjacent free seats in a row."""
+        if quantity < 1 or quantity > self.seats_per_row:
+            return None
+        # runs has bit i set when seats i .. i+length-1 are all free; double length each step
+        runs, length = self.free_mask, 1
+        while length < quantity:
+            step = min(length, quantity - length)
+            runs &= runs >> step
+            length += step
+        if not runs:
+            return None
+        return (runs & -runs).bit_length() - 1
+
+    def find(self, quantity: int) -> List[Dict]:
+        """
+        Seats for a hold: the first run of adjacent free seats, else the first
+        free seats in row order. Empty if fewer than `quantity` are free.
+        """
+        start = self.find_run(quantity)
+        if start is not None:
+            return [self.seat(start + offset) for offset in range(quantity)]
+
+        free, seats = self.free_mask, []
+        while free and len(seats) < quantity:
+            lowest = free & -free
+            seats.append(self.seat(lowest.bit_length() - 1))
+            free ^= lowest
+        return seats if len(seats) == quantity else []
@@ -0,0 +1,139 @@
+"""
+Amphitheater seat holds kept in the cache instead of SeatHold rows.
+Each hold is a cache key that expires on its own (a native TTL on Redis), and
+each seat block keeps an index of its holds' seats and expiry times. Index
+entries past their expiry are ignored when read and dropped on the next write,
+so held seats return the moment a hold expires, with no cleanup sweep.
+Index writes are made while holding the block's row lock, which serializes
+them per block. A SeatHold row is written only when a hold becomes tickets.
+Holds are kept in the seat_holds cache, which must never evict.
+"""
+import logging
+import math
+import time
+from typing import Dict, Iterable, Optional
+
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+
+logger = logging.getLogger(__name__)
+
+hold_cache = ConnectionProxy(caches, 'seat_holds')
+
+
+class SeatHoldStoreUnavailable(Exception):
+    """Raised when the hold store can't be reached."""
+
+
+class SeatHoldStore:
+    """Cache-backed store of live seat holds."""
+
+    # A block's index outlives its latest hold by this many seconds
+    INDEX_GRACE = 60
+
+    @staticmethod
+    def hold_key(hold_id) -> str:
+        return f"amphitheater:hold:{hold_id}"
+
+    @staticmethod
+    def block_key(block_id) -> str:
+        return f"amphitheater:block:{block_id}:holds"
+
+    @staticmethod
+    def _live(index: Optional[Dict], now: float) -> Dict[str, Dict]:
+        return {hold_id: entry for hold_id, entry in (index or {}).items() if entry['expires'] > now}
+
+    @classmethod
+    def get(cls, hold_id) -> Optional[Dict]:
+        """A live hold, or None if it expired, was released or never existed."""
+        try:
+            hold = hold_cache.get(cls.hold_key(hold_id))
+        except Exception as e:
+            raise SeatHoldStoreUnavailable(str(e)) from e
+        # Cache timeouts are whole seconds; the hold's own expiry is exact
+        if hold is None or hold['expires'] <= time.time():
+            return None
+        return hold
+
+    @classmethod
+    def get_many(cls, hold_ids: Iterable) -> Dict[str, Dict]:
+        """Live holds among hold_ids in one cache read, keyed by hold id."""
+        keys = {cls.hold_key(hold_id): str(hold_id) for hold_id in hold_ids}
+        if not keys:
+            return {}
+        try:
+            holds = hold_cache.get_many(list(keys))
+        except Exception as e:
+            raise SeatHoldStoreUnavailable(str(e)) from e
+        now = time.time()
+        return {keys[key]: hold for key, hold in holds.items() if hold['expires'] > now}
+
+    @classmethod
+    def block_holds(cls, block_id) -> Dict[str, Dict]:
+        """Live holds in a block: {hold_id: {'quantity', 'seats', 'expires'}}."""
+        try:
+            index = hold_cache.get(cls.block_key(block_id))
+        except Exception as e:
+            raise SeatHoldStoreUnavailable(str(e)) from e
+        return cls._live(index, time.time())
+
+    @classmethod
+    def live_holds(cls, block_ids: Iterable) -> Dict[str, Dict[str, Dict]]:
+        """Live holds of each block, as block_holds returns them, in one cache read."""
+        block_ids = [str(block_id) for block_id in block_ids]
+        if not block_ids:
+            return {}
+        try:
+            indexes = hold_cache.get_many([cls.block_key(block_id) for block_id in block_ids])
+        except Exception as e:
+            raise SeatHoldStoreUnavailable(str(e)) from e
+
+        now = time.time()
+        return {block_id: cls._live(indexes.get(cls.block_key(block_id)), now) for block_id in block_ids}
+
+    @classmethod
+    def held_counts(cls, block_ids: Iterable) -> Dict[str, int]:
+        """Seats held by live holds in each block, in one cache read."""
+        return {
+            block_id: sum(entry['quantity'] for entry in holds.values())
+            for block_id, holds in cls.live_holds(block_ids).items()
+        }
+
+    @classmethod
+    def _write_index(cls, block_id, index: Dict[str, Dict], now: float) -> None:
+        key = cls.block_key(block_id)
+        if not index:
+            hold_cache.delete(key)
+            return
+        latest = max(entry['expires'] for entry in index.values())
+        hold_cache.set(key, index, timeout=math.ceil(latest - now) + cls.INDEX_GRACE)
+
+    @classmethod
+    def add(cls, hold: Dict) -> None:
+        """Store a new hold; the caller holds its block's row lock."""
+        now = time.time()
+        try:
+            index = cls._live(hold_cache.get(cls.block_key(hold['seat_block_id'])), now)
+            index[hold['id']] = {
+                'quantity': hold['quantity'],
+                'seats': hold['seats'],
+                'expires': hold['expires'],
+            }
+            hold_cache.set(cls.hold_key(hold['id']), hold, timeout=math.ceil(hold['expires'] - now))
+            cls._write_index(hold['seat_block_id'], index, now)
+        except Exception as e:
+            raise SeatHoldStoreUnavailable(str(e)) from e
+
+    @classmethod
+    def remove(cls, block_id, hold_ids: Iterable) -> None:
+        """Drop holds of one block; the caller holds the block's row lock."""
+        hold_ids = [str(hold_id) for hold_id in hold_ids]
+        now = time.time()
+        try:
+            index = cls._live(hold_cache.get(cls.block_key(block_id)), now)
+            for hold_id in hold_ids:
+                index.pop(hold_id, None)
+            hold_cache.delete_many([cls.hold_key(hold_id) for hold_id in hold_ids])
+            cls._write_index(block_id, index, now)
+        except Exception as e:
+            raise SeatHoldStoreUnavailable(str(e)) from e
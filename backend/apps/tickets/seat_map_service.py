@@ -0,0 +1,295 @@
+"""
+Compact, versioned amphitheater seat availability.
+The seat layout (sections, rows and seat numbers) rarely changes and is served
+as its own document. Availability is one bitset per section, in layout order,
+tagged with a version: the time of the latest seat change, counting a lapsed
+reservation as changing when it lapses. Clients revalidate with the version as
+ETag, or ask for only the seats that changed since a version they hold.
+Expired reservations are treated as free when read rather than cleared by an UPDATE.
+"""
+import base64
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Case, Count, Max, Q, When, BooleanField
+from django.utils import timezone
+
+from .models import AmphitheaterSeat
+
+logger = logging.getLogger(__name__)
+
+# Pacific Amphitheatre seating, matching the frontend seat map
+SEAT_SECTIONS = [
+    # Pit - Standing room
+    {'id': 'pit', 'name': 'Pit', 'price': 299, 'tier': 'pit', 'capacity': 200},
+    
+    # Circle - Premium seating
+    {'id': 'circle', 'name': 'Circle', 'price': 249, 'tier': 'circle', 'rows': 8, 'seatsPerRow': 35},
+    
+    # Front sections - Enlarged
+    {'id': 1, 'name': 'Section 1', 'price': 199, 'tier': 'front', 'rows': 25, 'seatsPerRow': 28},
+    {'id': 2, 'name': 'Section 2', 'price': 229, 'tier': 'front', 'rows': 25, 'seatsPerRow': 32},
+    {'id': 3, 'name': 'Section 3', 'price': 199, 'tier': 'front', 'rows': 25, 'seatsPerRow': 28},
+    
+    # Mid sections
+    {'id': 4, 'name': 'Section 4', 'price': 149, 'tier': 'mid', 'rows': 30, 'seatsPerRow': 32},
+    {'id': 5, 'name': 'Section 5', 'price': 139, 'tier': 'mid', 'rows': 30, 'seatsPerRow': 35},
+    {'id': 7, 'name': 'Section 7', 'price': 139, 'tier': 'mid', 'rows': 30, 'seatsPerRow': 35},
+    {'id': 8, 'name': 'Section 8', 'price': 149, 'tier': 'mid', 'rows': 30, 'seatsPerRow': 32},
+    
+    # Back section
+    {'id': 6, 'name': 'Section 6', 'price': 99, 'tier': 'back', 'rows': 35, 'seatsPerRow': 45},
+]
+
+
+def section_layout(section: Dict) -> List[Tuple[str, int]]:
+    """(row, seat number) of every seat in a section config."""
+    # Pit is standing room
+    if section['tier'] == 'pit':
+        return [('GA', number) for number in range(1, section['capacity'] + 1)]
+    
+    seats = []
+    for row in range(section['rows']):
+        row_letter = chr(65 + row)  # A, B, C, etc.
+        
+        # Rows widen gradually towards the back
+        growth = 0.5 if section['tier'] == 'circle' else 0.4
+        seats_in_row = section['seatsPerRow'] + int(row * growth)
+        seats.extend((row_letter, number) for number in range(1, seats_in_row + 1))
+    return seats
+
+
+class SeatMapService:
+    """Service for reading amphitheater seat availability."""
+
+    LAYOUT_CACHE_KEY = 'amphitheater:seats:layout'
+    # Seat initialization drops the cached layout; this bounds it otherwise
+    LAYOUT_TIMEOUT = 60 * 60
+    # Payloads are keyed by version, so this only bounds memory use once a version has settled
+    PAYLOAD_TIMEOUT = 60 * 10
+    # Deltas reach back this far before the requested version, so a change whose
+    # timestamp was taken just before a client's version but committed after it is
+    # still sent; seats in a delta carry their full state, so repeats are harmless
+    DELTA_OVERLAP = timedelta(seconds=5)
+
+    @staticmethod
+    def _lapsed(now: datetime) -> Q:
+        return Q(is_available=False, ticket__isnull=True, reserved_until__lte=now)
+
+    @staticmethod
+    def available_filter(now: datetime = None) -> Q:
+        """Seats that can be taken: available, or reserved with the reservation lapsed."""
+        return Q(is_available=True) | SeatMapService._lapsed(now or timezone.now())
+
+    @staticmethod
+    def _with_availability(queryset, now: datetime):
+        return queryset.annotate(
+            available=Case(
+                When(SeatMapService.available_filter(now), then=True),
+                default=False,
+                output_field=BooleanField()
+            )
+        )
+
+    @staticmethod
+    def to_version(moment: Optional[datetime]) -> int:
+        """Microseconds since the epoch; 0 before any seat exists."""
+        if moment is None:
+            return 0
+        return int(moment.timestamp() * 1_000_000)
+
+    @staticmethod
+    def from_version(version: int) -> datetime:
+        return datetime.fromtimestamp(version / 1_000_000, tz=dt_timezone.utc)
+
+    @staticmethod
+    def current_version(now: datetime = None) -> int:
+        """Version of the seat map: its latest write or reservation lapse, in one query."""
+        now = now or timezone.now()
+        latest = AmphitheaterSeat.objects.aggregate(
+            written=Max('updated_at'),
+            lapsed=Max('reserved_until', filter=SeatMapService._lapsed(now)),
+        )
+        return SeatMapService.to_version(max(filter(None, latest.values()), default=None))
+
+    @staticmethod
+    def is_settled(version: int, now: datetime = None) -> bool:
+        """
+        Whether a version is older than DELTA_OVERLAP. Until then a write stamped
+        before the version may not have committed yet, so the version can hold
+        still while the seat map changes.
+        """
+        now = now or timezone.now()
+        return now - SeatMapService.from_version(version) >= SeatMapService.DELTA_OVERLAP
+
+    @staticmethod
+    def _payload_timeout(version: int, now: datetime) -> int:
+        """Payloads of a version that has not settled are kept only briefly."""
+        if not SeatMapService.is_settled(version, now):
+            return 1
+        return SeatMapService.PAYLOAD_TIMEOUT
+
+    @staticmethod
+    def get_layout() -> Dict:
+        """
+        Static seat layout: sections with their rows and seat numbers.
+        Bit i of a section's availability is the i-th seat listed here.
+        """
+        layout = cache.get(SeatMapService.LAYOUT_CACHE_KEY)
+        if layout is not None:
+            return layout
+
+        sections = {}
+        for section_id, section_name, price_cents, row, seat_number in AmphitheaterSeat.objects.order_by(
+            'section_id', 'row', 'seat_number'
+        ).values_list('section_id', 'section_name', 'price_cents', 'row', 'seat_number'):
+            section = sections.setdefault(section_id, {
+                'id': section_id,
+                'name': section_name,
+                'price_cents': price_cents,
+                'rows': [],
+            })
+            if not section['rows'] or section['rows'][-1]['row'] != row:
+                section['rows'].append({'row': row, 'seats': []})
+            section['rows'][-1]['seats'].append(seat_number)
+
+        body = {'sections': list(sections.values())}
+        layout = {
+            'layout_version': hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()[:16],
+            **body,
+        }
+        cache.set(SeatMapService.LAYOUT_CACHE_KEY, layout, timeout=SeatMapService.LAYOUT_TIMEOUT)
+        return layout
+
+    @staticmethod
+    def initialize_seats(sections: List[Dict] = None) -> int:
+        """
+        Create any missing seats of the seat map: the layout is built in memory and
+        inserted with one bulk INSERT per incomplete section, skipping seats that exist.
+        Returns the number of seats created.
+        """
+        counts = dict(
+            AmphitheaterSeat.objects.values_list('section_id').annotate(seats=Count('id')).order_by()
+        )
+        created = 0
+        for section in sections or SEAT_SECTIONS:
+            section_id = str(section['id'])
+            layout = section_layout(section)
+            existing = counts.get(section_id, 0)
+            # Complete sections are skipped, so a re-run is a single query
+            if existing >= len(layout):
+                continue
+            AmphitheaterSeat.objects.bulk_create([
+                AmphitheaterSeat(
+                    section_id=section_id,
+                    section_name=section['name'],
+                    row=row,
+                    seat_number=number,
+                    price_cents=section['price'] * 100,
+                    is_available=True
+                )
+                for row, number in layout
+            ], ignore_conflicts=True)
+            created += AmphitheaterSeat.objects.filter(section_id=section_id).count() - existing
+        
+        if created:
+            SeatMapService.layout_changed()
+        return created
+
+    @staticmethod
+    def layout_changed() -> None:
+        """Drop the cached layout after seats are added or removed."""
+        cache.delete(SeatMapService.LAYOUT_CACHE_KEY)
+
+    @staticmethod
+    def get_availability(version: int = None) -> Dict:
+        """
+        Availability as one base64 bitset per section (bit set = seat free,
+        least significant bit first), cached per version.
+        """
+        now = timezone.now()
+        version = SeatMapService.current_version(now) if version is None else version
+        key = f"amphitheater:seats:availability:{version}"
+        payload = cache.get(key)
+        if payload is not None:
+            return payload
+
+        layout = SeatMapService.get_layout()
+        free = set(
+            AmphitheaterSeat.objects.filter(SeatMapService.available_filter(now))
+            .values_list('section_id', 'row', 'seat_number')
+        )
+        sections = {}
+        for section in layout['sections']:
+            seats = [(row['row'], number) for row in section['rows'] for number in row['seats']]
+            bits = 0
+            for index, (row, number) in enumerate(seats):
+                if (section['id'], row, number) in free:
+                    bits |= 1 << index
+            sections[section['id']] = {
+                'available': bin(bits).count('1'),
+                'bits': base64.b64encode(bits.to_bytes((len(seats) + 7) // 8, 'little')).decode(),
+            }
+
+        payload = {
+            'version': version,
+            'layout_version': layout['layout_version'],
+            'sections': sections,
+        }
+        cache.set(key, payload, timeout=SeatMapService._payload_timeout(version, now))
+        return payload
+
+    @staticmethod
+    def get_seats(version: int = None) -> List[Dict]:
+        """Every seat with its availability, as the original endpoint returned it."""
+        now = timezone.now()
+        version = SeatMapService.current_version(now) if version is None else version
+        key = f"amphitheater:seats:list:{version}"
+        seats = cache.get(key)
+        if seats is not None:
+            return seats
+
+        seats = [
+            {
+                'section_id': section_id,
+                'section_name': section_name,
+                'row': row,
+                'seat_number': seat_number,
+                'is_available': available,
+                'price_cents': price_cents,
+            }
+            for section_id, section_name, row, seat_number, available, price_cents in SeatMapService._with_availability(
+                AmphitheaterSeat.objects.all(), now
+            ).values_list('section_id', 'section_name', 'row', 'seat_number', 'available', 'price_cents')
+        ]
+        cache.set(key, seats, timeout=SeatMapService._payload_timeout(version, now))
+        return seats
+
+    @staticmethod
+    def get_changes(since: int, version: int = None) -> Dict:
+        """Seats written or whose reservation lapsed after version `since`, with their current state."""
+        now = timezone.now()
+        version = SeatMapService.current_version(now) if version is None else version
+        after = SeatMapService.from_version(since) - SeatMapService.DELTA_OVERLAP
+        changed = SeatMapService._with_availability(
+            AmphitheaterSeat.objects.filter(
+                Q(updated_at__gt=after) | (SeatMapService._lapsed(now) & Q(reserved_until__gt=after))
+            ),
+            now
+        ).order_by('section_id', 'row', 'seat_number')
+
+        return {
+            'version': version,
+            'since': since,
+            'layout_version': SeatMapService.get_layout()['layout_version'],
+            'changes': [
+                {'section_id': section_id, 'row': row, 'seat_number': seat_number, 'is_available': available}
+                for section_id, row, seat_number, available in changed.values_list(
+                    'section_id', 'row', 'seat_number', 'available'
+                )
+            ],
+        }
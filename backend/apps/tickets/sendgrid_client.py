@@ -0,0 +1,111 @@
+"""
+Pooled SendGrid v3 client shared per process.
+"""
+import logging
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# SendGrid accepts at most 1000 personalizations per request
+MAX_PERSONALIZATIONS = 1000
+
+
+class SendGridError(Exception):
+    """Error response from SendGrid."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def is_transient(self) -> bool:
+        """Network errors, rate limiting and server errors are worth retrying."""
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+class SendGridClient:
+    """
+    Thin client for the SendGrid mail/send endpoint.
+    Keeps one HTTP session so connections are reused across sends.
+    """
+
+    def __init__(self, api_key: str, base_url: str, pool_size: int = 10, timeout: float = 30):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+        })
+
+    def send(self, message: dict) -> int:
+        """POST a v3 mail/send payload. Returns the HTTP status code."""
+        if not self.api_key:
+            # Same as the console email backend used when SendGrid isn't configured
+            recipients = sum(len(p.get('to', [])) for p in message.get('personalizations', []))
+            logger.info(f"SendGrid not configured; skipping '{message.get('subject')}' to {recipients} recipients")
+            return 202
+
+        try:
+            response = self.session.post(
+                f'{self.base_url}/v3/mail/send',
+                json=message,
+                timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            raise SendGridError(f'SendGrid request failed: {e}') from e
+
+        if response.status_code >= 400:
+            retry_after = response.headers.get('Retry-After')
+            raise SendGridError(
+                f'SendGrid returned {response.status_code}: {response.text[:500]}',
+                status_code=response.status_code,
+                retry_after=int(retry_after) if retry_after and retry_after.isdigit() else None
+            )
+        return response.status_code
+
+    def send_batch(
+        self,
+        personalizations: list[dict],
+        subject: str,
+        text_content: str,
+        html_content: str,
+        from_email: Optional[str] = None
+    ) -> int:
+        """Send one message to many recipients with per-recipient substitutions."""
+        if len(personalizations) > MAX_PERSONALIZATIONS:
+            raise ValueError(f'At most {MAX_PERSONALIZATIONS} personalizations per request')
+
+        return self.send({
+            'personalizations': personalizations,
+            'from': {'email': from_email or settings.DEFAULT_FROM_EMAIL},
+            'subject': subject,
+            'content': [
+                {'type': 'text/plain', 'value': text_content},
+                {'type': 'text/html', 'value': html_content},
+            ],
+        })
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_sendgrid_client() -> SendGridClient:
+    """Return the process-wide SendGrid client."""
+    global _client
+    with _client_lock:
+        base_url = settings.SENDGRID_API_URL
+        if _client is None or _client.base_url != base_url.rstrip('/') or _client.api_key != settings.SENDGRID_API_KEY:
+            _client = SendGridClient(settings.SENDGRID_API_KEY, base_url)
+        return _client
@@ -2,7 +2,7 @@
 Ticket serializers.
 """
 from rest_framework import serializers
-from .models import TicketType, Order, OrderItem, Ticket, TicketTransfer, TicketUpgrade, Refund, Comp
+from .models import TicketType, Order, OrderItem, Ticket, TicketTransfer, TicketUpgrade, Refund, Comp, BulkJob
 
 
 class TicketTypeSerializer(serializers.ModelSerializer):
@@ -277,13 +277,41 @@ class ResendTicketsSerializer(serializers.Serializer):
     """Serializer for resending tickets."""
     order_id = serializers.UUIDField(required=False)
     ticket_id = serializers.UUIDField(required=False)
+    order_ids = serializers.ListField(child=serializers.UUIDField(), required=False)
+    all_orders = serializers.BooleanField(default=False)
     
     def validate(self, data):
-        if not data.get('order_id') and not data.get('ticket_id'):
-            raise serializers.ValidationError("Either order_id or ticket_id is required")
+        if not any([data.get('order_id'), data.get('ticket_id'), data.get('order_ids'), data.get('all_orders')]):
+            raise serializers.ValidationError("One of order_id, ticket_id, order_ids or all_orders is required")
         return data
 
 
 class ResendInvoiceSerializer(serializers.Serializer):
     """Serializer for resending invoice."""
-    order_id = serializers.UUIDField()
+    order_id = serializers.UUIDField(required=False)
+    order_ids = serializers.ListField(child=serializers.UUIDField(), required=False)
+    all_orders = serializers.BooleanField(default=False)
+    
+    def validate(self, data):
+        if not any([data.get('order_id'), data.get('order_ids'), data.get('all_orders')]):
+            raise serializers.ValidationError("One of order_id, order_ids or all_orders is required")
+        return data
+
+
+class BulkEmailSerializer(serializers.Serializer):
+    """Serializer for announcements to buyers."""
+    subject = serializers.CharField(max_length=200)
+    message = serializers.CharField()
+    order_ids = serializers.ListField(child=serializers.UUIDField(), required=False)
+
+
+class BulkJobSerializer(serializers.ModelSerializer):
+    """Serializer for bulk job progress."""
+    progress_percent = serializers.FloatField(read_only=True)
+    
+    class Meta:
+        model = BulkJob
+        fields = [
+            'id', 'kind', 'status', 'total_count', 'processed_count', 'failed_count',
+            'progress_percent', 'created_at', 'started_at', 'finished_at'
+        ]
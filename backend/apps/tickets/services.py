@@ -8,19 +8,24 @@ import json
 import logging
 from datetime import timedelta
 from typing import Optional, Tuple
-from django.db import transaction
-from django.db.models import F
+from django.db import transaction, IntegrityError
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.conf import settings
+from django.core.cache import cache
 from django.core.mail import send_mail
 
 from .models import (
-    TicketType, Order, OrderItem, Ticket, 
+    TicketType, TicketSoldCounter, Order, OrderItem, Ticket, 
     TicketTransfer, TicketUpgrade, Refund, Comp, Invoice
 )
 from apps.accounts.models import User, AuditLog
 from apps.accounts.services import AuditService
-from .email_service import TicketEmailService
+from .inventory_service import InventoryService, InventoryUnavailable
+from .outbox_service import EmailOutboxService
+from .seat_hold_store import SeatHoldStoreUnavailable
+from .pdf_service import TicketPDFService
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +33,8 @@ logger = logging.getLogger(__name__)
 class QRCodeService:
     """Service for generating and validating secure QR codes."""
     
+    QR_PNG_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+    
     @staticmethod
     def generate_payload(ticket: Ticket, kind: str = 'ATTENDEE') -> dict:
         """Generate the QR code payload."""
@@ -36,7 +43,7 @@ class QRCodeService:
             'kind': kind,
             'issued_at': ticket.issued_at.isoformat(),
             'nonce': secrets.token_hex(8),
-            'valid_days': ticket.ticket_type.valid_days,
+            'valid_days': ticket.ticket_type.valid_days if ticket.ticket_type else [],
             'version': ticket.qr_secret_version,
         }
     
@@ -67,6 +74,42 @@ class QRCodeService:
             'signature': signature
         })
     
+    @staticmethod
+    def png_cache_key(ticket: Ticket) -> str:
+        return f"qr_png:{ticket.id}:{ticket.qr_secret_version}:{ticket.ticket_type_id}"
+    
+    @classmethod
+    def render_png(cls, ticket: Ticket) -> bytes:
+        """
+        QR code PNG for a ticket.
+        Rendered once per QR version and cached, so emails, resends and PDFs share it.
+        """
+        key = cls.png_cache_key(ticket)
+        try:
+            png = cache.get(key)
+        except Exception:
+            png = None
+        if png is not None:
+            return png
+        
+        import qrcode
+        from io import BytesIO
+        
+        qr = qrcode.QRCode(version=1, box_size=10, border=4)
+        qr.add_data(cls.generate_qr_data(ticket))
+        qr.make(fit=True)
+        img = qr.make_image(fill_color="black", back_color="white")
+        
+        buffer = BytesIO()
+        img.save(buffer, format='PNG')
+        png = buffer.getvalue()
+        
+        try:
+            cache.set(key, png, timeout=cls.QR_PNG_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Failed to cache QR code for ticket {ticket.ticket_code}: {e}")
+        return png
+    
     @classmethod
     def verify_qr_data(cls, qr_data: str) -> Tuple[bool, dict, str]:
         """
@@ -97,6 +140,58 @@ class QRCodeService:
 class OrderService:
     """Service for order management."""
     
+    @staticmethod
+    def _reserve_inventory(ticket_types: dict, quantities: dict) -> dict:
+        """
+        Reserve capacity-limited ticket types on the inventory counters.
+        quantities: {ticket_type_id: quantity} requested.
+        Returns {ticket_type_id: quantity} reserved; nothing is kept if any type fails.
+        The reservations stay pending until the current transaction commits, so
+        they are handed back on their own if it rolls back, here or in a caller.
+        Falls back to checking under the TicketType row locks if the counters are down.
+        """
+        limited = [ticket_types[tt_id] for tt_id in sorted(quantities) if ticket_types[tt_id].capacity]
+        
+        bucket = InventoryService.pending_bucket()
+        reservations = {}
+        try:
+            for ticket_type in limited:
+                quantity = quantities[str(ticket_type.id)]
+                if not InventoryService.reserve(ticket_type, quantity, bucket):
+                    raise ValueError(f"Not enough {ticket_type.name} tickets available")
+                reservations[str(ticket_type.id)] = quantity
+        except InventoryUnavailable as e:
+            InventoryService.cancel_pending(reservations, bucket)
+            logger.warning(f"Inventory counters unavailable, locking ticket types: {e}")
+            OrderService._check_capacity_locked(limited, quantities)
+            return {}
+        except Exception:
+            InventoryService.cancel_pending(reservations, bucket)
+            raise
+        
+        if reservations:
+            transaction.on_commit(
+                lambda: InventoryService.commit_pending(reservations, bucket),
+                robust=True
+            )
+        return reservations
+    
+    @staticmethod
+    def _check_capacity_locked(ticket_types: list[TicketType], quantities: dict) -> None:
+        """Check capacity under row locks taken in one query, in id order to avoid deadlocks."""
+        if not ticket_types:
+            return
+        ids = [ticket_type.id for ticket_type in ticket_types]
+        list(TicketType.objects.select_for_update().filter(id__in=ids).order_by('id').values_list('id', flat=True))
+        
+        # Totals read after the locks are held (FOR UPDATE can't be combined with GROUP BY)
+        sold = TicketType.objects.filter(id__in=ids).annotate(
+            sharded=Coalesce(Sum('sold_counters__count'), 0)
+        ).values_list('id', 'capacity', 'sold_count', 'sharded', 'name')
+        for tt_id, capacity, sold_count, sharded, name in sold:
+            if capacity - sold_count - sharded < quantities[str(tt_id)]:
+                raise ValueError(f"Not enough {name} tickets available")
+    
     @staticmethod
     @transaction.atomic
     def create_order(
@@ -109,13 +204,37 @@ class OrderService:
         Create a new order with items.
         items: [{'ticket_type_id': uuid, 'quantity': int}, ...]
         payment_method: 'card' or 'cash'
+        Ticket types are fetched in one query and items inserted with one bulk_create,
+        so the number of queries doesn't grow with the cart.
         """
         # Check for existing order with same idempotency key
         existing = Order.objects.filter(idempotency_key=idempotency_key).first()
         if existing:
             return existing
         
-        order = Order.objects.create(
+        regular_items = [item for item in items if item.get('type') != 'amphitheater']
+        ticket_types = {}
+        for ticket_type in TicketType.objects.filter(
+            id__in={str(item['ticket_type_id']) for item in regular_items}
+        ).annotate(sharded_sold=Coalesce(Sum('sold_counters__count'), 0)):
+            # Sold total from the same query, so is_available doesn't look it up per type
+            ticket_type.sold_total = ticket_type.sold_count + ticket_type.sharded_sold
+            ticket_types[str(ticket_type.id)] = ticket_type
+        
+        # Validate in memory and total up quantities per ticket type
+        quantities = {}
+        for item in regular_items:
+            ticket_type = ticket_types.get(str(item['ticket_type_id']))
+            if ticket_type is None:
+                raise ValueError(f"Ticket type {item['ticket_type_id']} not found")
+            if not ticket_type.is_available:
+                raise ValueError(f"Ticket type {ticket_type.name} is not available")
+            key = str(ticket_type.id)
+            quantities[key] = quantities.get(key, 0) + item['quantity']
+        
+        reservations = OrderService._reserve_inventory(ticket_types, quantities)
+        
+        order = Order(
             order_number=Order.generate_order_number(),
             buyer=buyer,
             idempotency_key=idempotency_key,
@@ -123,55 +242,34 @@ class OrderService:
             status=Order.Status.CREATED
         )
         
+        order_items = []
+        amphitheater_items = []
         subtotal = 0
         for item in items:
             # Handle amphitheater tickets separately
             if item.get('type') == 'amphitheater':
-                # For amphitheater tickets, create a placeholder order item
+                # For amphitheater tickets, create a placeholder order item without ticket_type
                 # The actual amphitheater ticket will be created in finalize_order
                 price_cents = item.get('price', 0) * 100  # Convert dollars to cents
-                item_total = price_cents * item['quantity']
-                
-                # Create order item without ticket_type (will be handled by amphitheater service)
-                # Note: We'll store amphitheater metadata in the order's metadata field
-                OrderItem.objects.create(
+                order_items.append(OrderItem(
                     order=order,
-                    ticket_type=None,  # No ticket type for amphitheater
+                    ticket_type=None,
                     quantity=item['quantity'],
                     unit_price_cents=price_cents,
-                    total_cents=item_total
-                )
-                
-                # Store amphitheater metadata in order metadata
-                if not hasattr(order, '_amphitheater_items'):
-                    order._amphitheater_items = []
-                order._amphitheater_items.append(item)
-                
-                subtotal += item_total
+                    total_cents=price_cents * item['quantity']
+                ))
+                amphitheater_items.append(item)
             else:
-                # Regular ticket with ticket_type_id
-                ticket_type = TicketType.objects.select_for_update().get(
-                    id=item['ticket_type_id']
-                )
-                
-                if not ticket_type.is_available:
-                    raise ValueError(f"Ticket type {ticket_type.name} is not available")
-                
-                if ticket_type.capacity:
-                    if ticket_type.remaining_capacity < item['quantity']:
-                        raise ValueError(f"Not enough {ticket_type.name} tickets available")
-                
-                item_total = ticket_type.price_cents * item['quantity']
-                
-                OrderItem.objects.create(
+                ticket_type = ticket_types[str(item['ticket_type_id'])]
+                order_items.append(OrderItem(
                     order=order,
                     ticket_type=ticket_type,
                     quantity=item['quantity'],
                     unit_price_cents=ticket_type.price_cents,
-                    total_cents=item_total
-                )
-                
-                subtotal += item_total
+                    total_cents=ticket_type.price_cents * item['quantity'],
+                    metadata=item.get('metadata') or {}
+                ))
+            subtotal += order_items[-1].total_cents
         
         # Calculate fees (e.g., 3% processing fee)
         fees = int(subtotal * 0.03)
@@ -181,12 +279,15 @@ class OrderService:
         order.total_cents = subtotal + fees
         
         # Save amphitheater items to order metadata for later retrieval
-        if hasattr(order, '_amphitheater_items'):
-            if not order.metadata:
-                order.metadata = {}
-            order.metadata['amphitheater_items'] = order._amphitheater_items
+        if amphitheater_items:
+            order.metadata['amphitheater_items'] = amphitheater_items
+        
+        # Lets payment failure or finalization settle exactly what was reserved
+        if reservations:
+            order.metadata['inventory_reservations'] = reservations
         
         order.save()
+        OrderItem.objects.bulk_create(order_items)
         
         return order
     
@@ -226,11 +327,11 @@ class OrderService:
         # Issue tickets
         TicketService.issue_tickets_for_order(order)
         
-        # Update sold counts
+        # Update sold counts on a random shard so webhooks don't queue on the TicketType row
         for item in order.items.all():
-            TicketType.objects.filter(id=item.ticket_type_id).update(
-                sold_count=F('sold_count') + item.quantity
-            )
+            if item.ticket_type_id:
+                TicketSoldCounter.increment(item.ticket_type_id, item.quantity)
+        InventoryService.confirm_order(order)
         
         # Create invoice record
         Invoice.objects.create(
@@ -238,13 +339,8 @@ class OrderService:
             invoice_number=Invoice.generate_invoice_number(order)
         )
         
-        # Send order confirmation email (non-blocking)
-        try:
-            from threading import Thread
-            email_thread = Thread(target=TicketEmailService.send_order_confirmation, args=(order,))
-            email_thread.start()
-        except Exception as e:
-            logger.error(f"Failed to queue confirmation email for order {order.order_number}: {e}")
+        # Queue order confirmation email; sent by the outbox dispatcher after commit
+        EmailOutboxService.enqueue_order_confirmation(order)
         
         logger.info(f"Order {order.order_number} finalized successfully")
         
@@ -254,177 +350,173 @@ class OrderService:
 class TicketService:
     """Service for ticket management."""
     
+    # Allocated codes never collide with each other; this only guards against codes set by hand
+    MAX_CODE_ATTEMPTS = 3
+    VENDOR_BUSINESS_TYPES = ['food', 'bazaar']
+    
+    @classmethod
+    def bulk_create_tickets(cls, tickets: list[Ticket]) -> list[Ticket]:
+        """
+        Insert tickets in one query with codes from the code allocator.
+        Retries with new codes if one of them is already taken.
+        """
+        if not tickets:
+            return []
+        
+        for attempt in range(1, cls.MAX_CODE_ATTEMPTS + 1):
+            codes = Ticket.generate_ticket_codes(len(tickets))
+            for ticket, code in zip(tickets, codes):
+                ticket.ticket_code = code
+            try:
+                with transaction.atomic():
+                    return Ticket.objects.bulk_create(tickets)
+            except IntegrityError:
+                if attempt == cls.MAX_CODE_ATTEMPTS:
+                    raise
+                logger.warning(f"Ticket code collision issuing {len(tickets)} tickets, retrying")
+    
     @staticmethod
     def issue_tickets_for_order(order: Order) -> list[Ticket]:
-        """Issue tickets for a paid order."""
+        """
+        Issue tickets for a paid order.
+        The seat holds of all amphitheater items are converted in one call, and
+        all tickets that don't come from seat holds are inserted with one bulk_create.
+        """
         from .amphitheater_services import AmphitheaterService
         
         tickets = []
+        pending = []
+        issued_at = timezone.now()
+        comp_types = {}
         
-        for item in order.items.select_related('ticket_type'):
-            # Handle amphitheater tickets
-            if item.ticket_type is None:
-                # This is an amphitheater ticket - use proper amphitheater service
-                if hasattr(order, '_amphitheater_items'):
-                    for amph_item in order._amphitheater_items:
-                        # Check if this item has hold IDs (seat holds from frontend)
-                        hold_ids = amph_item.get('holdIds') or []
-                        
-                        if hold_ids:
-                            # Convert seat holds to amphitheater tickets with QR codes
-                            for hold_id in hold_ids:
-                                try:
-                                    # Get or create amphitheater ticket type
-                                    ticket_type, _ = TicketType.objects.get_or_create(
-                                        slug='amphitheater-reserved',
-                                        defaults={
-                                            'name': 'Amphitheater Reserved Seating',
-                                            'description': 'Reserved seating at Pacific Amphitheatre',
-                                            'price_cents': int(amph_item.get('price', 0) * 100),
-                                            'is_active': True,
-                                        }
-                                    )
-                                    
-                                    # Convert hold to tickets (creates Ticket + AmphitheaterTicket)
-                                    amph_tickets = AmphitheaterService.convert_hold_to_tickets(
-                                        hold_id=hold_id,
-                                        order=order,
-                                        ticket_type=ticket_type
-                                    )
-                                    
-                                    # Add festival tickets to list
-                                    for amph_ticket in amph_tickets:
-                                        tickets.append(amph_ticket.festival_ticket)
-                                        
-                                except Exception as e:
-                                    logger.error(f"Failed to convert hold {hold_id}: {e}")
-                        else:
-                            # Fallback: create basic amphitheater ticket without seat assignment
-                            logger.warning(f"No hold IDs for amphitheater item, creating basic ticket")
-                            ticket = Ticket.objects.create(
-                                ticket_code=Ticket.generate_ticket_code(),
-                                owner=order.buyer,
-                                ticket_type=None,
-                                order=order,
-                                status=Ticket.Status.ISSUED,
-                                issued_at=timezone.now(),
-                                metadata={
-                                    'type': 'amphitheater',
-                                    'section_name': amph_item.get('section', 'General'),
-                                    'seats': amph_item.get('seats', ''),
-                                    'price_paid': amph_item.get('price', 0) * 100,
-                                    'includes_festival_access': amph_item.get('includesFestival', True),
-                                    'ticket_name': amph_item.get('name', 'Amphitheater Ticket')
-                                }
-                            )
-                            tickets.append(ticket)
-                            
-                            # Auto-create festival access ticket
-                            festival_ticket = TicketService._create_festival_access_ticket(order, ticket)
-                            if festival_ticket:
-                                tickets.append(festival_ticket)
-            else:
-                # Regular ticket with ticket_type
-                for _ in range(item.quantity):
-                    ticket = Ticket.objects.create(
-                        ticket_code=Ticket.generate_ticket_code(),
-                        owner=order.buyer,
-                        ticket_type=item.ticket_type,
-                        order=order,
-                        status=Ticket.Status.ISSUED,
-                        issued_at=timezone.now(),
-                        metadata=item.metadata or {}
-                    )
-                    tickets.append(ticket)
-                    
-                    # Auto-gift 2 festival tickets to vendors
-                    if item.metadata and item.metadata.get('business_type') in ['food', 'bazaar']:
-                        vendor_festival_tickets = TicketService._create_vendor_festival_tickets(order, ticket)
-                        tickets.extend(vendor_festival_tickets)
+        def festival_access_type(granted_with: str) -> TicketType:
+            if granted_with not in comp_types:
+                comp_types[granted_with] = TicketService._festival_access_type(granted_with)
+            return comp_types[granted_with]
         
-        return tickets
-    
-    @staticmethod
-    def _create_vendor_festival_tickets(order: Order, vendor_ticket: Ticket) -> list[Ticket]:
-        """Create 2 complimentary festival access tickets for vendor booth purchase."""
-        tickets = []
-        try:
-            # Find or create a general festival access ticket type
-            festival_ticket_type, created = TicketType.objects.get_or_create(
-                slug='festival-access-comp-vendor',
+        def new_ticket(**fields) -> Ticket:
+            ticket = Ticket(
+                owner=order.buyer,
+                order=order,
+                status=Ticket.Status.ISSUED,
+                issued_at=issued_at,
+                **fields
+            )
+            pending.append(ticket)
+            return ticket
+        
+        items = list(order.items.select_related('ticket_type'))
+        
+        # Amphitheater items are placeholder order items without a ticket type
+        amphitheater_items = []
+        if any(item.ticket_type is None for item in items):
+            amphitheater_items = getattr(order, '_amphitheater_items', None) or []
+        
+        # All of the order's seat holds are converted to tickets with QR codes at once
+        seated_items = [amph_item for amph_item in amphitheater_items if amph_item.get('holdIds')]
+        hold_ids = [hold_id for amph_item in seated_items for hold_id in amph_item['holdIds']]
+        if hold_ids:
+            ticket_type, _ = TicketType.objects.get_or_create(
+                slug='amphitheater-reserved',
                 defaults={
-                    'name': 'Festival Access (Complimentary with Vendor Booth)',
-                    'description': 'Complimentary festival access included with vendor booth purchase',
-                    'price_cents': 0,
-                    'capacity': None,
+                    'name': 'Amphitheater Reserved Seating',
+                    'description': 'Reserved seating at Pacific Amphitheatre',
+                    'price_cents': int(seated_items[0].get('price', 0) * 100),
                     'is_active': True,
                 }
             )
-            
-            # Create 2 festival access tickets
-            for i in range(2):
-                festival_ticket = Ticket.objects.create(
-                    ticket_code=Ticket.generate_ticket_code(),
-                    owner=order.buyer,
-                    ticket_type=festival_ticket_type,
+            try:
+                amph_tickets = AmphitheaterService.convert_holds_to_tickets(
+                    hold_ids=hold_ids,
                     order=order,
-                    status=Ticket.Status.ISSUED,
-                    is_comp=True,
-                    issued_at=timezone.now(),
-                    metadata={
-                        'granted_by_vendor_booth': str(vendor_ticket.id),
-                        'complimentary': True,
-                        'type': 'festival_access',
-                        'ticket_number': i + 1
-                    }
+                    ticket_type=ticket_type
                 )
-                tickets.append(festival_ticket)
-                logger.info(f"Created festival access ticket {festival_ticket.ticket_code} for vendor booth {vendor_ticket.ticket_code}")
-            
-            return tickets
-            
-        except Exception as e:
-            logger.error(f"Failed to create vendor festival access tickets: {e}")
-            return []
-    
-    @staticmethod
-    def _create_festival_access_ticket(order: Order, amphitheater_ticket: Ticket) -> Optional[Ticket]:
-        """Create a complimentary festival access ticket for amphitheater ticket holder."""
-        try:
-            # Find or create a general festival access ticket type
-            festival_ticket_type, created = TicketType.objects.get_or_create(
-                slug='festival-access-comp-amphitheater',
-                defaults={
-                    'name': 'Festival Access (Complimentary with Amphitheater)',
-                    'description': 'Complimentary festival access included with amphitheater ticket purchase',
-                    'price_cents': 0,
-                    'capacity': None,  # Unlimited
-                    'is_active': True,
+                tickets.extend(amph_ticket.festival_ticket for amph_ticket in amph_tickets)
+            except SeatHoldStoreUnavailable:
+                # Fails finalization, so the payment event is retried once the store is back
+                raise
+            except Exception as e:
+                logger.error(f"Failed to convert holds {hold_ids}: {e}")
+        
+        for amph_item in amphitheater_items:
+            if amph_item.get('holdIds'):
+                continue
+            # Fallback: create basic amphitheater ticket without seat assignment
+            logger.warning(f"No hold IDs for amphitheater item, creating basic ticket")
+            ticket = new_ticket(
+                ticket_type=None,
+                metadata={
+                    'type': 'amphitheater',
+                    'section_name': amph_item.get('section', 'General'),
+                    'seats': amph_item.get('seats', ''),
+                    'price_paid': amph_item.get('price', 0) * 100,
+                    'includes_festival_access': amph_item.get('includesFestival', True),
+                    'ticket_name': amph_item.get('name', 'Amphitheater Ticket')
                 }
             )
             
-            # Create the festival access ticket
-            festival_ticket = Ticket.objects.create(
-                ticket_code=Ticket.generate_ticket_code(),
-                owner=order.buyer,
-                ticket_type=festival_ticket_type,
-                order=order,
-                status=Ticket.Status.ISSUED,
+            # Auto-create festival access ticket
+            new_ticket(
+                ticket_type=festival_access_type('amphitheater'),
                 is_comp=True,
-                issued_at=timezone.now(),
                 metadata={
-                    'granted_by_amphitheater': str(amphitheater_ticket.id),
+                    'granted_by_amphitheater': str(ticket.id),
                     'complimentary': True,
                     'type': 'festival_access'
                 }
             )
-            
-            logger.info(f"Created festival access ticket {festival_ticket.ticket_code} for amphitheater ticket {amphitheater_ticket.ticket_code}")
-            return festival_ticket
-            
-        except Exception as e:
-            logger.error(f"Failed to create festival access ticket: {e}")
-            return None
+        
+        for item in items:
+            if item.ticket_type is None:
+                continue
+            # Regular ticket with ticket_type
+            is_vendor = (item.metadata or {}).get('business_type') in TicketService.VENDOR_BUSINESS_TYPES
+            for _ in range(item.quantity):
+                ticket = new_ticket(ticket_type=item.ticket_type, metadata=dict(item.metadata or {}))
+                
+                # Auto-gift 2 festival tickets to vendors
+                if is_vendor:
+                    for i in range(2):
+                        new_ticket(
+                            ticket_type=festival_access_type('vendor'),
+                            is_comp=True,
+                            metadata={
+                                'granted_by_vendor_booth': str(ticket.id),
+                                'complimentary': True,
+                                'type': 'festival_access',
+                                'ticket_number': i + 1
+                            }
+                        )
+        
+        tickets.extend(TicketService.bulk_create_tickets(pending))
+        logger.info(f"Issued {len(tickets)} tickets for order {order.order_number}")
+        
+        # Pre-render ticket PDFs in the background once the order commits
+        TicketPDFService.schedule_prerender(tickets)
+        
+        return tickets
+    
+    @staticmethod
+    def _festival_access_type(granted_with: str) -> TicketType:
+        """Complimentary festival access ticket type for vendor booth or amphitheater purchases."""
+        names = {
+            'vendor': ('Festival Access (Complimentary with Vendor Booth)',
+                       'Complimentary festival access included with vendor booth purchase'),
+            'amphitheater': ('Festival Access (Complimentary with Amphitheater)',
+                             'Complimentary festival access included with amphitheater ticket purchase'),
+        }
+        name, description = names[granted_with]
+        ticket_type, _ = TicketType.objects.get_or_create(
+            slug=f'festival-access-comp-{granted_with}',
+            defaults={
+                'name': name,
+                'description': description,
+                'price_cents': 0,
+                'capacity': None,  # Unlimited
+                'is_active': True,
+            }
+        )
+        return ticket_type
     
     @staticmethod
     def issue_comp_tickets(
@@ -434,23 +526,19 @@ class TicketService:
         comp: Comp
     ) -> list[Ticket]:
         """Issue complimentary tickets."""
-        tickets = []
-        
-        for _ in range(quantity):
-            ticket = Ticket.objects.create(
-                ticket_code=Ticket.generate_ticket_code(),
+        issued_at = timezone.now()
+        return TicketService.bulk_create_tickets([
+            Ticket(
                 owner=to_user,
                 ticket_type=ticket_type,
                 order=None,
                 status=Ticket.Status.ISSUED,
                 is_comp=True,
                 comp=comp,
-                issued_at=timezone.now()
+                issued_at=issued_at
             )
-            tickets.append(ticket)
-        
-        return tickets
-
+            for _ in range(quantity)
+        ])
 
 class TransferService:
     """Service for ticket transfers with concurrency control."""
@@ -545,6 +633,9 @@ class TransferService:
         
         logger.info(f"Transfer accepted: {ticket.ticket_code} from {old_owner.email} to {accepting_user.email}")
         
+        # Holder changed, so the stored PDF is stale - render the new version
+        TicketPDFService.schedule_prerender([ticket])
+        
         return ticket
     
     @classmethod
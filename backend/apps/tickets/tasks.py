@@ -2,7 +2,6 @@
 Celery tasks for ticket-related async operations.
 """
 import logging
-from io import BytesIO
 from celery import shared_task
 from django.core.mail import EmailMessage
 from django.conf import settings
@@ -14,74 +13,12 @@ logger = logging.getLogger(__name__)
 @shared_task(bind=True, max_retries=3)
 def generate_invoice_pdf(self, order_id: str):
     """Generate PDF invoice for an order."""
-    from apps.tickets.models import Order, Invoice
+    from apps.tickets.models import Order
+    from apps.tickets.invoice_service import InvoiceService
     
     try:
-        order = Order.objects.select_related('buyer').prefetch_related('items__ticket_type').get(id=order_id)
-        invoice = order.invoice
-        
-        # Generate PDF using reportlab
-        from reportlab.lib import colors
-        from reportlab.lib.pagesizes import letter
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet
-        
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        # Header
-        elements.append(Paragraph("OC MENA Festival", styles['Heading1']))
-        elements.append(Paragraph(f"Invoice #{invoice.invoice_number}", styles['Heading2']))
-        elements.append(Spacer(1, 20))
-        
-        # Order info
-        elements.append(Paragraph(f"Order: {order.order_number}", styles['Normal']))
-        elements.append(Paragraph(f"Date: {order.paid_at.strftime('%B %d, %Y') if order.paid_at else 'N/A'}", styles['Normal']))
-        elements.append(Paragraph(f"Customer: {order.buyer.full_name}", styles['Normal']))
-        elements.append(Paragraph(f"Email: {order.buyer.email}", styles['Normal']))
-        elements.append(Spacer(1, 20))
-        
-        # Items table
-        data = [['Item', 'Qty', 'Unit Price', 'Total']]
-        for item in order.items.all():
-            data.append([
-                item.ticket_type.name,
-                str(item.quantity),
-                f"${item.unit_price_cents / 100:.2f}",
-                f"${item.total_cents / 100:.2f}"
-            ])
-        
-        data.append(['', '', 'Subtotal:', f"${order.subtotal_cents / 100:.2f}"])
-        data.append(['', '', 'Fees:', f"${order.fees_cents / 100:.2f}"])
-        data.append(['', '', 'Total:', f"${order.total_cents / 100:.2f}"])
-        
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        elements.append(table)
-        
-        doc.build(elements)
-        
-        # Save PDF
-        from django.utils import timezone
-        from django.core.files.base import ContentFile
-        
-        pdf_content = buffer.getvalue()
-        buffer.close()
-        
-        invoice.pdf_file.save(f"{invoice.invoice_number}.pdf", ContentFile(pdf_content))
-        invoice.generated_at = timezone.now()
-        invoice.save()
+        order = Order.objects.select_related('buyer', 'invoice').prefetch_related('items__ticket_type').get(id=order_id)
+        invoice = InvoiceService.generate_for_order(order)
         
         logger.info(f"Invoice PDF generated for order {order.order_number}")
         
@@ -92,6 +29,53 @@ def generate_invoice_pdf(self, order_id: str):
         self.retry(exc=e, countdown=60)
 
 
+@shared_task(bind=True, max_retries=3)
+def regenerate_invoice_chunk(self, job_id: str, order_ids: list, max_workers: int = 4):
+    """Regenerate invoice PDFs for one chunk of a bulk job."""
+    from apps.tickets.models import BulkJob
+    from apps.tickets.invoice_service import InvoiceService
+    
+    try:
+        job = BulkJob.objects.get(id=job_id)
+        result = InvoiceService.regenerate_chunk(order_ids, since=job.created_at, max_workers=max_workers)
+        InvoiceService.record_progress(job_id, result['processed'] + result['skipped'], result['failed'])
+        return result
+        
+    except Exception as e:
+        logger.error(f"Error regenerating invoice chunk for job {job_id}: {e}")
+        self.retry(exc=e, countdown=60)
+
+
+@shared_task
+def finish_bulk_job(results, job_id: str):
+    """Chord callback marking a bulk job finished."""
+    from apps.tickets.invoice_service import InvoiceService
+    
+    job = InvoiceService.finish_job(job_id)
+    return {'status': job.status, 'processed': job.processed_count, 'failed': job.failed_count}
+
+
+@shared_task
+def fail_bulk_job(request, exc, traceback, job_id: str):
+    """Chord errback marking a bulk job failed when a chunk gives up, so the callback never runs."""
+    from apps.tickets.invoice_service import InvoiceService
+    
+    logger.error(f"Bulk job {job_id} chunk {request.id} failed: {exc}")
+    InvoiceService.fail_job(job_id)
+
+
+def dispatch_invoice_regeneration(job_id: str, chunks: list, max_workers: int = 4):
+    """Fan chunks out to workers as a chord that finishes the job when all are done, or fails it."""
+    from celery import chord
+    
+    if not chunks:
+        return finish_bulk_job(None, job_id)
+    
+    return chord(
+        regenerate_invoice_chunk.s(job_id, chunk, max_workers) for chunk in chunks
+    )(finish_bulk_job.s(job_id).on_error(fail_bulk_job.s(job_id)))
+
+
 @shared_task(bind=True, max_retries=3)
 def send_order_confirmation_email(self, order_id: str):
     """Send order confirmation email with tickets."""
@@ -215,3 +199,59 @@ def expire_pending_transfers():
     
     logger.info(f"Expired {count} pending transfers")
     return {'expired_count': count}
+
+
+@shared_task(bind=True, max_retries=3)
+def prerender_ticket_pdfs(self, ticket_ids: list):
+    """Render and store ticket PDFs so downloads are served from storage."""
+    from apps.tickets.pdf_service import TicketPDFService
+    
+    try:
+        rendered = TicketPDFService.prerender_tickets(ticket_ids)
+        logger.info(f"Pre-rendered {rendered} ticket PDFs for {len(ticket_ids)} tickets")
+        return {'status': 'success', 'rendered': rendered}
+        
+    except Exception as e:
+        logger.error(f"Error pre-rendering ticket PDFs: {e}")
+        self.retry(exc=e, countdown=60)
+
+
+@shared_task
+def dispatch_email_outbox():
+    """Send due emails from the outbox. Also runs periodically to pick up retries."""
+    from apps.tickets.outbox_service import EmailOutboxService
+    
+    return EmailOutboxService.dispatch()
+
+
+@shared_task
+def reconcile_ticket_inventory():
+    """Correct reservation counters and free reservations of abandoned orders."""
+    from apps.tickets.inventory_service import InventoryService
+    
+    return InventoryService.reconcile()
+
+
+@shared_task
+def release_expired_seat_holds():
+    """Return seats of expired amphitheater holds to their blocks."""
+    from apps.tickets.amphitheater_services import AmphitheaterService
+    
+    return AmphitheaterService.release_expired_holds()
+
+
+@shared_task(bind=True, max_retries=5)
+def run_bulk_email_job(self, job_id: str):
+    """Send a bulk email job, resuming from its cursor on retry."""
+    from apps.tickets.bulk_email_service import BulkEmailService
+    from apps.tickets.sendgrid_client import SendGridError
+    
+    try:
+        job = BulkEmailService.run(job_id)
+        return {'status': job.status, 'processed': job.processed_count, 'failed': job.failed_count}
+        
+    except SendGridError as e:
+        if self.request.retries >= self.max_retries:
+            BulkEmailService.fail(job_id)
+            raise
+        self.retry(exc=e, countdown=e.retry_after or 60)
@@ -11,6 +11,7 @@ urlpatterns = [
     
     # Amphitheater seat availability
     path('amphitheater/seats/', amphitheater_seat_views.AmphitheaterSeatAvailabilityView.as_view(), name='amphitheater-seats'),
+    path('amphitheater/seats/layout/', amphitheater_seat_views.AmphitheaterSeatLayoutView.as_view(), name='amphitheater-seat-layout'),
     path('amphitheater/seats/initialize/', amphitheater_seat_views.InitializeSeatsView.as_view(), name='initialize-seats'),
     path('amphitheater/seats/reserve/', amphitheater_seat_views.ReserveSeatView.as_view(), name='reserve-seats'),
     
@@ -43,6 +44,8 @@ urlpatterns = [
     path('staff/upgrade/', views.StaffUpgradeView.as_view(), name='staff-upgrade'),
     path('staff/resend-tickets/', views.StaffResendTicketsView.as_view(), name='staff-resend-tickets'),
     path('staff/resend-invoice/', views.StaffResendInvoiceView.as_view(), name='staff-resend-invoice'),
+    path('staff/bulk-email/', views.StaffBulkEmailView.as_view(), name='staff-bulk-email'),
+    path('staff/jobs/<uuid:job_id>/', views.StaffBulkJobView.as_view(), name='staff-bulk-job'),
     path('staff/orders/', views.StaffOrderListView.as_view(), name='staff-orders'),
     path('staff/orders/<uuid:order_id>/', views.StaffOrderDetailView.as_view(), name='staff-order-detail'),
 ]
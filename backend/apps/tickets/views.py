@@ -14,18 +14,20 @@ from apps.accounts.models import User
 from apps.accounts.services import AuditService
 from apps.config.models import EventConfig
 
-from .models import TicketType, Order, Ticket, TicketTransfer, TicketUpgrade
+from .models import TicketType, Order, Ticket, TicketTransfer, TicketUpgrade, BulkJob
 from .serializers import (
     TicketTypeSerializer, OrderSerializer, TicketSerializer, TicketDetailSerializer,
     TicketTransferSerializer, TransferCreateSerializer, TransferAcceptSerializer,
     TicketUpgradeSerializer, UpgradeCreateSerializer,
     StaffRefundSerializer, StaffCompSerializer, StaffUpgradeSerializer,
-    ResendTicketsSerializer, ResendInvoiceSerializer
+    ResendTicketsSerializer, ResendInvoiceSerializer, BulkEmailSerializer, BulkJobSerializer
 )
 from .services import (
     QRCodeService, TransferService, UpgradeService, 
     RefundService, CompService
 )
+from .pdf_service import TicketPDFService
+from .bulk_email_service import BulkEmailService
 
 logger = logging.getLogger(__name__)
 
@@ -431,7 +433,7 @@ class StaffUpgradeView(APIView):
 
 
 class StaffResendTicketsView(APIView):
-    """Staff: Resend ticket emails."""
+    """Staff: Resend ticket emails to one order or many."""
     permission_classes = [IsStaffOrAdmin]
     
     @extend_schema(summary="Resend tickets", request=ResendTicketsSerializer)
@@ -439,24 +441,55 @@ class StaffResendTicketsView(APIView):
         serializer = ResendTicketsSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        # TODO: Implement email resend via Celery task
+        data = serializer.validated_data
+        order_ids = data.get('order_ids')
+        if data.get('ticket_id'):
+            ticket = get_object_or_404(Ticket, id=data['ticket_id'])
+            if not ticket.order_id:
+                return Response({
+                    'success': False,
+                    'error': {'message': 'Ticket has no order to resend'}
+                }, status=status.HTTP_400_BAD_REQUEST)
+            order_ids = [ticket.order_id]
+        elif data.get('order_id'):
+            order_ids = [get_object_or_404(Order, id=data['order_id']).id]
+        
+        try:
+            job = BulkEmailService.start(
+                BulkEmailService.TICKET_RESEND,
+                order_ids=order_ids,
+                created_by=request.user
+            )
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': {'message': str(e)}
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if data.get('order_id') or data.get('ticket_id'):
+            target_type = 'Order' if data.get('order_id') else 'Ticket'
+            target_id = str(data.get('order_id') or data.get('ticket_id'))
+        else:
+            target_type, target_id = 'BulkJob', str(job.id)
         
         AuditService.log(
             actor=request.user,
             action_type='RESEND_TICKET',
-            target_type='Order' if serializer.validated_data.get('order_id') else 'Ticket',
-            target_id=str(serializer.validated_data.get('order_id') or serializer.validated_data.get('ticket_id')),
+            target_type=target_type,
+            target_id=target_id,
+            metadata={'job_id': str(job.id), 'recipients': job.total_count},
             request=request
         )
         
         return Response({
             'success': True,
-            'message': 'Tickets resent successfully'
-        })
+            'message': f'Resending tickets to {job.total_count} recipient(s)',
+            'data': BulkJobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
 
 
 class StaffResendInvoiceView(APIView):
-    """Staff: Resend invoice email."""
+    """Staff: Resend invoice emails to one order or many."""
     permission_classes = [IsStaffOrAdmin]
     
     @extend_schema(summary="Resend invoice", request=ResendInvoiceSerializer)
@@ -464,21 +497,88 @@ class StaffResendInvoiceView(APIView):
         serializer = ResendInvoiceSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        order = get_object_or_404(Order, id=serializer.validated_data['order_id'])
+        data = serializer.validated_data
+        order_ids = data.get('order_ids')
+        if data.get('order_id'):
+            order_ids = [get_object_or_404(Order, id=data['order_id']).id]
         
-        # TODO: Implement invoice resend via Celery task
+        try:
+            job = BulkEmailService.start(
+                BulkEmailService.INVOICE_RESEND,
+                order_ids=order_ids,
+                created_by=request.user
+            )
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': {'message': str(e)}
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         AuditService.log(
             actor=request.user,
             action_type='RESEND_INVOICE',
-            target_type='Order',
-            target_id=str(order.id),
+            target_type='Order' if data.get('order_id') else 'BulkJob',
+            target_id=str(data.get('order_id') or job.id),
+            metadata={'job_id': str(job.id), 'recipients': job.total_count},
+            request=request
+        )
+        
+        return Response({
+            'success': True,
+            'message': f'Resending invoices to {job.total_count} recipient(s)',
+            'data': BulkJobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class StaffBulkEmailView(APIView):
+    """Staff: Send an announcement to buyers of paid orders."""
+    permission_classes = [IsStaffOrAdmin]
+    
+    @extend_schema(summary="Send announcement", request=BulkEmailSerializer, responses={202: BulkJobSerializer})
+    def post(self, request):
+        serializer = BulkEmailSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        data = serializer.validated_data
+        try:
+            job = BulkEmailService.start(
+                BulkEmailService.ANNOUNCEMENT,
+                order_ids=data.get('order_ids'),
+                subject=data['subject'],
+                message=data['message'],
+                created_by=request.user
+            )
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'error': {'message': str(e)}
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        AuditService.log(
+            actor=request.user,
+            action_type='BULK_EMAIL',
+            target_type='BulkJob',
+            target_id=str(job.id),
+            metadata={'subject': data['subject'], 'recipients': job.total_count},
             request=request
         )
         
         return Response({
             'success': True,
-            'message': 'Invoice resent successfully'
+            'data': BulkJobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class StaffBulkJobView(APIView):
+    """Staff: Bulk job progress."""
+    permission_classes = [IsStaffOrAdmin]
+    
+    @extend_schema(summary="Get bulk job progress", responses={200: BulkJobSerializer})
+    def get(self, request, job_id):
+        job = get_object_or_404(BulkJob, id=job_id)
+        return Response({
+            'success': True,
+            'data': BulkJobSerializer(job).data
         })
 
 
@@ -546,94 +646,19 @@ class TicketPDFView(APIView):
     
     @extend_schema(summary="Download ticket PDF")
     def get(self, request, ticket_id):
-        from django.http import HttpResponse
-        from io import BytesIO
-        import qrcode
-        from reportlab.lib import colors
-        from reportlab.lib.pagesizes import letter
-        from reportlab.lib.units import inch
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.enums import TA_CENTER
-        
         ticket = get_object_or_404(
-            Ticket.objects.select_related('ticket_type', 'order__buyer'),
+            Ticket.objects.select_related('ticket_type', 'order', 'owner'),
             id=ticket_id,
-            holder=request.user
+            owner=request.user
         )
         
-        # Generate QR code
-        qr_data = QRCodeService.generate_qr_data(ticket)
-        qr = qrcode.QRCode(version=1, box_size=10, border=4)
-        qr.add_data(qr_data)
-        qr.make(fit=True)
-        qr_img = qr.make_image(fill_color="black", back_color="white")
-        
-        qr_buffer = BytesIO()
-        qr_img.save(qr_buffer, format='PNG')
-        qr_buffer.seek(0)
-        
-        # Create PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle('Title', parent=styles['Heading1'], alignment=TA_CENTER, fontSize=24, spaceAfter=20)
-        subtitle_style = ParagraphStyle('Subtitle', parent=styles['Normal'], alignment=TA_CENTER, fontSize=14, textColor=colors.grey)
-        
-        # Header
-        elements.append(Paragraph("🎪 OC MENA Festival", title_style))
-        elements.append(Paragraph("Your Ticket", subtitle_style))
-        elements.append(Spacer(1, 30))
-        
-        # QR Code
-        qr_image = Image(qr_buffer, width=2.5*inch, height=2.5*inch)
-        qr_image.hAlign = 'CENTER'
-        elements.append(qr_image)
-        elements.append(Spacer(1, 20))
-        
-        # Ticket details
-        details_data = [
-            ['Ticket Type:', ticket.ticket_type.name],
-            ['Ticket Code:', ticket.ticket_code],
-            ['Valid Days:', ', '.join(ticket.ticket_type.valid_days) if ticket.ticket_type.valid_days else 'All Days'],
-            ['Holder:', ticket.holder.full_name],
-            ['Order #:', ticket.order.order_number if ticket.order else 'N/A'],
-        ]
-        
-        details_table = Table(details_data, colWidths=[2*inch, 4*inch])
-        details_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ]))
-        elements.append(details_table)
-        elements.append(Spacer(1, 30))
-        
-        # Location
-        elements.append(Paragraph("<b>Location:</b> OC Fair & Event Center", styles['Normal']))
-        elements.append(Paragraph("88 Fair Drive, Costa Mesa, CA 92626", styles['Normal']))
-        elements.append(Spacer(1, 20))
-        
-        # Footer
-        footer_style = ParagraphStyle('Footer', parent=styles['Normal'], alignment=TA_CENTER, fontSize=10, textColor=colors.grey)
-        elements.append(Paragraph("Present this QR code at the entrance for scanning", footer_style))
-        elements.append(Paragraph("This ticket is non-transferable", footer_style))
-        
-        doc.build(elements)
-        
-        # Return PDF response
-        pdf = buffer.getvalue()
-        buffer.close()
-        
-        response = HttpResponse(pdf, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="ticket-{ticket.ticket_code}.pdf"'
-        return response
+        # Served from storage when pre-rendered, rendered on demand otherwise
+        return TicketPDFService.build_response(
+            request,
+            version=TicketPDFService.ticket_version(ticket),
+            filename=f"ticket-{ticket.ticket_code}.pdf",
+            load_content=lambda: TicketPDFService.get_or_render_ticket(ticket)
+        )
 
 
 class OrderTicketsPDFView(APIView):
@@ -642,99 +667,18 @@ class OrderTicketsPDFView(APIView):
     
     @extend_schema(summary="Download all order tickets as PDF")
     def get(self, request, order_id):
-        from django.http import HttpResponse
-        from io import BytesIO
-        import qrcode
-        from reportlab.lib import colors
-        from reportlab.lib.pagesizes import letter
-        from reportlab.lib.units import inch
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.enums import TA_CENTER
+        order = get_object_or_404(Order, id=order_id, buyer=request.user)
         
-        order = get_object_or_404(
-            Order.objects.prefetch_related('tickets__ticket_type'),
-            id=order_id,
-            buyer=request.user
-        )
-        
-        tickets = order.tickets.all()
+        tickets = list(order.tickets.select_related('ticket_type', 'owner').order_by('issued_at', 'id'))
         if not tickets:
             return Response({
                 'success': False,
                 'error': {'message': 'No tickets found for this order'}
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Create PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        title_style = ParagraphStyle('Title', parent=styles['Heading1'], alignment=TA_CENTER, fontSize=24, spaceAfter=20)
-        subtitle_style = ParagraphStyle('Subtitle', parent=styles['Normal'], alignment=TA_CENTER, fontSize=14, textColor=colors.grey)
-        footer_style = ParagraphStyle('Footer', parent=styles['Normal'], alignment=TA_CENTER, fontSize=10, textColor=colors.grey)
-        
-        for idx, ticket in enumerate(tickets):
-            if idx > 0:
-                elements.append(PageBreak())
-            
-            # Generate QR code
-            qr_data = QRCodeService.generate_qr_data(ticket)
-            qr = qrcode.QRCode(version=1, box_size=10, border=4)
-            qr.add_data(qr_data)
-            qr.make(fit=True)
-            qr_img = qr.make_image(fill_color="black", back_color="white")
-            
-            qr_buffer = BytesIO()
-            qr_img.save(qr_buffer, format='PNG')
-            qr_buffer.seek(0)
-            
-            # Header
-            elements.append(Paragraph("🎪 OC MENA Festival", title_style))
-            elements.append(Paragraph(f"Ticket {idx + 1} of {len(tickets)}", subtitle_style))
-            elements.append(Spacer(1, 30))
-            
-            # QR Code
-            qr_image = Image(qr_buffer, width=2.5*inch, height=2.5*inch)
-            qr_image.hAlign = 'CENTER'
-            elements.append(qr_image)
-            elements.append(Spacer(1, 20))
-            
-            # Ticket details
-            details_data = [
-                ['Ticket Type:', ticket.ticket_type.name],
-                ['Ticket Code:', ticket.ticket_code],
-                ['Valid Days:', ', '.join(ticket.ticket_type.valid_days) if ticket.ticket_type.valid_days else 'All Days'],
-                ['Holder:', ticket.holder.full_name],
-                ['Order #:', order.order_number],
-            ]
-            
-            details_table = Table(details_data, colWidths=[2*inch, 4*inch])
-            details_table.setStyle(TableStyle([
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-                ('TOPPADDING', (0, 0), (-1, -1), 10),
-                ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-                ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ]))
-            elements.append(details_table)
-            elements.append(Spacer(1, 30))
-            
-            # Location
-            elements.append(Paragraph("<b>Location:</b> OC Fair & Event Center", styles['Normal']))
-            elements.append(Paragraph("88 Fair Drive, Costa Mesa, CA 92626", styles['Normal']))
-            elements.append(Spacer(1, 20))
-            
-            # Footer
-            elements.append(Paragraph("Present this QR code at the entrance for scanning", footer_style))
-        
-        doc.build(elements)
-        
-        pdf = buffer.getvalue()
-        buffer.close()
-        
-        response = HttpResponse(pdf, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="tickets-{order.order_number}.pdf"'
-        return response
+        return TicketPDFService.build_response(
+            request,
+            version=TicketPDFService.order_version(tickets),
+            filename=f"tickets-{order.order_number}.pdf",
+            load_content=lambda: TicketPDFService.get_or_render_order(order, tickets)
+        )
@@ -93,3 +93,26 @@ def admin_client(api_client, admin_user):
     refresh = RefreshToken.for_user(admin_user)
     api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
     return api_client
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    """Use an in-process cache instead of Redis."""
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        # Seat holds must not be evicted, even by a full simulated sale
+        'seat_holds': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'seat-holds',
+            'OPTIONS': {'MAX_ENTRIES': 100000},
+        },
+    }
+
+
+@pytest.fixture
+def memory_storage(settings):
+    """Use in-memory file storage instead of the filesystem or S3."""
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    }
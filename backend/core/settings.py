@@ -225,7 +225,22 @@ CACHES = {
             'SOCKET_TIMEOUT': 5,
             'RETRY_ON_TIMEOUT': True,
         }
-    }
+    },
+    # Amphitheater seat holds live only here (apps/tickets/seat_hold_store.py): an evicted
+    # hold loses a live hold and an evicted block index lets its seats be held twice. Its
+    # Redis must run with maxmemory-policy noeviction, so a full instance fails writes
+    # instead of dropping holds; falls back to REDIS_URL, which must then be set up the same.
+    'seat_holds': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.environ.get('SEAT_HOLDS_REDIS_URL', REDIS_URL),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'SOCKET_CONNECT_TIMEOUT': 5,
+            'SOCKET_TIMEOUT': 5,
+            'RETRY_ON_TIMEOUT': True,
+        }
+    },
 }
 
 # Celery Configuration
@@ -238,14 +253,58 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
+CELERY_BEAT_SCHEDULE = {
+    'dispatch-email-outbox': {
+        'task': 'apps.tickets.tasks.dispatch_email_outbox',
+        'schedule': 30.0,
+    },
+    'reconcile-ticket-inventory': {
+        'task': 'apps.tickets.tasks.reconcile_ticket_inventory',
+        'schedule': 60.0,
+    },
+    'requeue-stripe-events': {
+        'task': 'apps.payments.tasks.requeue_stripe_events',
+        'schedule': 60.0,
+    },
+    'release-expired-seat-holds': {
+        'task': 'apps.tickets.tasks.release_expired_seat_holds',
+        'schedule': 60.0,
+    },
+}
+
+# Order numbers and ticket codes are a permutation of a sequence keyed with this.
+# Never change it once codes have been issued, or new codes could repeat old ones.
+CODE_ALLOCATOR_KEY = os.environ.get('CODE_ALLOCATOR_KEY', SECRET_KEY)
+# Sequence values each worker reserves at a time for codes
+CODE_BLOCK_SIZE = int(os.environ.get('CODE_BLOCK_SIZE', '1000'))
+
+# Checkout waiting room: when enabled, checkout requires an admission token from the queue
+WAITING_ROOM_ENABLED = os.environ.get('WAITING_ROOM_ENABLED', 'False').lower() in ('true', '1', 'yes')
+WAITING_ROOM_CHECKOUT_BUDGET = int(os.environ.get('WAITING_ROOM_CHECKOUT_BUDGET', '100'))
+WAITING_ROOM_ADMISSION_TTL = int(os.environ.get('WAITING_ROOM_ADMISSION_TTL', '300'))
+
+# Seconds checkout responses are kept for replay to retries with the same idempotency key
+IDEMPOTENCY_RESPONSE_TTL = int(os.environ.get('IDEMPOTENCY_RESPONSE_TTL', str(60 * 60 * 24)))
 
 # Stripe
 STRIPE_SECRET_KEY = os.environ.get('STRIPE_SECRET_KEY', '')
 STRIPE_PUBLISHABLE_KEY = os.environ.get('STRIPE_PUBLISHABLE_KEY', '')
 STRIPE_WEBHOOK_SECRET = os.environ.get('STRIPE_WEBHOOK_SECRET', '')
+# Point at a local fake server (manage.py fake_stripe) for tests and benchmarks
+STRIPE_API_BASE = os.environ.get('STRIPE_API_BASE', 'https://api.stripe.com')
+# Seconds a Stripe API call may take before it is abandoned
+STRIPE_REQUEST_TIMEOUT = int(os.environ.get('STRIPE_REQUEST_TIMEOUT', '30'))
+# Seconds a checkout holds its idempotency key's lock: its Stripe call plus the rest of the request
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.environ.get('IDEMPOTENCY_LOCK_TIMEOUT', str(STRIPE_REQUEST_TIMEOUT + 30)))
+# Webhook events are processed on stripe-events-0..N-1 queues, partitioned by order,
+# so one order's events run in order while different orders run in parallel.
+# Run each queue with a single-process worker (-c 1). 0 uses the default queue.
+STRIPE_EVENT_QUEUE_PARTITIONS = int(os.environ.get('STRIPE_EVENT_QUEUE_PARTITIONS', '0'))
 
 # Email (SendGrid)
 SENDGRID_API_KEY = os.environ.get('SENDGRID_API_KEY', '')
+# Point at a local fake server (manage.py fake_sendgrid) for tests and benchmarks
+SENDGRID_API_URL = os.environ.get('SENDGRID_API_URL', 'https://api.sendgrid.com')
 
 if SENDGRID_API_KEY:
     EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -260,6 +319,15 @@ else:
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'noreply@ocmenafestival.com')
 ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL', 'admin@ocmenafestival.com')
 
+# Email outbox delivery: concurrent sends per dispatcher and sends/second per provider
+EMAIL_OUTBOX_MAX_WORKERS = int(os.environ.get('EMAIL_OUTBOX_MAX_WORKERS', '4'))
+EMAIL_OUTBOX_RATE_LIMITS = {
+    'sendgrid': int(os.environ.get('SENDGRID_RATE_LIMIT', '10')),
+}
+
+# Sold counter slots per ticket type; more slots = less row contention when finalizing orders
+TICKET_SOLD_COUNTER_SLOTS = int(os.environ.get('TICKET_SOLD_COUNTER_SLOTS', '16'))
+
 # AWS S3 / Cloudflare R2 Storage
 if os.environ.get('AWS_ACCESS_KEY_ID') and ENVIRONMENT == 'production':
     DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
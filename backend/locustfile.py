@@ -7,9 +7,16 @@ Scenarios:
 1. High read traffic (ticket types, schedule, config)
 2. Scan traffic (validate + commit)
 3. Checkout bursts
+4. Checkout to ticket against the fake Stripe API (set FAKE_STRIPE_URL)
+
+For 4, run `python manage.py fake_stripe` and start the API and a Celery worker with
+STRIPE_API_BASE=http://127.0.0.1:12111 STRIPE_SECRET_KEY=sk_test_fake STRIPE_WEBHOOK_SECRET=whsec_fake.
 """
 import json
+import os
 import random
+import time
+import uuid
 from locust import HttpUser, task, between, events
 from locust.exception import RescheduleTask
 
@@ -143,8 +150,9 @@ class CheckoutUser(HttpUser):
         self.ticket_type_id = None
         
         # Register
+        self.email = f"checkout_{random.randint(1, 1000000)}@test.com"
         response = self.client.post("/api/auth/register/", json={
-            "email": f"checkout_{random.randint(1, 1000000)}@test.com",
+            "email": self.email,
             "password": "TestPass123!",
             "confirm_password": "TestPass123!",
             "full_name": "Checkout User"
@@ -186,6 +194,105 @@ class CheckoutUser(HttpUser):
         # Don't actually complete payment in load test
 
 
+FAKE_STRIPE_URL = os.environ.get('FAKE_STRIPE_URL', '')
+# How long to wait for the webhook to turn a payment into tickets
+PIPELINE_TIMEOUT = float(os.environ.get('PIPELINE_TIMEOUT', '30'))
+
+
+class PaidCheckoutUser(CheckoutUser):
+    """
+    Pays for orders through the fake Stripe API and waits for the webhook to
+    issue tickets. Reports the end-to-end time as "checkout-to-ticket".
+    """
+    abstract = not FAKE_STRIPE_URL
+    weight = 2
+    
+    def wait_for_paid(self, order_id, started, name):
+        """Poll the order until the webhook has finalized it."""
+        while time.perf_counter() - started < PIPELINE_TIMEOUT:
+            response = self.client.get(
+                f"/api/payments/orders/{order_id}/",
+                headers=self.headers,
+                name="/api/payments/orders/[id]/"
+            )
+            if response.status_code == 200 and response.json()['data']['status'] == 'PAID':
+                exception = None
+                break
+            time.sleep(0.5)
+        else:
+            exception = TimeoutError(f"Order {order_id} not paid after {PIPELINE_TIMEOUT}s")
+        
+        self.environment.events.request.fire(
+            request_type="PIPELINE",
+            name=name,
+            response_time=(time.perf_counter() - started) * 1000,
+            response_length=0,
+            exception=exception,
+            context={}
+        )
+    
+    @task(3)
+    def attempt_checkout(self):
+        """Create a payment intent, confirm it at Stripe and wait for tickets."""
+        if not self.token or not self.ticket_type_id:
+            raise RescheduleTask()
+        
+        started = time.perf_counter()
+        response = self.client.post(
+            "/api/payments/checkout/create-intent/",
+            json={
+                "items": [{"ticket_type_id": self.ticket_type_id, "quantity": 1}],
+                "idempotency_key": f"loadtest-{uuid.uuid4().hex}"
+            },
+            headers=self.headers
+        )
+        if response.status_code != 200:
+            return
+        data = response.json()['data']
+        
+        response = self.client.post(
+            f"{FAKE_STRIPE_URL}/v1/payment_intents/{data['payment_intent_id']}/confirm",
+            headers={"Authorization": "Bearer sk_test_fake"},
+            name="stripe: confirm payment intent"
+        )
+        if response.status_code != 200:
+            # Declined or injected failure; the payment_failed webhook still runs
+            return
+        
+        self.wait_for_paid(data['order_id'], started, "checkout-to-ticket")
+    
+    @task(1)
+    def hosted_checkout(self):
+        """Pay through a Checkout Session and wait for tickets."""
+        if not self.token or not self.ticket_type_id:
+            raise RescheduleTask()
+        
+        started = time.perf_counter()
+        response = self.client.post(
+            "/api/payments/checkout/create-session/",
+            json={
+                "email": self.email,
+                "firstName": "Load",
+                "lastName": "Test",
+                "items": [{"ticket_type_id": self.ticket_type_id, "quantity": 1, "price": 1}],
+                "idempotency_key": f"loadtest-{uuid.uuid4().hex}"
+            },
+            headers=self.headers
+        )
+        if response.status_code != 200:
+            return
+        data = response.json()['data']
+        
+        response = self.client.post(
+            f"{FAKE_STRIPE_URL}/_fake/checkout/sessions/{data['session_id']}/complete",
+            name="stripe: complete checkout session"
+        )
+        if response.status_code != 200:
+            return
+        
+        self.wait_for_paid(data['order_id'], started, "hosted-checkout-to-ticket")
+
+
 # Custom event hooks for logging
 @events.request.add_listener
 def on_request(request_type, name, response_time, response_length, exception, **kwargs):
@@ -16,7 +16,9 @@ from django.db import transaction
 
 # Try to import amphitheater models - they may not exist on first deployment
 try:
-    from apps.tickets.amphitheater_models import Venue, Section, SeatBlock
+    from apps.tickets.amphitheater_models import Venue, Section
+    from apps.tickets.amphitheater_services import AmphitheaterService
+    from apps.tickets.seat_map_service import SeatMapService
     AMPHITHEATER_AVAILABLE = True
 except (ImportError, Exception) as e:
     print(f'⚠️  Amphitheater models not available yet: {e}')
@@ -111,26 +113,14 @@ def setup_amphitheater():
             },
         ]
         
-        sections_created = 0
-        for section_data in sections_data:
-            section, created = Section.objects.get_or_create(
-                venue=venue,
-                name=section_data['name'],
-                defaults={
-                    'section_type': section_data['section_type'],
-                    'capacity': section_data['capacity'],
-                    'base_price_cents': section_data['base_price_cents'],
-                    'display_order': section_data['display_order'],
-                    'color': section_data['color'],
-                    'is_active': True,
-                }
-            )
-            if created:
-                sections_created += 1
-                print(f'  ✓ Created section: {section.name} (${section_data["base_price_cents"]/100:.0f})')
+        _, created_sections = AmphitheaterService.bulk_create_sections(venue, [
+            dict(section_data, is_active=True) for section_data in sections_data
+        ])
+        for section in created_sections:
+            print(f'  ✓ Created section: {section.name} (${section.base_price_cents/100:.0f})')
         
-        if sections_created > 0:
-            print(f'✓ Created {sections_created} sections')
+        if created_sections:
+            print(f'✓ Created {len(created_sections)} sections')
         else:
             print('✓ All sections already exist')
         
@@ -142,31 +132,19 @@ def setup_amphitheater():
             date(2026, 6, 21),  # Saturday
         ]
         
-        blocks_created = 0
-        for section in Section.objects.filter(venue=venue, is_active=True):
-            for event_date in event_dates:
-                block, created = SeatBlock.objects.get_or_create(
-                    section=section,
-                    event_date=event_date,
-                    row_start='A',
-                    row_end='Z',
-                    defaults={
-                        'seat_start': 1,
-                        'seat_end': 50,
-                        'total_seats': section.capacity,
-                        'available_seats': section.capacity,
-                        'price_cents': section.base_price_cents,
-                        'is_active': True,
-                    }
-                )
-                if created:
-                    blocks_created += 1
+        blocks_created = len(AmphitheaterService.bulk_create_seat_blocks(
+            list(Section.objects.filter(venue=venue, is_active=True)),
+            event_dates
+        ))
         
         if blocks_created > 0:
             print(f'✓ Created {blocks_created} seat blocks for {len(event_dates)} event dates')
         else:
             print('✓ All seat blocks already exist')
         
+        seats_created = SeatMapService.initialize_seats()
+        print(f'✓ Seat map: {seats_created} new seats')
+        
         print('✅ Pacific Amphitheatre setup complete!')
         print(f'   Total capacity: {venue.capacity:,} seats')
         print(f'   Sections: {Section.objects.filter(venue=venue).count()}')
@@ -0,0 +1,608 @@
+"""
+Tests for amphitheater seat allocation.
+"""
+import base64
+import io
+import json
+import time
+import uuid
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from django.contrib import admin
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.tickets.amphitheater_admin import SeatBlockAdmin
+from apps.tickets.amphitheater_models import Venue, Section, SeatBlock, SeatHold, AmphitheaterTicket
+from apps.tickets.amphitheater_services import AmphitheaterService
+from apps.tickets.models import AmphitheaterSeat, Order, OrderItem, Ticket, TicketType
+from apps.tickets.seat_hold_store import SeatHoldStore, SeatHoldStoreUnavailable
+from apps.tickets.services import TicketService
+from apps.tickets.seat_map_service import SEAT_SECTIONS, SeatMapService
+from apps.tickets.seat_allocator import best_available
+from apps.tickets.seat_bitmap import SeatBitmap, row_labels
+
+EVENT_DATE = date(2026, 6, 19)
+
+
+@pytest.fixture
+def section(db):
+    venue = Venue.objects.create(name='Pacific Amphitheatre', address='Costa Mesa', capacity=8000)
+    return Section.objects.create(
+        venue=venue,
+        name='Section 1',
+        section_type=Section.SectionType.ORCHESTRA,
+        capacity=30,
+        base_price_cents=19900
+    )
+
+
+@pytest.fixture
+def seat_block(section):
+    return SeatBlock.objects.create(
+        section=section,
+        event_date=EVENT_DATE,
+        row_start='A',
+        row_end='C',
+        seat_start=1,
+        seat_end=10,
+        total_seats=30,
+        available_seats=30,
+        price_cents=19900
+    )
+
+
+@pytest.fixture
+def empty_cache(locmem_cache):
+    from django.core.cache import caches
+    caches['default'].clear()
+    caches['seat_holds'].clear()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Move time.time() forward, which the hold store and locmem cache both expire by."""
+    offset = [0]
+    real_time = time.time
+    monkeypatch.setattr(time, 'time', lambda: real_time() + offset[0])
+
+    def advance(minutes):
+        offset[0] += minutes * 60
+    return advance
+
+
+def hold(section, quantity, user):
+    result = AmphitheaterService.create_seat_hold(str(section.id), EVENT_DATE, quantity, user=user)
+    assert result['success'], result
+    return result
+
+
+def test_row_labels():
+    assert row_labels('A', 'C') == ['A', 'B', 'C']
+    assert row_labels('Y', 'AB') == ['Y', 'Z', 'AA', 'AB']
+    assert row_labels('1', '3') == ['1', '2', '3']
+
+
+class TestSeatBitmap:
+    """Test finding free seats in the occupancy bitmap."""
+
+    def bitmap(self):
+        return SeatBitmap(['A', 'B'], 1, 5)
+
+    def test_runs_do_not_span_rows(self):
+        bitmap = self.bitmap()
+        bitmap.mark([{'row': 'A', 'seat': 1}])
+
+        assert bitmap.find(4) == [{'row': 'A', 'seat': seat} for seat in range(2, 6)]
+        bitmap.mark([{'row': 'A', 'seat': 3}])
+        assert bitmap.find(3) == [{'row': 'B', 'seat': seat} for seat in range(1, 4)]
+
+    def test_falls_back_to_scattered_seats(self):
+        bitmap = self.bitmap()
+        bitmap.mark([{'row': row, 'seat': seat} for row in 'AB' for seat in (2, 4)])
+
+        assert bitmap.find(3) == [{'row': 'A', 'seat': 1}, {'row': 'A', 'seat': 3}, {'row': 'A', 'seat': 5}]
+        assert bitmap.find(7) == []
+
+    def test_round_trips_through_bytes(self):
+        bitmap = self.bitmap()
+        bitmap.mark([{'row': 'B', 'seat': 5}])
+
+        restored = SeatBitmap(['A', 'B'], 1, 5, int.from_bytes(bitmap.to_bytes(), 'little'))
+
+        assert restored.occupied_count == 1
+        assert restored.find_run(5) == 0
+
+
+class TestBestAvailable:
+    """Test scoring placements in the best-available engine."""
+
+    def test_prefers_front_center(self):
+        bitmap = SeatBitmap(['A', 'B', 'C'], 1, 9)
+
+        assert best_available(bitmap, 3) == [{'row': 'A', 'seat': seat} for seat in (4, 5, 6)]
+
+    def test_avoids_orphaning_a_seat(self):
+        bitmap = SeatBitmap(['A'], 1, 10)
+        bitmap.mark([{'row': 'A', 'seat': seat} for seat in (1, 2, 3, 8, 9, 10)])
+
+        # Seats 4-6 or 5-7 would leave a single seat nobody can sit next to
+        assert best_available(bitmap, 4) == [{'row': 'A', 'seat': seat} for seat in range(4, 8)]
+        assert best_available(bitmap, 2) in (
+            [{'row': 'A', 'seat': 4}, {'row': 'A', 'seat': 5}],
+            [{'row': 'A', 'seat': 6}, {'row': 'A', 'seat': 7}],
+        )
+
+    def test_splits_group_only_when_no_row_fits(self):
+        bitmap = SeatBitmap(['A', 'B'], 1, 4)
+        bitmap.mark([{'row': 'A', 'seat': 1}, {'row': 'B', 'seat': 4}])
+
+        assert len(best_available(bitmap, 3)) == 3
+        assert len(best_available(bitmap, 6)) == 6
+        assert best_available(bitmap, 7) == []
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('empty_cache')
+class TestSeatAllocation:
+    """Test seat holds against the occupancy bitmap."""
+
+    def test_holds_get_adjacent_distinct_seats(self, seat_block, section, attendee_user):
+        first = hold(section, 4, attendee_user)
+        second = hold(section, 4, attendee_user)
+
+        assert first['seats'] == [{'row': 'A', 'seat': seat} for seat in range(4, 8)]
+        assert len({seat['row'] for seat in second['seats']}) == 1
+        assert not {(s['row'], s['seat']) for s in first['seats']} & {(s['row'], s['seat']) for s in second['seats']}
+        assert sum(entry['quantity'] for entry in SeatHoldStore.block_holds(seat_block.id).values()) == 8
+
+    def test_fills_rows_past_the_first(self, seat_block, section, attendee_user):
+        for _ in range(5):
+            hold(section, 5, attendee_user)
+
+        assert {seat['row'] for seat in hold(section, 5, attendee_user)['seats']} == {'C'}
+
+    def test_released_seats_are_reused(self, seat_block, section, attendee_user):
+        first = hold(section, 4, attendee_user)
+        AmphitheaterService.release_hold(first['hold_id'])
+
+        assert hold(section, 4, attendee_user)['seats'] == first['seats']
+
+    def test_bitmap_built_from_existing_holds(self, seat_block, section, attendee_user):
+        SeatHold.objects.create(
+            seat_block=seat_block,
+            user=attendee_user,
+            session_key='legacy',
+            quantity=2,
+            allocated_seats=[{'row': 'A', 'seat': 1}, {'row': 'A', 'seat': 2}],
+            expires_at=timezone.now() + timedelta(minutes=10)
+        )
+
+        seats = hold(section, 2, attendee_user)['seats']
+        assert not {('A', 1), ('A', 2)} & {(seat['row'], seat['seat']) for seat in seats}
+
+    def test_moves_on_to_next_block(self, seat_block, section, attendee_user):
+        second = SeatBlock.objects.create(
+            section=section, event_date=EVENT_DATE, row_start='D', row_end='E',
+            seat_start=1, seat_end=10, total_seats=20, available_seats=20, price_cents=19900
+        )
+        rows = {seat['row'] for _ in range(7) for seat in hold(section, 4, attendee_user)['seats']}
+        assert rows <= {'A', 'B', 'C'}
+
+        assert {seat['row'] for seat in hold(section, 4, attendee_user)['seats']} <= {'D', 'E'}
+        assert len(SeatHoldStore.block_holds(second.id)) == 1
+
+    def test_allocation_cost_independent_of_holds(self, seat_block, section, attendee_user):
+        hold(section, 1, attendee_user)
+        with CaptureQueriesContext(connection) as few:
+            hold(section, 1, attendee_user)
+
+        for _ in range(10):
+            hold(section, 2, attendee_user)
+        with CaptureQueriesContext(connection) as many:
+            hold(section, 1, attendee_user)
+
+        assert len(many) == len(few)
+
+
+@pytest.mark.usefixtures('empty_cache')
+class TestSectionSnapshot:
+    """Test the cached section availability behind the venue map."""
+
+    def test_sections_loaded_in_two_queries(self, seat_block, section):
+        SeatBlock.objects.create(
+            section=section, event_date=EVENT_DATE, row_start='D', row_end='D',
+            seat_start=1, seat_end=10, total_seats=10, available_seats=4, price_cents=14900
+        )
+        with CaptureQueriesContext(connection) as queries:
+            sections = AmphitheaterService.get_venue_sections(str(section.venue_id), EVENT_DATE)
+
+        assert len(queries) == 2
+        assert sections[0]['available'] == 34
+        assert sections[0]['total_capacity'] == 40
+        assert sections[0]['price_cents'] == 14900
+
+    def test_snapshot_served_without_queries(self, seat_block, section):
+        venue_id = str(section.venue_id)
+        AmphitheaterService.get_section_snapshot(venue_id, EVENT_DATE)
+
+        with CaptureQueriesContext(connection) as queries:
+            sections, cached = AmphitheaterService.get_section_snapshot(venue_id, EVENT_DATE)
+
+        assert cached
+        assert len(queries) == 0
+        assert sections[0]['available'] == 30
+
+    def test_snapshot_counts_live_holds(self, seat_block, section, attendee_user):
+        venue_id = str(section.venue_id)
+        AmphitheaterService.get_section_snapshot(venue_id, EVENT_DATE)
+        hold(section, 4, attendee_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            sections, cached = AmphitheaterService.get_section_snapshot(venue_id, EVENT_DATE)
+
+        assert cached
+        assert len(queries) == 0
+        assert sections[0]['available'] == 26
+
+    def test_blocks_created_after_snapshot_is_cached(self, section, attendee_user, django_capture_on_commit_callbacks):
+        venue_id = str(section.venue_id)
+        assert AmphitheaterService.get_section_snapshot(venue_id, EVENT_DATE)[0][0]['available'] == 0
+        assert not AmphitheaterService.check_availability(str(section.id), EVENT_DATE, 2)['available']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            AmphitheaterService.bulk_create_seat_blocks([section], [EVENT_DATE], row_end='C', seat_end=10)
+
+        sections, cached = AmphitheaterService.get_section_snapshot(venue_id, EVENT_DATE)
+        assert not cached
+        assert sections[0]['available'] == 30
+        hold(section, 2, attendee_user)
+
+    def test_admin_block_edit_invalidates_snapshot(self, seat_block, section, rf, django_capture_on_commit_callbacks):
+        venue_id = str(section.venue_id)
+        AmphitheaterService.get_section_snapshot(venue_id, EVENT_DATE)
+        seat_block.is_active = False
+
+        with django_capture_on_commit_callbacks(execute=True):
+            SeatBlockAdmin(SeatBlock, admin.site).save_model(rf.post('/'), seat_block, None, True)
+
+        sections, cached = AmphitheaterService.get_section_snapshot(venue_id, EVENT_DATE)
+        assert not cached
+        assert sections[0]['available'] == 0
+
+    def test_admin_shows_seats_held_in_store(self, seat_block, section, attendee_user, user_factory, client):
+        hold(section, 2, attendee_user)
+        client.force_login(user_factory(email='owner@example.com', is_staff=True, is_superuser=True))
+
+        assert SeatBlockAdmin(SeatBlock, admin.site).held(seat_block) == 2
+        response = client.get(reverse('admin:tickets_seatblock_changelist'))
+        assert response.status_code == 200
+        assert response.context['cl'].result_list[0].store_held == 2
+
+
+def legacy_hold(seat_block, quantity, minutes):
+    """A SeatHold row as holds were stored before the hold store, expiring in `minutes`."""
+    seat_block.available_seats -= quantity
+    seat_block.held_seats += quantity
+    seat_block.save()
+    return SeatHold.objects.create(
+        seat_block=seat_block,
+        session_key='legacy',
+        quantity=quantity,
+        allocated_seats=[],
+        expires_at=timezone.now() + timedelta(minutes=minutes)
+    )
+
+
+@pytest.mark.usefixtures('empty_cache')
+class TestHoldStore:
+    """Test holds kept in the hold store and expiring on their own."""
+
+    def test_holds_not_written_to_database(self, seat_block, section, attendee_user):
+        result = hold(section, 4, attendee_user)
+
+        assert not SeatHold.objects.exists()
+        seat_block.refresh_from_db()
+        assert (seat_block.available_seats, seat_block.held_seats) == (30, 0)
+        assert AmphitheaterService.get_hold(result['hold_id'])['seats'] == result['seats']
+
+    def test_expired_holds_free_seats_immediately(self, seat_block, section, attendee_user, clock):
+        first = hold(section, 10, attendee_user)
+        clock(5)
+        hold(section, 10, attendee_user)
+        hold(section, 10, attendee_user)
+        assert not AmphitheaterService.check_availability(str(section.id), EVENT_DATE, 4)['available']
+
+        clock(6)
+        assert AmphitheaterService.get_hold(first['hold_id']) is None
+        assert AmphitheaterService.check_availability(str(section.id), EVENT_DATE, 4)['available']
+        assert AmphitheaterService.get_venue_sections(str(section.venue_id), EVENT_DATE)[0]['available'] == 10
+
+    def test_hold_reuses_seats_of_expired_holds(self, seat_block, section, attendee_user, clock):
+        expired = hold(section, 10, attendee_user)
+        clock(5)
+        hold(section, 10, attendee_user)
+        hold(section, 10, attendee_user)
+        clock(6)
+
+        seats = hold(section, 4, attendee_user)['seats']
+
+        assert {(seat['row'], seat['seat']) for seat in seats} <= {(seat['row'], seat['seat']) for seat in expired['seats']}
+        assert len(SeatHoldStore.block_holds(seat_block.id)) == 3
+
+    def test_availability_read_without_queries(self, seat_block, section, attendee_user):
+        AmphitheaterService.check_availability(str(section.id), EVENT_DATE, 4)
+        hold(section, 28, attendee_user)
+
+        with CaptureQueriesContext(connection) as queries:
+            result = AmphitheaterService.check_availability(str(section.id), EVENT_DATE, 4)
+
+        assert not result['available']
+        assert len(queries) == 0
+
+    def test_release_expired_legacy_holds(self, seat_block):
+        legacy_hold(seat_block, 4, minutes=-1)
+        legacy_hold(seat_block, 2, minutes=-1)
+        live = legacy_hold(seat_block, 3, minutes=10)
+
+        assert AmphitheaterService.release_expired_holds() == {'blocks': 1, 'seats': 6}
+
+        seat_block.refresh_from_db()
+        assert (seat_block.available_seats, seat_block.held_seats) == (27, 3)
+        assert list(SeatHold.objects.filter(is_active=True).values_list('id', flat=True)) == [live.id]
+        assert AmphitheaterService.release_expired_holds() == {'blocks': 0, 'seats': 0}
+
+    def test_release_legacy_hold(self, seat_block):
+        legacy = legacy_hold(seat_block, 4, minutes=10)
+
+        assert AmphitheaterService.release_hold(legacy.id)
+
+        seat_block.refresh_from_db()
+        assert (seat_block.available_seats, seat_block.held_seats) == (30, 0)
+        assert not SeatHold.objects.get(id=legacy.id).is_active
+
+
+@pytest.fixture
+def order(db, attendee_user):
+    return Order.objects.create(
+        order_number='OCM-AMPH-001',
+        buyer=attendee_user,
+        idempotency_key='amph-idem',
+        status=Order.Status.PAID,
+    )
+
+
+@pytest.fixture
+def ticket_type(db):
+    return TicketType.objects.create(name='Amphitheater Reserved Seating', slug='amphitheater-reserved', price_cents=19900)
+
+
+@pytest.mark.usefixtures('empty_cache')
+class TestHoldConversion:
+    """Test converting all seat holds of an order to tickets at once."""
+
+    def convert(self, hold_ids, order, ticket_type, callbacks):
+        with callbacks(execute=True):
+            return AmphitheaterService.convert_holds_to_tickets(hold_ids, order, ticket_type)
+
+    def test_converts_holds_in_bulk(self, seat_block, section, attendee_user, order, ticket_type, django_capture_on_commit_callbacks):
+        holds = [hold(section, 2, attendee_user), hold(section, 3, attendee_user)]
+        legacy = legacy_hold(seat_block, 1, minutes=10)
+        legacy.allocated_seats = [{'row': 'C', 'seat': 1}]
+        legacy.save()
+
+        tickets = self.convert(
+            [result['hold_id'] for result in holds] + [legacy.id], order, ticket_type, django_capture_on_commit_callbacks
+        )
+
+        assert len(tickets) == 6
+        codes = Ticket.objects.filter(order=order).values_list('ticket_code', flat=True)
+        assert len(codes) == 12 and all(codes) and len(set(codes)) == 12
+        assert all(ticket.festival_day_ticket.is_comp for ticket in tickets)
+        seat_block.refresh_from_db()
+        assert (seat_block.available_seats, seat_block.held_seats, seat_block.sold_seats) == (24, 0, 6)
+        assert SeatBitmap.from_block(seat_block).occupied_count == 6
+        assert not SeatHold.objects.filter(is_active=True).exists()
+        assert SeatHold.objects.count() == 3
+        assert SeatHoldStore.block_holds(seat_block.id) == {}
+
+    def test_queries_independent_of_hold_count(self, seat_block, section, attendee_user, order, ticket_type, django_capture_on_commit_callbacks):
+        first = hold(section, 1, attendee_user)
+        self.convert([first['hold_id']], order, ticket_type, django_capture_on_commit_callbacks)
+
+        one = hold(section, 1, attendee_user)
+        with CaptureQueriesContext(connection) as few:
+            self.convert([one['hold_id']], order, ticket_type, django_capture_on_commit_callbacks)
+
+        many = [hold(section, 2, attendee_user)['hold_id'] for _ in range(5)]
+        with CaptureQueriesContext(connection) as more:
+            self.convert(many, order, ticket_type, django_capture_on_commit_callbacks)
+
+        assert len(more) == len(few)
+
+    def test_skips_expired_and_converted_holds(self, seat_block, section, attendee_user, order, ticket_type, clock, django_capture_on_commit_callbacks):
+        expired = hold(section, 2, attendee_user)
+        clock(11)
+        converted = hold(section, 2, attendee_user)
+        assert len(self.convert([converted['hold_id']], order, ticket_type, django_capture_on_commit_callbacks)) == 2
+
+        assert self.convert(
+            [expired['hold_id'], converted['hold_id']], order, ticket_type, django_capture_on_commit_callbacks
+        ) == []
+        seat_block.refresh_from_db()
+        assert (seat_block.available_seats, seat_block.sold_seats) == (28, 2)
+
+    def test_conflicting_hold_does_not_block_the_others(self, seat_block, section, attendee_user, order, ticket_type, django_capture_on_commit_callbacks):
+        first, second = hold(section, 2, attendee_user), hold(section, 2, attendee_user)
+        # One of the second hold's seats was ticketed behind the hold store's back
+        seat = second['seats'][0]
+        AmphitheaterTicket.objects.create(
+            festival_ticket=Ticket.objects.create(ticket_type=ticket_type, owner=attendee_user, order=order),
+            seat_block=seat_block,
+            row=seat['row'],
+            seat_number=seat['seat'],
+            event_date=EVENT_DATE,
+            price_paid_cents=0,
+        )
+
+        tickets = self.convert(
+            [first['hold_id'], second['hold_id']], order, ticket_type, django_capture_on_commit_callbacks
+        )
+
+        assert [{'row': t.row, 'seat': t.seat_number} for t in tickets] == first['seats']
+        assert list(SeatHold.objects.values_list('id', flat=True)) == [uuid.UUID(first['hold_id'])]
+        seat_block.refresh_from_db()
+        assert seat_block.sold_seats == 2
+
+    def test_order_holds_converted_in_one_call(self, seat_block, section, attendee_user, order, ticket_type, django_capture_on_commit_callbacks):
+        holds = [hold(section, 2, attendee_user), hold(section, 1, attendee_user)]
+        for quantity in (2, 1, 1):
+            OrderItem.objects.create(order=order, ticket_type=None, quantity=quantity, unit_price_cents=19900, total_cents=19900 * quantity)
+        order._amphitheater_items = [
+            {'holdIds': [holds[0]['hold_id']], 'price': 199},
+            {'holdIds': [holds[1]['hold_id']], 'price': 199},
+            {'section': 'Lawn', 'price': 99},
+        ]
+
+        with patch.object(
+            AmphitheaterService, 'convert_holds_to_tickets', wraps=AmphitheaterService.convert_holds_to_tickets
+        ) as convert, django_capture_on_commit_callbacks(execute=True):
+            tickets = TicketService.issue_tickets_for_order(order)
+
+        convert.assert_called_once()
+        assert convert.call_args.kwargs['hold_ids'] == [holds[0]['hold_id'], holds[1]['hold_id']]
+        # Three seats plus one basic ticket with its festival access pass
+        assert len(tickets) == 5
+        assert Ticket.objects.filter(order=order, ticket_type=None).count() == 1
+
+    def test_store_outage_fails_ticket_issuing(self, order, ticket_type):
+        OrderItem.objects.create(order=order, ticket_type=None, quantity=1, unit_price_cents=19900, total_cents=19900)
+        order._amphitheater_items = [{'holdIds': ['hold-1'], 'price': 199}]
+
+        # Left to fail finalize_order, so the payment event is retried
+        with patch.object(SeatHoldStore, 'get_many', side_effect=SeatHoldStoreUnavailable('down')):
+            with pytest.raises(SeatHoldStoreUnavailable):
+                TicketService.issue_tickets_for_order(order)
+
+
+class TestSeatMap:
+    """Test the compact, versioned seat availability endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def seats(self, db, empty_cache):
+        AmphitheaterSeat.objects.bulk_create(
+            AmphitheaterSeat(section_id='1', section_name='Section 1', row=row, seat_number=number, price_cents=19900)
+            for row in 'AB' for number in range(1, 4)
+        )
+        # Settled well before the changes made in the tests
+        AmphitheaterSeat.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+    def reserve(self, row, number, minutes=5):
+        AmphitheaterSeat.objects.filter(row=row, seat_number=number).update(
+            is_available=False,
+            reserved_until=timezone.now() + timedelta(minutes=minutes),
+            updated_at=timezone.now()
+        )
+
+    def test_lapsed_reservations_are_free_without_writes(self, api_client):
+        self.reserve('A', 1)
+        self.reserve('A', 2, minutes=-1)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(reverse('tickets:amphitheater-seats'))
+
+        assert not [query for query in queries if query['sql'].startswith('UPDATE')]
+        available = {(seat['row'], seat['seat_number']): seat['is_available'] for seat in response.data['data']}
+        assert available[('A', 1)] is False
+        assert available[('A', 2)] is True
+
+    def test_compact_bits_follow_layout(self, api_client):
+        self.reserve('B', 2)
+
+        layout = api_client.get(reverse('tickets:amphitheater-seat-layout')).data['data']
+        data = api_client.get(reverse('tickets:amphitheater-seats'), {'compact': 'true'}).data['data']
+
+        assert data['layout_version'] == layout['layout_version']
+        seats = [(row['row'], number) for row in layout['sections'][0]['rows'] for number in row['seats']]
+        bits = int.from_bytes(base64.b64decode(data['sections']['1']['bits']), 'little')
+        assert [seat for index, seat in enumerate(seats) if not bits >> index & 1] == [('B', 2)]
+        assert data['sections']['1']['available'] == 5
+
+    def test_not_modified_until_a_seat_changes(self, api_client):
+        url = reverse('tickets:amphitheater-seats')
+        etag = api_client.get(url, {'compact': 'true'})['ETag']
+
+        assert api_client.get(url, {'compact': 'true'}, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        self.reserve('A', 3)
+        response = api_client.get(url, {'compact': 'true'}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    def test_not_modified_only_once_version_settles(self, api_client):
+        url = reverse('tickets:amphitheater-seats')
+        self.reserve('A', 3)
+        etag = api_client.get(url, {'compact': 'true'})['ETag']
+
+        # A write stamped earlier could still commit without moving the version
+        assert api_client.get(url, {'compact': 'true'}, HTTP_IF_NONE_MATCH=etag).status_code == 200
+        later = timezone.now() + SeatMapService.DELTA_OVERLAP
+        with patch('apps.tickets.seat_map_service.timezone.now', return_value=later):
+            assert api_client.get(url, {'compact': 'true'}, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_changes_since_version(self, api_client):
+        url = reverse('tickets:amphitheater-seats')
+        AmphitheaterSeat.objects.filter(row='B').update(updated_at=timezone.now() - timedelta(hours=2))
+        version = api_client.get(url, {'compact': 'true'}).data['data']['version']
+        self.reserve('A', 3)
+
+        data = api_client.get(url, {'since': version}).data['data']
+
+        assert data['version'] > version
+        # Row A was last written at `version`, inside the overlap, so it is resent
+        changes = {(change['row'], change['seat_number']): change['is_available'] for change in data['changes']}
+        assert changes == {('A', 1): True, ('A', 2): True, ('A', 3): False}
+        assert api_client.get(url, {'since': 'yesterday'}).status_code == 400
+
+
+class TestSeatInitialization:
+    """Test bulk loading of the seat map and venue setup."""
+
+    def test_initialize_seats_in_bulk(self, db, locmem_cache):
+        created = SeatMapService.initialize_seats()
+
+        assert created == AmphitheaterSeat.objects.count() > 8000
+        assert AmphitheaterSeat.objects.filter(section_id='pit', row='GA').count() == 200
+        with CaptureQueriesContext(connection) as queries:
+            assert SeatMapService.initialize_seats() == 0
+        assert len(queries) == 1
+
+    def test_initialize_seats_fills_gaps(self, db, locmem_cache):
+        SeatMapService.initialize_seats(SEAT_SECTIONS[:2])
+        AmphitheaterSeat.objects.filter(section_id='circle', row='A').delete()
+
+        assert SeatMapService.initialize_seats(SEAT_SECTIONS[:2]) == 35
+
+    def test_setup_amphitheater_is_idempotent(self, db, locmem_cache):
+        call_command('setup_amphitheater', event_dates=['2026-06-19', '2026-06-20'], stdout=io.StringIO())
+        counts = (Section.objects.count(), SeatBlock.objects.count(), AmphitheaterSeat.objects.count())
+        call_command('setup_amphitheater', event_dates=['2026-06-19', '2026-06-20'], stdout=io.StringIO())
+
+        assert counts[:2] == (8, 16)
+        assert (Section.objects.count(), SeatBlock.objects.count(), AmphitheaterSeat.objects.count()) == counts
+
+
+def test_simulate_seat_sale_reports_json(db, empty_cache):
+    out = io.StringIO()
+    call_command('simulate_seat_sale', scale=0.2, section=['Section 1', 'Circle'], stdout=out)
+
+    report = json.loads(out.getvalue())
+    assert report['failed_holds_while_seats_remain'] == 0
+    assert report['latency_ms']['p99'] >= report['latency_ms']['p50']
+    assert [section['section'] for section in report['sections']] == ['Circle', 'Section 1']
+    assert all(section['sold'] == section['capacity'] for section in report['sections'])
+    assert not Venue.objects.exists()
@@ -0,0 +1,138 @@
+"""
+Tests for batched bulk email jobs against the fake SendGrid server.
+"""
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from apps.tickets.models import Order, BulkJob
+from apps.tickets.bulk_email_service import BulkEmailService
+from apps.tickets.fake_sendgrid import FakeSendGridServer
+from apps.tickets.sendgrid_client import SendGridError
+from apps.tickets.tasks import run_bulk_email_job
+
+
+@pytest.fixture
+def fake_sendgrid(settings):
+    server = FakeSendGridServer().start()
+    settings.SENDGRID_API_URL = server.url
+    settings.SENDGRID_API_KEY = 'fake'
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def paid_orders(db, user_factory):
+    return [
+        Order.objects.create(
+            order_number=f'OCM-BULK-{i:03d}',
+            buyer=user_factory(email=f'buyer{i}@example.com'),
+            idempotency_key=f'bulk-idem-{i}',
+            status=Order.Status.PAID,
+            total_cents=3500,
+        )
+        for i in range(5)
+    ]
+
+
+@pytest.mark.django_db
+class TestBulkEmailJob:
+    """Test sending bulk email jobs in personalization batches."""
+
+    def test_sends_recipients_in_batches(self, fake_sendgrid, paid_orders):
+        job = BulkEmailService.start(BulkEmailService.TICKET_RESEND, queue=False)
+
+        job = BulkEmailService.run(str(job.id), batch_size=2)
+
+        assert job.status == BulkJob.Status.COMPLETED
+        assert job.processed_count == 5
+        assert len(fake_sendgrid.messages) == 3
+        assert sorted(fake_sendgrid.recipients) == sorted(o.buyer.email for o in paid_orders)
+
+        personalization = fake_sendgrid.messages[0]['personalizations'][0]
+        assert personalization['substitutions']['-order_number-'].startswith('OCM-BULK-')
+
+    def test_resumes_after_rate_limit(self, fake_sendgrid, paid_orders):
+        fake_sendgrid.rate_limit_every = 2
+        job = BulkEmailService.start(BulkEmailService.TICKET_RESEND, queue=False)
+
+        with pytest.raises(SendGridError) as exc_info:
+            BulkEmailService.run(str(job.id), batch_size=2)
+        assert exc_info.value.is_transient
+
+        job.refresh_from_db()
+        assert job.processed_count == 2
+        assert job.status == BulkJob.Status.RUNNING
+
+        fake_sendgrid.rate_limit_every = 0
+        job = BulkEmailService.run(str(job.id), batch_size=2)
+
+        assert job.status == BulkJob.Status.COMPLETED
+        # Every buyer is emailed exactly once across both runs
+        assert sorted(fake_sendgrid.recipients) == sorted(o.buyer.email for o in paid_orders)
+
+    def test_job_fails_once_retries_run_out(self, fake_sendgrid, paid_orders):
+        fake_sendgrid.rate_limit_every = 1
+        job = BulkEmailService.start(BulkEmailService.TICKET_RESEND, queue=False)
+
+        result = run_bulk_email_job.apply(args=[str(job.id)], retries=run_bulk_email_job.max_retries)
+
+        assert isinstance(result.result, SendGridError)
+        job.refresh_from_db()
+        assert job.status == BulkJob.Status.FAILED
+        assert job.finished_at is not None
+
+        # Still resumable from its cursor
+        fake_sendgrid.rate_limit_every = 0
+        assert BulkEmailService.run(str(job.id)).status == BulkJob.Status.COMPLETED
+
+    def test_names_are_escaped_for_html(self, paid_orders):
+        substitutions = BulkEmailService._personalization({
+            'email': 'guest@example.com',
+            'full_name': '<a href="https://evil.example">Win</a>',
+            'order_number': 'OCM-BULK-999',
+            'total_cents': 3500,
+        })['substitutions']
+
+        assert substitutions['-name_html-'] == '&lt;a href=&quot;https://evil.example&quot;&gt;Win&lt;/a&gt;'
+        for _, text, body_html in BulkEmailService.TEMPLATES.values():
+            assert '-name-' in text and '-name-' not in body_html
+
+    def test_announcement_sent_once_per_buyer(self, fake_sendgrid, paid_orders):
+        Order.objects.create(
+            order_number='OCM-BULK-REPEAT',
+            buyer=paid_orders[0].buyer,
+            idempotency_key='bulk-idem-repeat',
+            status=Order.Status.PAID,
+            total_cents=3500,
+        )
+        job = BulkEmailService.start(
+            BulkEmailService.ANNOUNCEMENT, subject='Venue change', message='Gates open at 4pm', queue=False
+        )
+        assert job.total_count == 5
+
+        job = BulkEmailService.run(str(job.id), batch_size=2)
+
+        assert job.status == BulkJob.Status.COMPLETED
+        assert sorted(fake_sendgrid.recipients) == sorted(o.buyer.email for o in paid_orders)
+        personalization = fake_sendgrid.messages[0]['personalizations'][0]
+        assert '-order_number-' not in personalization['substitutions']
+
+    def test_announcement_requires_subject_and_message(self, paid_orders):
+        with pytest.raises(ValueError):
+            BulkEmailService.start(BulkEmailService.ANNOUNCEMENT, subject='Venue change')
+
+
+@pytest.mark.django_db
+class TestStaffResendTickets:
+    """Test the staff resend endpoint."""
+
+    def test_resend_all_orders_creates_job(self, locmem_cache, api_client, staff_user, paid_orders):
+        api_client.force_authenticate(user=staff_user)
+
+        response = api_client.post(reverse('tickets:staff-resend-tickets'), {'all_orders': True}, format='json')
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        job = BulkJob.objects.get(id=response.data['data']['id'])
+        assert job.kind == BulkJob.Kind.EMAIL_BROADCAST
+        assert job.total_count == 5
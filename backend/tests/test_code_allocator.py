@@ -0,0 +1,92 @@
+"""
+Tests for order number and ticket code allocation.
+"""
+import re
+from unittest.mock import patch
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.tickets.code_allocator import CodeAllocator, ticket_codes
+from apps.tickets.models import Order, Ticket
+
+
+def test_permutation_is_a_bijection():
+    allocator = CodeAllocator('test', bits=11)
+
+    permuted = [allocator.permute(value) for value in range(1 << 11)]
+
+    assert sorted(permuted) == list(range(1 << 11))
+    # Not the identity or a simple offset
+    assert permuted[:8] != list(range(8))
+
+
+def test_permutation_depends_on_key(settings):
+    allocator = CodeAllocator('test', bits=40)
+    first = allocator.permute(1)
+
+    settings.CODE_ALLOCATOR_KEY = 'another-key'
+
+    assert allocator.permute(1) != first
+
+
+@pytest.mark.django_db
+class TestCodeAllocator:
+    """Test allocating codes in blocks."""
+
+    def test_codes_are_unique_across_workers(self, settings):
+        settings.CODE_BLOCK_SIZE = 50
+        workers = [CodeAllocator('ticket_code', bits=80) for _ in range(3)]
+
+        codes = [code for _ in range(4) for worker in workers for code in worker.codes(30)]
+
+        assert len(set(codes)) == len(codes) == 360
+        assert all(re.fullmatch(r'[A-Z2-7]{16}', code) for code in codes)
+
+    def test_block_served_from_memory(self, settings, django_capture_on_commit_callbacks):
+        settings.CODE_BLOCK_SIZE = 100
+        allocator = CodeAllocator('ticket_code', bits=80)
+        with django_capture_on_commit_callbacks(execute=True):
+            allocator.codes(1)
+
+        with CaptureQueriesContext(connection) as queries:
+            allocator.codes(99)
+        assert len(queries) == 0
+
+        with CaptureQueriesContext(connection) as queries:
+            allocator.codes(500)
+        assert len(queries) > 0
+
+    def test_rolled_back_block_is_not_reused(self, settings):
+        settings.CODE_BLOCK_SIZE = 5
+        allocator = CodeAllocator('ticket_code', bits=80)
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                allocator.take(1)
+                raise RuntimeError('order failed')
+
+        values = allocator.take(10)
+        assert len(set(values)) == 10
+
+    def test_forked_worker_reserves_its_own_block(self):
+        allocator = CodeAllocator('ticket_code', bits=80)
+        parent = allocator.take(1)
+
+        with patch('apps.tickets.code_allocator.os.getpid', return_value=-1):
+            child = allocator.take(1)
+
+        assert child[0] != parent[0] + 1
+
+    def test_ticket_codes_need_no_lookups(self):
+        ticket_codes.codes(1)
+
+        with CaptureQueriesContext(connection) as queries:
+            codes = Ticket.generate_ticket_codes(10)
+
+        assert len(set(codes)) == 10
+        assert not any('tickets' in query['sql'] for query in queries)
+
+    def test_order_number_format(self):
+        assert re.fullmatch(r'OCM-\d{6}-[A-Z2-7]{7}', Order.generate_order_number())
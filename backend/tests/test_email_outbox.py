@@ -0,0 +1,74 @@
+"""
+Tests for the transactional email outbox.
+"""
+import pytest
+from unittest.mock import patch
+from django.utils import timezone
+
+from apps.tickets.models import Order, EmailOutbox
+from apps.tickets.email_service import TicketEmailService
+from apps.tickets.outbox_service import EmailOutboxService
+
+
+@pytest.fixture(autouse=True)
+def no_dispatch_kick():
+    """Dispatch explicitly instead of through the broker."""
+    with patch.object(EmailOutboxService, '_kick'):
+        yield
+
+
+@pytest.fixture
+def order(db, attendee_user):
+    return Order.objects.create(
+        order_number='OCM-MAIL-001',
+        buyer=attendee_user,
+        idempotency_key='mail-idem',
+        status=Order.Status.PAID,
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestEmailOutbox:
+    """Test queueing and dispatching outbox emails."""
+
+    def test_enqueue_is_deduplicated(self, order):
+        assert EmailOutboxService.enqueue_order_confirmation(order) is not None
+        assert EmailOutboxService.enqueue_order_confirmation(order) is None
+
+        assert EmailOutbox.objects.filter(order=order).count() == 1
+
+    def test_dispatch_sends_pending_email(self, locmem_cache, order):
+        outbox = EmailOutboxService.enqueue_order_confirmation(order)
+
+        with patch.object(TicketEmailService, 'send_order_confirmation', return_value=True) as send:
+            result = EmailOutboxService.dispatch()
+
+        assert result == {'sent': 1, 'failed': 0}
+        send.assert_called_once()
+        outbox.refresh_from_db()
+        assert outbox.status == EmailOutbox.Status.SENT
+        assert outbox.sent_at is not None
+
+    def test_failed_send_is_retried_later(self, locmem_cache, order):
+        outbox = EmailOutboxService.enqueue_order_confirmation(order)
+
+        with patch.object(TicketEmailService, 'send_order_confirmation', return_value=False):
+            EmailOutboxService.dispatch()
+            # Not due yet, so a second dispatch does nothing
+            assert EmailOutboxService.dispatch() == {'sent': 0, 'failed': 0}
+
+        outbox.refresh_from_db()
+        assert outbox.status == EmailOutbox.Status.PENDING
+        assert outbox.attempts == 1
+        assert outbox.next_attempt_at > timezone.now()
+
+    def test_gives_up_after_max_attempts(self, locmem_cache, order):
+        outbox = EmailOutboxService.enqueue_order_confirmation(order)
+        EmailOutbox.objects.filter(id=outbox.id).update(attempts=EmailOutboxService.MAX_ATTEMPTS - 1)
+
+        with patch.object(TicketEmailService, 'send_order_confirmation', side_effect=Exception('boom')):
+            EmailOutboxService.dispatch()
+
+        outbox.refresh_from_db()
+        assert outbox.status == EmailOutbox.Status.FAILED
+        assert outbox.last_error == 'boom'
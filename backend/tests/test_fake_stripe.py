@@ -0,0 +1,104 @@
+"""
+Tests for checkout against the local fake Stripe API.
+"""
+import pytest
+import stripe
+from unittest.mock import patch
+
+from apps.tickets.models import Order, Ticket, TicketType
+from apps.tickets.services import OrderService
+from apps.payments.fake_stripe import FakeStripeServer, decode_form
+from apps.payments.models import StripeEvent
+from apps.payments.services import StripeService
+
+
+@pytest.fixture
+def fake_stripe(settings):
+    server = FakeStripeServer(seed=1).start()
+    settings.STRIPE_WEBHOOK_SECRET = server.webhook_secret
+    with patch.object(stripe, 'api_base', server.url), \
+            patch.object(stripe, 'api_key', 'sk_test_fake'), \
+            patch('apps.payments.services.DEMO_MODE', False):
+        yield server
+    server.stop()
+
+
+@pytest.fixture
+def order(locmem_cache, attendee_user):
+    ticket_type = TicketType.objects.create(
+        name='Weekend Pass',
+        slug='weekend-pass',
+        price_cents=4000,
+        is_active=True
+    )
+    return OrderService.create_order(
+        buyer=attendee_user,
+        items=[{'ticket_type_id': ticket_type.id, 'quantity': 2}],
+        idempotency_key='fake-stripe-1'
+    )
+
+
+def deliver(server, event_type):
+    """Feed the server's recorded events of a type through the webhook path."""
+    delivered = [sent for sent in server.events if sent['event']['type'] == event_type]
+    for sent in delivered:
+        StripeService.ingest_webhook_event(sent['payload'].encode(), sent['signature'])
+        StripeService.process_order_events(
+            StripeEvent.objects.get(stripe_event_id=sent['event']['id']).order_key
+        )
+    return delivered
+
+
+def test_decode_form():
+    body = 'amount=100&metadata[order_id]=abc&line_items[0][quantity]=2&line_items[1][quantity]=1'
+
+    assert decode_form(body) == {
+        'amount': '100',
+        'metadata': {'order_id': 'abc'},
+        'line_items': [{'quantity': '2'}, {'quantity': '1'}],
+    }
+
+
+@pytest.mark.django_db
+class TestFakeStripeCheckout:
+    """Test the checkout-to-ticket pipeline against the fake Stripe API."""
+
+    def test_payment_issues_tickets_and_refunds(self, fake_stripe, order):
+        result = StripeService.create_payment_intent(order, 'fake-stripe-1')
+        assert not result['demo_mode']
+        assert fake_stripe.payment_intents[result['payment_intent_id']]['metadata']['order_id'] == str(order.id)
+
+        stripe.PaymentIntent.confirm(result['payment_intent_id'])
+        assert deliver(fake_stripe, 'payment_intent.succeeded')
+
+        order.refresh_from_db()
+        assert order.status == Order.Status.PAID
+        assert Ticket.objects.filter(order=order).count() == 2
+
+        refund_id = StripeService.process_refund(order, 4000, 'test')
+        assert fake_stripe.refunds[refund_id]['amount'] == 4000
+        assert deliver(fake_stripe, 'charge.refunded')
+        assert not StripeEvent.objects.filter(processed=False).exists()
+
+    def test_idempotent_create(self, fake_stripe, order):
+        first = StripeService.create_payment_intent(order, 'fake-stripe-1')
+        second = StripeService.create_payment_intent(order, 'fake-stripe-1')
+
+        assert first['payment_intent_id'] == second['payment_intent_id']
+        assert len(fake_stripe.payment_intents) == 1
+
+    def test_declined_payment(self, fake_stripe, order):
+        fake_stripe.decline_rate = 1.0
+        result = StripeService.create_payment_intent(order, 'fake-stripe-1')
+
+        with pytest.raises(stripe.error.CardError):
+            stripe.PaymentIntent.confirm(result['payment_intent_id'])
+
+        assert deliver(fake_stripe, 'payment_intent.payment_failed')
+        assert not Ticket.objects.filter(order=order).exists()
+
+    def test_injected_api_failure(self, fake_stripe, order):
+        fake_stripe.failure_rate = 1.0
+
+        with pytest.raises(ValueError):
+            StripeService.create_payment_intent(order, 'fake-stripe-1')
@@ -0,0 +1,78 @@
+"""
+Tests for guest checkout account resolution.
+"""
+import threading
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.payments.guest_checkout import GuestCheckoutService
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestGuestUserUpsert:
+    """Test creating and reusing guest accounts."""
+
+    def test_creates_guest_with_unusable_password(self, locmem_cache):
+        user, created = GuestCheckoutService.get_or_create_user(' Guest@Example.com ', 'Guest Buyer', '555-0100')
+
+        assert created
+        assert user.email == 'guest@example.com'
+        assert not user.has_usable_password()
+        assert User.objects.get(id=user.id).full_name == 'Guest Buyer'
+
+    def test_reuses_existing_account(self, locmem_cache, attendee_user):
+        user, created = GuestCheckoutService.get_or_create_user(attendee_user.email.upper(), 'New Name')
+
+        assert not created
+        assert user.id == attendee_user.id
+        attendee_user.refresh_from_db()
+        assert attendee_user.full_name == 'New Name'
+        assert attendee_user.has_usable_password()
+
+    def test_cached_lookup(self, locmem_cache):
+        first, _ = GuestCheckoutService.get_or_create_user('repeat@example.com', 'Repeat Buyer')
+
+        with CaptureQueriesContext(connection) as queries:
+            second, created = GuestCheckoutService.get_or_create_user('repeat@example.com', 'Repeat Buyer')
+
+        assert not created
+        assert second.id == first.id
+        assert len(queries) == 1
+
+    def test_stale_cache_entry_is_ignored(self, locmem_cache, attendee_user):
+        cache.set(GuestCheckoutService.user_id_cache_key('someone@example.com'), attendee_user.id)
+
+        user, created = GuestCheckoutService.get_or_create_user('someone@example.com', 'Someone')
+
+        assert created
+        assert user.id != attendee_user.id
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_guest_checkouts_share_one_account(locmem_cache):
+    results, errors = [], []
+
+    def checkout():
+        try:
+            results.append(GuestCheckoutService.get_or_create_user('burst@example.com', 'Burst Buyer'))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=checkout) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len({user.id for user, _ in results}) == 1
+    assert sum(created for _, created in results) == 1
+    assert User.objects.filter(email='burst@example.com').count() == 1
@@ -0,0 +1,107 @@
+"""
+Tests for idempotent checkout responses.
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from apps.payments.idempotency import idempotent_response, REPLAY_HEADER, _digest
+
+
+class CheckoutStubView(APIView):
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    calls = 0
+    delay = 0
+    during = None
+
+    @idempotent_response
+    def post(self, request):
+        type(self).calls += 1
+        time.sleep(self.delay)
+        if type(self).during:
+            type(self).during()
+        if request.data.get('fail'):
+            return Response({'success': False}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'success': True, 'data': {'call': type(self).calls}})
+
+
+@pytest.fixture
+def checkout_view(locmem_cache):
+    cache.clear()
+    CheckoutStubView.calls = 0
+    CheckoutStubView.delay = 0
+    CheckoutStubView.during = None
+    return CheckoutStubView
+
+
+def post(data):
+    request = APIRequestFactory().post('/checkout/', data, format='json')
+    return CheckoutStubView.as_view()(request)
+
+
+class TestIdempotentResponse:
+    """Test replaying checkout responses by idempotency key."""
+
+    def test_replays_first_response(self, checkout_view):
+        body = {'idempotency_key': 'abc', 'email': 'a@example.com'}
+
+        first = post(body)
+        second = post(body)
+
+        assert checkout_view.calls == 1
+        assert second.data == first.data
+        assert second[REPLAY_HEADER] == 'true'
+
+    def test_keys_are_scoped_to_buyer(self, checkout_view):
+        post({'idempotency_key': 'abc', 'email': 'a@example.com'})
+        post({'idempotency_key': 'abc', 'email': 'b@example.com'})
+
+        assert checkout_view.calls == 2
+
+    def test_rejects_key_reuse_with_different_body(self, checkout_view):
+        post({'idempotency_key': 'abc', 'email': 'a@example.com', 'items': [1]})
+
+        response = post({'idempotency_key': 'abc', 'email': 'a@example.com', 'items': [2]})
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_errors_are_not_replayed(self, checkout_view):
+        post({'idempotency_key': 'abc', 'fail': True})
+        post({'idempotency_key': 'abc', 'fail': True})
+
+        assert checkout_view.calls == 2
+
+    def test_concurrent_duplicates_wait_for_first(self, checkout_view):
+        checkout_view.delay = 0.3
+        body = {'idempotency_key': 'abc', 'email': 'a@example.com'}
+        responses = []
+
+        threads = [threading.Thread(target=lambda: responses.append(post(body))) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert checkout_view.calls == 1
+        assert [r.status_code for r in responses] == [200, 200, 200]
+        assert len({r.data['data']['call'] for r in responses}) == 1
+
+    def test_expired_lock_taken_by_another_request_is_kept(self, checkout_view):
+        body = {'idempotency_key': 'abc', 'email': 'a@example.com'}
+        digest = _digest(CheckoutStubView(), SimpleNamespace(user=None, data=body), 'abc')
+        lock_key = f"idempotency:lock:{digest}"
+        # This request ran past its lock, which a retry then took
+        checkout_view.during = lambda: cache.set(lock_key, 'retry-token')
+
+        post(body)
+
+        assert cache.get(lock_key) == 'retry-token'
@@ -0,0 +1,213 @@
+"""
+Tests for ticket inventory reservations.
+"""
+import time
+import uuid
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.tickets.models import TicketType, TicketSoldCounter, Order
+from apps.tickets.services import OrderService
+from apps.tickets.inventory_service import InventoryService
+
+
+@pytest.fixture
+def limited_type(db):
+    return TicketType.objects.create(
+        name='Friday Pass',
+        slug='friday-pass',
+        price_cents=2000,
+        capacity=3,
+        is_active=True
+    )
+
+
+def create_order(buyer, ticket_type, quantity, key, commit=True):
+    # Tests run inside a transaction; commit=True runs what the order's commit would
+    with TestCase.captureOnCommitCallbacks(execute=commit):
+        return OrderService.create_order(
+            buyer=buyer,
+            items=[{'ticket_type_id': ticket_type.id, 'quantity': quantity}],
+            idempotency_key=key
+        )
+
+
+def committed(ticket_type):
+    return cache.get(InventoryService.counter_key(ticket_type.id))
+
+
+@pytest.mark.django_db
+class TestInventoryReservations:
+    """Test reserving, settling and reconciling ticket inventory."""
+
+    def test_reservations_prevent_oversell(self, locmem_cache, attendee_user, limited_type):
+        order = create_order(attendee_user, limited_type, 2, 'inv-1')
+
+        with pytest.raises(ValueError):
+            create_order(attendee_user, limited_type, 2, 'inv-2')
+
+        assert committed(limited_type) == 2
+        assert order.metadata['inventory_reservations'] == {str(limited_type.id): 2}
+        # Nothing sold until payment
+        limited_type.refresh_from_db()
+        assert limited_type.sold_count == 0
+
+    def test_release_order_is_idempotent(self, locmem_cache, attendee_user, limited_type):
+        order = create_order(attendee_user, limited_type, 2, 'inv-1')
+
+        InventoryService.release_order(order)
+        InventoryService.release_order(order)
+
+        assert committed(limited_type) == 0
+        create_order(attendee_user, limited_type, 3, 'inv-2')
+
+    def test_confirmed_order_is_not_released(self, locmem_cache, attendee_user, limited_type):
+        order = create_order(attendee_user, limited_type, 2, 'inv-1')
+
+        InventoryService.confirm_order(order)
+        InventoryService.release_order(order)
+
+        assert committed(limited_type) == 2
+
+    def test_reconcile_frees_expired_reservations(self, locmem_cache, attendee_user, limited_type):
+        order = create_order(attendee_user, limited_type, 2, 'inv-1')
+        create_order(attendee_user, limited_type, 1, 'inv-2')
+        Order.objects.filter(id=order.id).update(
+            created_at=timezone.now() - InventoryService.RESERVATION_TTL - timedelta(minutes=1)
+        )
+
+        adjustments = InventoryService.reconcile()
+
+        assert adjustments == {str(limited_type.id): -2}
+        assert committed(limited_type) == 1
+
+    def test_reconcile_keeps_uncommitted_reservations(self, locmem_cache, attendee_user, limited_type):
+        create_order(attendee_user, limited_type, 1, 'inv-1')
+        # Its transaction hasn't committed yet
+        create_order(attendee_user, limited_type, 2, 'inv-2', commit=False)
+        Order.objects.filter(idempotency_key='inv-2').delete()
+
+        assert InventoryService.reconcile() == {}
+        assert committed(limited_type) == 1
+        assert InventoryService.pending(limited_type.id) == 2
+        with pytest.raises(ValueError):
+            create_order(attendee_user, limited_type, 1, 'inv-3')
+
+    def test_outer_rollback_hands_reservation_back(self, locmem_cache, attendee_user, limited_type):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                create_order(attendee_user, limited_type, 3, 'inv-1', commit=False)
+                raise RuntimeError('checkout failed after the order was created')
+
+        assert not Order.objects.filter(idempotency_key='inv-1').exists()
+        assert committed(limited_type) == 0
+
+        later = time.time() + InventoryService.PENDING_TIMEOUT + 1
+        with patch('time.time', return_value=later):
+            assert InventoryService.pending(limited_type.id) == 0
+            create_order(attendee_user, limited_type, 3, 'inv-2')
+
+        assert committed(limited_type) == 3
+
+    def test_falls_back_to_row_lock_without_cache(self, attendee_user, limited_type):
+        with patch('apps.tickets.inventory_service.cache.incr', side_effect=ConnectionError('down')):
+            order = create_order(attendee_user, limited_type, 3, 'inv-1')
+
+            with pytest.raises(ValueError):
+                create_order(attendee_user, limited_type, 4, 'inv-2')
+
+        assert 'inventory_reservations' not in order.metadata
+
+
+@pytest.mark.django_db
+class TestShardedSoldCount:
+    """Test the sharded sold counters."""
+
+    def test_increments_spread_over_slots(self, locmem_cache, limited_type, settings):
+        settings.TICKET_SOLD_COUNTER_SLOTS = 4
+        TicketType.objects.filter(id=limited_type.id).update(sold_count=1)
+        limited_type.refresh_from_db()
+
+        for _ in range(20):
+            TicketSoldCounter.increment(limited_type.id, 1)
+
+        assert TicketSoldCounter.objects.filter(ticket_type=limited_type).count() <= 4
+        assert TicketSoldCounter.total(limited_type, use_cache=False) == 21
+
+    def test_cached_total_dropped_on_commit(self, locmem_cache, limited_type, django_capture_on_commit_callbacks):
+        assert limited_type.remaining_capacity == 3
+
+        with django_capture_on_commit_callbacks(execute=True):
+            TicketSoldCounter.increment(limited_type.id, 3)
+
+        limited_type = TicketType.objects.get(id=limited_type.id)
+        assert limited_type.sold_total == 3
+        assert limited_type.remaining_capacity == 0
+        assert not limited_type.is_available
+
+    def test_committed_includes_sharded_sales(self, locmem_cache, attendee_user, limited_type):
+        TicketSoldCounter.increment(limited_type.id, 2)
+
+        with pytest.raises(ValueError):
+            create_order(attendee_user, limited_type, 2, 'inv-1')
+
+        assert InventoryService.committed_from_db()[limited_type.id] == 2
+
+
+@pytest.mark.django_db
+class TestSetBasedOrderCreation:
+    """Test creating multi-item orders in a constant number of queries."""
+
+    def _cart(self, size):
+        return [
+            {
+                'ticket_type_id': TicketType.objects.create(
+                    name=f'Cart Pass {size}-{i}',
+                    slug=f'cart-pass-{size}-{i}',
+                    price_cents=1000 + i,
+                    capacity=10,
+                    is_active=True
+                ).id,
+                'quantity': 2
+            }
+            for i in range(size)
+        ]
+
+    def test_query_count_independent_of_cart_size(self, locmem_cache, attendee_user):
+        small, large = self._cart(1), self._cart(8)
+        # Seed the counters so both runs take the same path
+        InventoryService.reconcile()
+
+        with CaptureQueriesContext(connection) as small_queries:
+            OrderService.create_order(buyer=attendee_user, items=small, idempotency_key='cart-1')
+        with CaptureQueriesContext(connection) as large_queries:
+            order = OrderService.create_order(buyer=attendee_user, items=large, idempotency_key='cart-8')
+
+        assert len(large_queries) == len(small_queries)
+        assert order.items.count() == 8
+        assert order.subtotal_cents == sum(2 * (1000 + i) for i in range(8))
+
+    def test_duplicate_lines_count_against_capacity_together(self, locmem_cache, attendee_user, limited_type):
+        items = [{'ticket_type_id': limited_type.id, 'quantity': 2}] * 2
+
+        with pytest.raises(ValueError):
+            OrderService.create_order(buyer=attendee_user, items=items, idempotency_key='dup')
+
+        assert committed(limited_type) == 0
+        assert not Order.objects.filter(idempotency_key='dup').exists()
+
+    def test_unknown_ticket_type(self, locmem_cache, attendee_user, limited_type):
+        items = [{'ticket_type_id': limited_type.id, 'quantity': 1}, {'ticket_type_id': uuid.uuid4(), 'quantity': 1}]
+
+        with pytest.raises(ValueError):
+            OrderService.create_order(buyer=attendee_user, items=items, idempotency_key='unknown')
+
+        # Rejected before anything is reserved
+        assert not committed(limited_type)
@@ -0,0 +1,107 @@
+"""
+Tests for bulk invoice regeneration.
+"""
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from celery import signature
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.tickets.models import TicketType, Order, OrderItem, Invoice, BulkJob
+from apps.tickets.invoice_service import InvoiceService
+from apps.tickets.tasks import dispatch_invoice_regeneration
+
+
+@pytest.fixture
+def paid_orders(db, attendee_user):
+    ticket_type = TicketType.objects.create(
+        name='3-Day Pass',
+        slug='3day-pass',
+        price_cents=3500,
+        valid_days=['2026-09-04'],
+        is_active=True
+    )
+    orders = []
+    for i in range(5):
+        order = Order.objects.create(
+            order_number=f'OCM-INV-{i:03d}',
+            buyer=attendee_user,
+            idempotency_key=f'inv-idem-{i}',
+            status=Order.Status.PAID,
+            subtotal_cents=3500,
+            total_cents=3500,
+            paid_at=timezone.now(),
+        )
+        OrderItem.objects.create(
+            order=order,
+            ticket_type=ticket_type,
+            quantity=1,
+            unit_price_cents=3500,
+            total_cents=3500,
+        )
+        orders.append(order)
+    return orders
+
+
+@pytest.mark.django_db
+class TestInvoiceRegeneration:
+    """Test chunked invoice regeneration."""
+
+    def test_regenerate_chunk_creates_and_stores_invoices(self, memory_storage, paid_orders):
+        # InMemoryStorage is not thread-safe when creating directories
+        result = InvoiceService.regenerate_chunk([o.id for o in paid_orders], max_workers=1)
+
+        assert result == {'processed': 5, 'failed': 0, 'skipped': 0}
+        for invoice in Invoice.objects.all():
+            assert invoice.generated_at is not None
+            assert default_storage.exists(invoice.pdf_file.name)
+
+    def test_regenerate_chunk_query_count_is_constant(self, memory_storage, paid_orders, django_assert_max_num_queries):
+        with django_assert_max_num_queries(8):
+            InvoiceService.regenerate_chunk([o.id for o in paid_orders], max_workers=1)
+
+    def test_resume_picks_up_remaining_orders(self, memory_storage, paid_orders):
+        job, chunks = InvoiceService.start_regeneration(chunk_size=2)
+        assert job.total_count == 5
+        assert [len(c) for c in chunks] == [2, 2, 1]
+
+        # Only the first chunk completes before the run is interrupted
+        result = InvoiceService.regenerate_chunk(chunks[0], since=job.created_at)
+        InvoiceService.record_progress(str(job.id), result['processed'], result['failed'])
+
+        resumed, remaining = InvoiceService.start_regeneration(chunk_size=2, resume=True)
+
+        assert resumed.id == job.id
+        assert resumed.total_count == 5
+        assert sum(len(c) for c in remaining) == 3
+        assert not set(chunks[0]) & {order_id for c in remaining for order_id in c}
+
+    def test_command_sync_reports_throughput(self, memory_storage, paid_orders):
+        out = StringIO()
+
+        call_command('regenerate_invoices', '--sync', '--chunk-size', '2', stdout=out)
+
+        job = BulkJob.objects.get()
+        assert job.status == BulkJob.Status.COMPLETED
+        assert job.processed_count == 5
+        assert 'orders/s' in out.getvalue()
+        assert Invoice.objects.filter(generated_at__isnull=False).count() == 5
+
+    def test_chunk_giving_up_fails_the_job(self, paid_orders):
+        job, chunks = InvoiceService.start_regeneration(chunk_size=2)
+
+        with patch('celery.chord') as chord:
+            dispatch_invoice_regeneration(str(job.id), chunks)
+        callback = chord.return_value.call_args.args[0]
+        errback = signature(callback.options['link_error'][0])
+
+        # Celery calls the errback with the failed chunk's request instead of the callback
+        errback.type(SimpleNamespace(id='chunk-1'), RuntimeError('storage down'), None, *errback.args)
+
+        job.refresh_from_db()
+        assert job.status == BulkJob.Status.FAILED
+        assert job.finished_at is not None
@@ -0,0 +1,92 @@
+"""
+Tests for order confirmation email assembly.
+"""
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+
+from apps.tickets.models import TicketType, Order, Ticket
+from apps.tickets.email_service import TicketEmailService
+from apps.tickets.services import QRCodeService
+
+
+@pytest.fixture
+def order_with_tickets(db, attendee_user):
+    ticket_type = TicketType.objects.create(
+        name='3-Day Pass',
+        slug='3day-pass',
+        price_cents=3500,
+        valid_days=['2026-06-19', '2026-06-20'],
+        is_active=True
+    )
+    order = Order.objects.create(
+        order_number='OCM-MAIL-001',
+        buyer=attendee_user,
+        idempotency_key='mail-idem',
+        status=Order.Status.PAID,
+        total_cents=7000,
+    )
+    tickets = [
+        Ticket.objects.create(
+            ticket_code=Ticket.generate_ticket_code(),
+            owner=attendee_user,
+            ticket_type=ticket_type,
+            order=order,
+        )
+        for _ in range(2)
+    ]
+    return order, tickets
+
+
+@pytest.mark.django_db
+class TestOrderConfirmationEmail:
+    """Test building the order confirmation from templates."""
+
+    def test_renders_every_ticket_with_inline_qr(self, locmem_cache, order_with_tickets):
+        order, tickets = order_with_tickets
+
+        email = TicketEmailService.build_order_confirmation(order)
+
+        assert order.order_number in email['subject']
+        assert len(email['attachments']) == 2
+        for ticket in tickets:
+            assert ticket.ticket_code in email['text']
+            assert f'cid:qr_{ticket.ticket_code}' in email['html']
+        assert 'Valid Days: 2026-06-19, 2026-06-20' in email['text']
+        assert 'USD $70.00' in email['html']
+
+    def test_qr_rendered_once_per_ticket(self, locmem_cache, order_with_tickets):
+        order, tickets = order_with_tickets
+
+        with patch.object(QRCodeService, 'generate_qr_data', wraps=QRCodeService.generate_qr_data) as generate:
+            first = TicketEmailService.build_order_confirmation(order, tickets)
+            second = TicketEmailService.build_order_confirmation(order, tickets)
+
+        assert generate.call_count == 2
+        assert first['attachments'] == second['attachments']
+
+    def test_amphitheater_ticket_without_type(self, locmem_cache, order_with_tickets, attendee_user):
+        order, _ = order_with_tickets
+        Ticket.objects.create(
+            ticket_code=Ticket.generate_ticket_code(),
+            owner=attendee_user,
+            order=order,
+            metadata={'type': 'amphitheater', 'ticket_name': 'Pit Seat', 'section_name': 'Pit', 'price_paid': 9900},
+        )
+
+        email = TicketEmailService.build_order_confirmation(order)
+
+        assert 'Pit Seat' in email['html']
+        assert 'Section: Pit' in email['text']
+        assert '$99.00' in email['html']
+
+    def test_benchmark_command(self, locmem_cache, db):
+        out = StringIO()
+
+        call_command('benchmark_order_email', '--sizes', '1', '3', '--iterations', '2', stdout=out)
+
+        lines = out.getvalue().strip().splitlines()
+        assert len(lines) == 4
+        assert Order.objects.count() == 0
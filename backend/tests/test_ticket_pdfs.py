@@ -0,0 +1,106 @@
+"""
+Tests for pre-rendered ticket PDFs.
+"""
+import pytest
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from rest_framework import status
+
+from apps.tickets.models import TicketType, Order, Ticket
+from apps.tickets.pdf_service import TicketPDFService
+
+
+@pytest.fixture
+def order_with_ticket(db, attendee_user):
+    ticket_type = TicketType.objects.create(
+        name='3-Day Pass',
+        slug='3day-pass',
+        price_cents=3500,
+        valid_days=['2026-09-04'],
+        is_active=True
+    )
+    order = Order.objects.create(
+        order_number='OCM-PDF-001',
+        buyer=attendee_user,
+        idempotency_key='pdf-idem',
+        status=Order.Status.PAID,
+    )
+    ticket = Ticket.objects.create(
+        ticket_code=Ticket.generate_ticket_code(),
+        owner=attendee_user,
+        ticket_type=ticket_type,
+        order=order,
+    )
+    return order, ticket
+
+
+@pytest.mark.django_db
+class TestTicketPDFStorage:
+    """Test rendering and storing ticket PDFs."""
+
+    def test_prerender_stores_ticket_and_order(self, memory_storage, order_with_ticket):
+        order, ticket = order_with_ticket
+
+        rendered = TicketPDFService.prerender_tickets([str(ticket.id)])
+
+        assert rendered == 2
+        assert default_storage.exists(TicketPDFService.ticket_storage_name(ticket))
+        assert default_storage.exists(TicketPDFService.order_storage_name(order, [ticket]))
+
+        # Second run finds everything stored
+        assert TicketPDFService.prerender_tickets([str(ticket.id)]) == 0
+
+    def test_version_changes_on_transfer_and_rotation(self, order_with_ticket, user_factory):
+        _, ticket = order_with_ticket
+        original = TicketPDFService.ticket_version(ticket)
+
+        ticket.owner = user_factory(email='new-owner@example.com')
+        transferred = TicketPDFService.ticket_version(ticket)
+        assert transferred != original
+
+        ticket.qr_secret_version += 1
+        assert TicketPDFService.ticket_version(ticket) != transferred
+
+
+@pytest.mark.django_db
+class TestTicketPDFDownload:
+    """Test the PDF download endpoint."""
+
+    def test_download_renders_on_miss_and_stores(self, locmem_cache, memory_storage, authenticated_client, order_with_ticket):
+        _, ticket = order_with_ticket
+        url = reverse('tickets:ticket-pdf', args=[ticket.id])
+
+        response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content.startswith(b'%PDF')
+        assert response['ETag'] == f'"{TicketPDFService.ticket_version(ticket)}"'
+        assert default_storage.exists(TicketPDFService.ticket_storage_name(ticket))
+
+    def test_download_not_modified(self, locmem_cache, memory_storage, authenticated_client, order_with_ticket):
+        _, ticket = order_with_ticket
+        url = reverse('tickets:ticket-pdf', args=[ticket.id])
+        etag = f'"{TicketPDFService.ticket_version(ticket)}"'
+
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_download_range(self, locmem_cache, memory_storage, authenticated_client, order_with_ticket):
+        _, ticket = order_with_ticket
+        TicketPDFService.prerender_tickets([str(ticket.id)])
+        url = reverse('tickets:ticket-pdf', args=[ticket.id])
+
+        response = authenticated_client.get(url, HTTP_RANGE='bytes=0-3')
+
+        assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+        assert response.content == b'%PDF'
+        assert response['Content-Range'].startswith('bytes 0-3/')
+
+    def test_download_unsatisfiable_range(self, locmem_cache, memory_storage, authenticated_client, order_with_ticket):
+        _, ticket = order_with_ticket
+        url = reverse('tickets:ticket-pdf', args=[ticket.id])
+
+        response = authenticated_client.get(url, HTTP_RANGE='bytes=99999999-')
+
+        assert response.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
@@ -4,12 +4,14 @@ Tests for tickets app.
 import pytest
 import json
 from unittest.mock import patch, MagicMock
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 
 from apps.tickets.models import TicketType, Order, Ticket, TicketTransfer
-from apps.tickets.services import QRCodeService, TransferService, OrderService
+from apps.tickets.services import QRCodeService, TransferService, OrderService, TicketService
 
 
 @pytest.fixture
@@ -205,3 +207,58 @@ class TestOrderService:
         )
         
         assert order1.id == order2.id
+
+
+@pytest.mark.django_db
+class TestTicketIssuance:
+    """Test bulk ticket issuance for paid orders."""
+    
+    def _order(self, buyer, ticket_type, quantity, metadata=None):
+        order = Order.objects.create(
+            order_number=Order.generate_order_number(),
+            buyer=buyer,
+            idempotency_key=f'issue-{quantity}-{Order.objects.count()}',
+            status=Order.Status.PAID
+        )
+        order.items.create(
+            ticket_type=ticket_type,
+            quantity=quantity,
+            unit_price_cents=ticket_type.price_cents,
+            total_cents=ticket_type.price_cents * quantity,
+            metadata=metadata or {}
+        )
+        return order
+    
+    def test_query_count_independent_of_quantity(self, attendee_user, ticket_type):
+        small = self._order(attendee_user, ticket_type, 2)
+        large = self._order(attendee_user, ticket_type, 50)
+        
+        with CaptureQueriesContext(connection) as small_queries:
+            TicketService.issue_tickets_for_order(small)
+        with CaptureQueriesContext(connection) as large_queries:
+            tickets = TicketService.issue_tickets_for_order(large)
+        
+        assert len(tickets) == 50
+        assert len(large_queries) == len(small_queries)
+        assert len({t.ticket_code for t in tickets}) == 50
+        assert Ticket.objects.filter(order=large).count() == 50
+    
+    def test_vendor_booth_gets_festival_passes(self, vendor_user, ticket_type):
+        order = self._order(vendor_user, ticket_type, 2, metadata={'business_type': 'food'})
+        
+        tickets = TicketService.issue_tickets_for_order(order)
+        
+        comps = [t for t in tickets if t.is_comp]
+        assert len(tickets) == 6
+        assert len(comps) == 4
+        assert all(t.ticket_type.slug == 'festival-access-comp-vendor' for t in comps)
+    
+    def test_retries_on_code_collision(self, attendee_user, ticket, ticket_type):
+        order = self._order(attendee_user, ticket_type, 1)
+        real_codes = Ticket.generate_ticket_codes
+        
+        with patch.object(Ticket, 'generate_ticket_codes', side_effect=[[ticket.ticket_code], real_codes(1)]):
+            tickets = TicketService.issue_tickets_for_order(order)
+        
+        assert len(tickets) == 1
+        assert tickets[0].ticket_code != ticket.ticket_code
@@ -0,0 +1,130 @@
+"""
+Tests for the checkout waiting room.
+"""
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from apps.payments.idempotency import idempotent_response, REPLAY_HEADER
+from apps.payments.waiting_room import WaitingRoomService, HasCheckoutAdmission, get_admission_token
+
+
+@pytest.fixture
+def waiting_room(settings, locmem_cache):
+    settings.WAITING_ROOM_ENABLED = True
+    settings.WAITING_ROOM_CHECKOUT_BUDGET = 2
+    # The queue counters live in the shared in-process cache
+    cache.clear()
+    return WaitingRoomService
+
+
+class AdmittedCheckoutView(APIView):
+    permission_classes = [HasCheckoutAdmission]
+    authentication_classes = []
+
+    @idempotent_response
+    def post(self, request):
+        WaitingRoomService.release(get_admission_token(request))
+        return Response({'success': True})
+
+
+def checkout(admission_token, key):
+    request = APIRequestFactory().post(
+        '/checkout/', {'idempotency_key': key}, format='json', HTTP_X_WAITING_ROOM_TOKEN=admission_token
+    )
+    return AdmittedCheckoutView.as_view()(request)
+
+
+def poll(queue_token):
+    # Let every poll run the admission step instead of waiting out the 1s lock
+    cache.delete(WaitingRoomService.ADVANCE_LOCK_KEY)
+    return WaitingRoomService.status(queue_token)
+
+
+class TestWaitingRoom:
+    """Test FIFO admission within the checkout budget."""
+
+    def test_admits_in_order_up_to_budget(self, waiting_room):
+        visitors = [waiting_room.join() for _ in range(3)]
+        statuses = [poll(v['queue_token']) for v in visitors]
+
+        assert [s['status'] for s in statuses] == ['admitted', 'admitted', 'waiting']
+        assert statuses[2]['position'] == 1
+
+        waiting_room.release(statuses[0]['admission_token'])
+
+        third = poll(visitors[2]['queue_token'])
+        assert third['status'] == 'admitted'
+        assert waiting_room.check_admission(third['admission_token']) == 3
+
+    def test_released_admission_is_consumed(self, waiting_room):
+        admitted = poll(waiting_room.join()['queue_token'])
+
+        waiting_room.release(admitted['admission_token'])
+
+        assert waiting_room.check_admission(admitted['admission_token']) is None
+
+    def test_expired_admission(self, waiting_room):
+        visitor = waiting_room.join()
+        cache.delete(WaitingRoomService.admitted_key(1))
+
+        assert poll(visitor['queue_token'])['status'] == 'expired'
+
+    def test_rejects_forged_tokens(self, waiting_room):
+        queue_token = waiting_room.join()['queue_token']
+
+        # A queue token is not an admission token
+        assert waiting_room.check_admission(queue_token) is None
+        with pytest.raises(ValueError):
+            waiting_room.status('forged')
+
+
+@pytest.mark.django_db
+class TestWaitingRoomEndpoints:
+    """Test the queue endpoints and checkout enforcement."""
+
+    def test_checkout_requires_admission(self, api_client, waiting_room):
+        response = api_client.post(reverse('payments:guest-checkout'), {}, format='json')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_join_and_poll(self, api_client, waiting_room):
+        joined = api_client.post(reverse('payments:waiting-room-join'))
+        assert joined.status_code == status.HTTP_200_OK
+
+        response = api_client.get(
+            reverse('payments:waiting-room-status'),
+            {'token': joined.data['data']['queue_token']}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['data']['status'] == 'admitted'
+
+    def test_status_rejects_bad_token(self, api_client, waiting_room):
+        response = api_client.get(reverse('payments:waiting-room-status'), {'token': 'nope'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_status_when_cache_is_down(self, api_client, waiting_room):
+        queue_token = waiting_room.join()['queue_token']
+
+        with patch.object(WaitingRoomService, 'advance', side_effect=ConnectionError('down')):
+            response = api_client.get(reverse('payments:waiting-room-status'), {'token': queue_token})
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+    def test_admission_buys_one_checkout_and_its_retries(self, waiting_room):
+        admission_token = poll(waiting_room.join()['queue_token'])['admission_token']
+
+        assert checkout(admission_token, 'order-1').status_code == status.HTTP_200_OK
+
+        retry = checkout(admission_token, 'order-1')
+        assert retry.status_code == status.HTTP_200_OK
+        assert retry[REPLAY_HEADER] == 'true'
+        assert checkout(admission_token, 'order-2').status_code == status.HTTP_403_FORBIDDEN
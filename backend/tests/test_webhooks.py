@@ -121,3 +121,130 @@ class TestWebhookIdempotency:
         
         # Order should be PAID
         assert order.status == Order.Status.PAID
+
+
+def signed_event(event_id, order, event_type='payment_intent.succeeded', created=1700000000):
+    """Webhook payload and a Stripe-Signature header for it."""
+    import hashlib
+    import hmac
+    import time
+    
+    payload = json.dumps({
+        'id': event_id,
+        'object': 'event',
+        'type': event_type,
+        'created': created,
+        'data': {'object': {
+            'id': order.stripe_payment_intent_id,
+            'object': 'payment_intent',
+            'metadata': {'order_id': str(order.id)},
+        }},
+    })
+    timestamp = int(time.time())
+    signature = hmac.new(b'whsec_test', f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return payload.encode(), f"t={timestamp},v1={signature}"
+
+
+@pytest.mark.django_db
+class TestAsyncWebhookIngest:
+    """Test storing webhook events and processing them per order."""
+    
+    @pytest.fixture(autouse=True)
+    def webhook_secret(self, settings):
+        settings.STRIPE_WEBHOOK_SECRET = 'whsec_test'
+    
+    def test_duplicate_delivery_stored_once(self, paid_order_setup, django_capture_on_commit_callbacks):
+        order, _ = paid_order_setup
+        payload, signature = signed_event('evt_dup', order)
+        
+        with patch('apps.payments.tasks.process_stripe_events.apply_async') as apply_async:
+            with django_capture_on_commit_callbacks(execute=True):
+                StripeService.ingest_webhook_event(payload, signature)
+                StripeService.ingest_webhook_event(payload, signature)
+        
+        event = StripeEvent.objects.get(stripe_event_id='evt_dup')
+        assert event.order_key == str(order.id)
+        assert not event.processed
+        apply_async.assert_called_with(args=[str(order.id)], queue=None)
+    
+    def test_redelivery_after_processing_is_not_processed_again(self, paid_order_setup):
+        order, _ = paid_order_setup
+        payload, signature = signed_event('evt_again', order)
+        with patch('apps.payments.tasks.process_stripe_events.apply_async'):
+            StripeService.ingest_webhook_event(payload, signature)
+        StripeService.process_order_events(str(order.id))
+        
+        with patch('apps.payments.tasks.process_stripe_events.apply_async') as apply_async:
+            assert StripeService.ingest_webhook_event(payload, signature) == {'status': 'already_processed'}
+        with patch.object(StripeService, '_process_event') as process_event:
+            result = StripeService.process_order_events(str(order.id))
+        
+        apply_async.assert_not_called()
+        process_event.assert_not_called()
+        assert result == {'processed': 0, 'failed': None}
+        assert StripeEvent.objects.get(stripe_event_id='evt_again').attempts == 1
+    
+    def test_invalid_signature_rejected(self, paid_order_setup):
+        order, _ = paid_order_setup
+        payload, _ = signed_event('evt_bad', order)
+        
+        with pytest.raises(ValueError):
+            StripeService.ingest_webhook_event(payload, 't=1,v1=deadbeef')
+        assert not StripeEvent.objects.filter(stripe_event_id='evt_bad').exists()
+    
+    def test_partitioned_queue_is_stable_per_order(self, settings):
+        settings.STRIPE_EVENT_QUEUE_PARTITIONS = 8
+        
+        queue = StripeService.event_queue('order-1')
+        assert queue.startswith('stripe-events-')
+        assert StripeService.event_queue('order-1') == queue
+    
+    def test_events_processed_in_created_order(self, paid_order_setup):
+        order, _ = paid_order_setup
+        with patch('apps.payments.tasks.process_stripe_events.apply_async'):
+            for event_id, created in [('evt_late', 1700000200), ('evt_early', 1700000100)]:
+                StripeService.ingest_webhook_event(*signed_event(event_id, order, created=created))
+        
+        seen = []
+        with patch.object(StripeService, '_process_event', side_effect=lambda event: seen.append(event.id)):
+            result = StripeService.process_order_events(str(order.id))
+        
+        assert seen == ['evt_early', 'evt_late']
+        assert result == {'processed': 2, 'failed': None}
+        assert StripeEvent.objects.filter(order_key=str(order.id), processed=True).count() == 2
+    
+    def test_failure_holds_back_later_events(self, paid_order_setup):
+        order, _ = paid_order_setup
+        with patch('apps.payments.tasks.process_stripe_events.apply_async'):
+            for event_id, created in [('evt_first', 1700000100), ('evt_second', 1700000200)]:
+                StripeService.ingest_webhook_event(*signed_event(event_id, order, created=created))
+        
+        with patch.object(StripeService, '_process_event', side_effect=RuntimeError('boom')):
+            result = StripeService.process_order_events(str(order.id))
+        
+        assert result['failed'] == 'evt_first'
+        first = StripeEvent.objects.get(stripe_event_id='evt_first')
+        assert first.attempts == 1
+        assert first.processing_error == 'boom'
+        assert StripeEvent.objects.get(stripe_event_id='evt_second').attempts == 0
+    
+    def test_webhook_view_acknowledges_and_finalizes_async(self, locmem_cache, api_client, paid_order_setup):
+        order, _ = paid_order_setup
+        payload, signature = signed_event('evt_view', order)
+        
+        with patch('apps.payments.tasks.process_stripe_events.apply_async') as apply_async:
+            response = api_client.post(
+                reverse('payments:stripe-webhook'),
+                data=payload,
+                content_type='application/json',
+                HTTP_STRIPE_SIGNATURE=signature
+            )
+        
+        assert response.status_code == 200
+        assert response.data == {'status': 'queued'}
+        assert not Ticket.objects.filter(order=order).exists()
+        
+        StripeService.process_order_events(str(order.id))
+        order.refresh_from_db()
+        assert order.status == Order.Status.PAID
+        assert Ticket.objects.filter(order=order).count() == 1